@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+agent_soa.py
+
+- simulate(engine="soa") 에서 사용하는 structure-of-arrays 에이전트 상태
+- 에이전트 dict 리스트 <-> NumPy 배열 변환
+  (pos_idx, phase, edge_time_left, edge_total_time, speed_mps,
+   done, finish_time, last_move_time)
+- path 는 node id 를 정수로 intern 한 2차원 배열(path_mat)로 보관
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+PHASE_NODE = 0
+PHASE_EDGE = 1
+
+_PHASE_NAMES = {PHASE_NODE: "node", PHASE_EDGE: "edge"}
+
+
+class AgentSoA:
+    """
+    에이전트 hot state 를 NumPy 배열로 보관하는 컨테이너.
+
+    - node_ids / node_index: node id(str) <-> 정수 인덱스
+    - path_mat[i, k]: i번째 에이전트 path 의 k번째 노드 (빈 칸은 -1)
+    - path_len[i]: i번째 에이전트 path 길이
+    - 그 외 배열은 agent dict 의 같은 이름 필드와 1:1 대응
+
+    path, goal_id, reroute_history 같은 cold 필드는 원래 agent dict 에 그대로 둔다.
+    """
+
+    def __init__(self, agents: List[dict], node_ids: Sequence[str] = ()) -> None:
+        self.node_ids: List[str] = []
+        self.node_index: Dict[str, int] = {}
+        for nid in node_ids:
+            self.intern(nid)
+
+        n = len(agents)
+        max_len = max((len(a.get("path") or []) for a in agents), default=1)
+
+        self.path_mat = np.full((n, max(max_len, 1)), -1, dtype=np.int32)
+        self.path_len = np.zeros(n, dtype=np.int32)
+        self.pos_idx = np.zeros(n, dtype=np.int64)
+        self.phase = np.zeros(n, dtype=np.int8)
+        self.edge_time_left = np.zeros(n, dtype=float)
+        self.edge_total_time = np.zeros(n, dtype=float)
+        self.speed_mps = np.zeros(n, dtype=float)
+        self.done = np.zeros(n, dtype=bool)
+        self.finish_time = np.full(n, np.nan, dtype=float)
+        self.last_move_time = np.zeros(n, dtype=float)
+
+        # set_path 이후 agent["path"] 가 다른 list 로 바뀌었는지(재라우팅) 확인용
+        self._path_refs: List[list] = [None] * n
+
+        for i, a in enumerate(agents):
+            self.set_path(i, a.get("path") or [])
+            self.pos_idx[i] = int(a.get("pos_idx", 0))
+            self.phase[i] = PHASE_EDGE if a.get("phase") == "edge" else PHASE_NODE
+            self.edge_time_left[i] = float(a.get("edge_time_left", 0.0))
+            self.edge_total_time[i] = float(a.get("edge_total_time", 0.0))
+            self.speed_mps[i] = float(a["speed_mps"])
+            self.done[i] = bool(a.get("done"))
+            if "finish_time" in a:
+                self.finish_time[i] = float(a["finish_time"])
+            self.last_move_time[i] = float(a.get("last_move_time", 0.0))
+
+    # ----------------------------------------------------
+    # node id intern / path
+    # ----------------------------------------------------
+
+    def intern(self, nid: str) -> int:
+        """node id 를 정수 인덱스로 변환 (처음 보는 id 면 새로 등록)"""
+        idx = self.node_index.get(nid)
+        if idx is None:
+            idx = len(self.node_ids)
+            self.node_index[nid] = idx
+            self.node_ids.append(nid)
+        return idx
+
+    def set_path(self, i: int, path: List[str]) -> None:
+        """i번째 에이전트 path 를 path_mat 에 기록 (필요하면 열 확장)"""
+        n_cols = self.path_mat.shape[1]
+        if len(path) > n_cols:
+            grown = np.full((self.path_mat.shape[0], len(path)), -1, dtype=np.int32)
+            grown[:, :n_cols] = self.path_mat
+            self.path_mat = grown
+        row = self.path_mat[i]
+        row[:] = -1
+        row[: len(path)] = [self.intern(nid) for nid in path]
+        self.path_len[i] = len(path)
+        self._path_refs[i] = path
+
+    def path_changed(self, i: int, agent: dict) -> bool:
+        """agent dict 의 path 가 set_path 이후 다른 list 로 교체되었는지"""
+        return agent.get("path") is not self._path_refs[i]
+
+    def node_at(self, idxs: np.ndarray, offset: int = 0) -> np.ndarray:
+        """idxs 에이전트들의 path[pos_idx + offset] (정수 node id)"""
+        return self.path_mat[idxs, self.pos_idx[idxs] + offset]
+
+    # ----------------------------------------------------
+    # dict 동기화
+    # ----------------------------------------------------
+
+    def sync_agent(self, i: int, agent: dict) -> None:
+        """i번째 에이전트의 배열 상태를 agent dict 에 반영"""
+        agent["pos_idx"] = int(self.pos_idx[i])
+        agent["phase"] = _PHASE_NAMES[int(self.phase[i])]
+        agent["edge_time_left"] = float(self.edge_time_left[i])
+        agent["edge_total_time"] = float(self.edge_total_time[i])
+        agent["speed_mps"] = float(self.speed_mps[i])
+        agent["done"] = bool(self.done[i])
+        agent["last_move_time"] = float(self.last_move_time[i])
+        if not np.isnan(self.finish_time[i]):
+            agent["finish_time"] = float(self.finish_time[i])
+
+    def load_agent(self, i: int, agent: dict) -> None:
+        """agent dict(재라우팅 등으로 바뀐 상태)을 i번째 배열 상태로 다시 읽어옴"""
+        if self.path_changed(i, agent):
+            self.set_path(i, agent.get("path") or [])
+        self.pos_idx[i] = int(agent.get("pos_idx", 0))
+        self.phase[i] = PHASE_EDGE if agent.get("phase") == "edge" else PHASE_NODE
+        self.edge_time_left[i] = float(agent.get("edge_time_left", 0.0))
+        self.edge_total_time[i] = float(agent.get("edge_total_time", 0.0))
+        self.last_move_time[i] = float(agent.get("last_move_time", 0.0))
+
+    def to_agents(self, agents: List[dict]) -> List[dict]:
+        """
+        배열 상태를 agent dict 리스트에 다시 써 넣는다 (시뮬 종료 시 호출).
+        run_agent_path_demo 등 dict 기반 통계 코드가 그대로 동작하도록 하기 위함.
+        """
+        for i, a in enumerate(agents):
+            self.sync_agent(i, a)
+        return agents
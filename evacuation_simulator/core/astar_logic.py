@@ -16,6 +16,10 @@ import math
 from typing import Dict, List, Tuple, Optional, Iterable, Any
 from collections import defaultdict
 
+import numpy as np
+
+from .compiled_building import get_compiled, append_change, change_log_end, changes_since
+
 NodeId = str
 Graph = Dict[NodeId, List[Tuple[NodeId, float]]]
 
@@ -72,30 +76,71 @@ def load_building(path: str) -> dict:
         return json.load(f)
 
 
-def _node_pos_map(building: dict) -> Dict[NodeId, Tuple[float, float, float]]:
+class NodePositionIndex:
     """
-    node_id -> (x, y, z) 매핑.
-    - node["pos"] = {"x": float, "y": float}
-    - node["floor"] 기준으로 z를 계단식으로 부여
+    A* 휴리스틱용 node 위치 인덱스.
+
+    - node id -> 정수 index (index), 위치는 (N, 3) 배열 (xyz)
+    - node["pos"] = {"x", "y"}, z 는 floor 첫 등장 순서대로 0, 1, 2, ... (계단식)
+    - goal 별 휴리스틱 벡터(모든 node -> goal 거리)를 한 번 계산해서 재사용
     """
-    pos_map: Dict[NodeId, Tuple[float, float, float]] = {}
-    floors: Dict[str, int] = {}
-    next_floor_idx = 0
 
-    for n in building.get("nodes", []):
-        nid = n.get("id")
-        if not nid:
-            continue
-        pos = n.get("pos", {}) or {}
-        x = float(pos.get("x", 0.0))
-        y = float(pos.get("y", 0.0))
-        floor = n.get("floor", "F0")
-        if floor not in floors:
-            floors[floor] = next_floor_idx
-            next_floor_idx += 1
-        z = float(floors[floor])
-        pos_map[nid] = (x, y, z)
-    return pos_map
+    def __init__(self, nodes: Iterable[dict]) -> None:
+        nodes = list(nodes)
+        self.n_nodes = len(nodes)
+        self.index: Dict[NodeId, int] = {}
+
+        floors: Dict[str, int] = {}
+        coords: List[Tuple[float, float, float]] = []
+        for n in nodes:
+            nid = n.get("id")
+            if not nid:
+                continue
+            pos = n.get("pos", {}) or {}
+            floor = n.get("floor", "F0")
+            if floor not in floors:
+                floors[floor] = len(floors)
+            self.index[nid] = len(coords)
+            coords.append((float(pos.get("x", 0.0)), float(pos.get("y", 0.0)), float(floors[floor])))
+
+        self.xyz = np.array(coords, dtype=float).reshape(-1, 3)
+        self._h_cache: Dict[NodeId, List[float]] = {}
+
+    def heuristic_to(self, goal: NodeId) -> List[float]:
+        """h[index[nid]] = nid -> goal 3D 유클리드 거리."""
+        h = self._h_cache.get(goal)
+        if h is None:
+            d = self.xyz - self.xyz[self.index[goal]]
+            h = np.sqrt(d[:, 0] * d[:, 0] + d[:, 1] * d[:, 1] + d[:, 2] * d[:, 2]).tolist()
+            self._h_cache[goal] = h
+        return h
+
+
+_POS_INDEX_KEY = "_node_pos_index"
+
+# building 없이 호출된 astar_path 용: 마지막으로 쓴 node_by_id 와 그 인덱스
+_fallback_pos_index: Optional[Tuple[Dict[NodeId, dict], NodePositionIndex]] = None
+
+
+def node_position_index(building: dict) -> NodePositionIndex:
+    """building 별 NodePositionIndex (node 가 추가/삭제되면 다시 만든다)."""
+    nodes = building.get("nodes", [])
+    idx = building.get(_POS_INDEX_KEY)
+    if idx is None or idx.n_nodes != len(nodes):
+        idx = NodePositionIndex(nodes)
+        building[_POS_INDEX_KEY] = idx
+    return idx
+
+
+def _position_index_for(node_by_id: Dict[NodeId, dict]) -> NodePositionIndex:
+    """building 이 없을 때 node_by_id 로 만든 인덱스 (같은 node_by_id 면 재사용)."""
+    global _fallback_pos_index
+    cached = _fallback_pos_index
+    if cached is not None and cached[0] is node_by_id and cached[1].n_nodes == len(node_by_id):
+        return cached[1]
+    idx = NodePositionIndex(node_by_id.values())
+    _fallback_pos_index = (node_by_id, idx)
+    return idx
 
 
 def build_graph(
@@ -111,6 +156,7 @@ def build_graph(
     - 닫힌 edge (state != "open") 도 무시.
     - cfg.edge_cost(...) 로 각 edge의 weight 계산.
     - edge_congestion: (node_a, node_b) -> 간선 위 인원 수
+    - 캐시 없이 매번 building dict 에서 만든다 (재라우팅 hot path 는 get_routing_graph 사용)
     """
     node_by_id: Dict[NodeId, dict] = {n["id"]: n for n in building.get("nodes", [])}
     closed_nodes = {
@@ -146,18 +192,241 @@ def build_graph(
 
 
 # --------------------------------------------------------
-# 3. A* 경로 탐색
+# 2+. 라우팅 그래프 캐시 (재라우팅용)
 # --------------------------------------------------------
+#
+# building dict 안에 버전 카운터를 두고, 버전이 바뀔 때만 다시 계산한다.
+# - "_topology_version": node/edge state(open/closed) 변경 → 인접 구조 재구성
+# - "_cost_version"    : edge risk 등 비용 변경 → 구조는 유지, 간선 비용만 재계산
+# - 혼잡도(edge_congestion): 이전 스냅샷과 값이 다른 간선만 비용 패치
+#
+# building 을 직접 수정하는 코드는 mark_topology_changed / mark_costs_changed 를 호출해야 한다.
+# (build_graph() 는 캐시를 쓰지 않으므로 호출하지 않아도 항상 현재 building 기준)
+# 바뀐 node / edge 를 같이 넘기면 "_route_change_log" 에 기록되어
+# IncrementalRoutePlanner 가 그 부분만 다시 계산한다 (None 이면 전체 재계산).
+# change log 는 최근 항목만 보관하고, 잘린 구간보다 뒤처진 소비자는 전체 재계산한다.
+
+_TOPOLOGY_VERSION_KEY = "_topology_version"
+_COST_VERSION_KEY = "_cost_version"
+_GRAPH_CACHE_KEY = "_routing_graph_cache"
+_CLOSED_NODES_CACHE_KEY = "_closed_nodes_cache"
+
+
+def mark_topology_changed(
+    building: dict,
+    nodes: Optional[Iterable[NodeId]] = None,
+    edges: Optional[Iterable[dict]] = None,
+) -> None:
+    """
+    node/edge 의 state(open/closed)가 바뀌었을 때 호출.
+    - nodes / edges: state 가 바뀐 node id / edge dict (모르면 None)
+    """
+    building[_TOPOLOGY_VERSION_KEY] = building.get(_TOPOLOGY_VERSION_KEY, 0) + 1
+    _log_route_change(building, nodes, edges)
+
+
+def mark_costs_changed(building: dict, edges: Optional[Iterable[dict]] = None) -> None:
+    """
+    edge 의 risk / length / weight_factor 가 바뀌었을 때 호출.
+    - edges: 값이 바뀐 edge dict (모르면 None)
+    """
+    building[_COST_VERSION_KEY] = building.get(_COST_VERSION_KEY, 0) + 1
+    _log_route_change(building, None, edges, cost_only=True)
+
 
-def _heuristic(a: NodeId, b: NodeId, pos_map: Dict[NodeId, Tuple[float, float, float]]) -> float:
-    """A* 휴리스틱: 3D 유클리드 거리."""
-    xa, ya, za = pos_map[a]
-    xb, yb, zb = pos_map[b]
-    dx = xa - xb
-    dy = ya - yb
-    dz = za - zb
-    return math.sqrt(dx * dx + dy * dy + dz * dz)
+def _log_route_change(
+    building: dict,
+    nodes: Optional[Iterable[NodeId]],
+    edges: Optional[Iterable[dict]],
+    cost_only: bool = False,
+) -> None:
+    if nodes is None and edges is None:
+        entry = {"nodes": None, "edges": None}
+    else:
+        entry = {
+            "nodes": [] if cost_only else list(nodes or ()),
+            "edges": list(edges or ()),
+        }
+    append_change(building, entry)
+
+
+def closed_node_set(building: dict) -> set:
+    """state != "open" 인 node id 집합 (topology 버전별로 캐시)."""
+    version = building.get(_TOPOLOGY_VERSION_KEY, 0)
+    cached = building.get(_CLOSED_NODES_CACHE_KEY)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    closed = {
+        n["id"] for n in building.get("nodes", [])
+        if n.get("state", "open") != "open"
+    }
+    building[_CLOSED_NODES_CACHE_KEY] = (version, closed)
+    return closed
+
+
+class RoutingGraph:
+    """
+    build_graph() 와 같은 Graph 를 만들되, 간선마다 인접 리스트 위치(slot)를 기억해서
+    비용만 바뀐 경우 해당 slot 만 다시 계산한다.
 
+    - 인접 리스트 순서는 build_graph() 와 동일 (A* tie-break 결과도 동일)
+    - graph 는 캐시와 공유되므로 호출자가 수정하면 안 된다
+    """
+
+    def __init__(self, building: dict, cfg: AStarConfig) -> None:
+        self.cfg = cfg
+        self.topology_version = building.get(_TOPOLOGY_VERSION_KEY, 0)
+        self.cost_version = building.get(_COST_VERSION_KEY, 0)
+
+        cb = get_compiled(building)
+        self.compiled = cb
+        self.node_by_id: Dict[NodeId, dict] = cb.node_by_id()
+
+        self.graph: Graph = {}
+        # slot: (출발 node, 인접리스트 index, arc index)
+        self._slots: List[Tuple[NodeId, int, int]] = []
+        # (u, v) 혼잡도 key -> 영향을 받는 slot 번호들
+        self._slots_by_pair: Dict[Tuple[NodeId, NodeId], List[int]] = defaultdict(list)
+
+        ids = cb.node_ids
+        src = cb.arc_src.tolist()
+        dst = cb.arc_dst.tolist()
+        arc_edge = cb.arc_edge.tolist()
+        for k in np.flatnonzero(cb.arc_usable()).tolist():
+            u = ids[src[k]]
+            adj = self.graph.setdefault(u, [])
+            slot = len(self._slots)
+            self._slots.append((u, len(adj), k))
+            adj.append((ids[dst[k]], 0.0))
+
+            e = cb.edge_dicts[arc_edge[k]]
+            # 역방향 arc 는 (b, a) 가 없으면 (a, b) 혼잡도를 쓰므로 두 key 모두 연결
+            self._slots_by_pair[(e["node_a"], e["node_b"])].append(slot)
+            self._slots_by_pair[(e["node_b"], e["node_a"])].append(slot)
+
+        self.congestion: Dict[Tuple[NodeId, NodeId], float] = {}
+        self._congestion_src: Optional[dict] = None
+        self._tick: Optional[float] = None
+        # goal -> RouteTable (비용이 하나라도 바뀌면 비움)
+        self._route_tables: Dict[NodeId, "RouteTable"] = {}
+        self.refresh_costs()
+
+    def route_table(self, goal: NodeId) -> "RouteTable":
+        """현재 비용 기준 goal 로의 RouteTable (비용이 바뀌기 전까지 재사용)."""
+        table = self._route_tables.get(goal)
+        if table is None:
+            table = RouteTable(self.graph, goal)
+            self._route_tables[goal] = table
+        return table
+
+    def _patch_slot(self, slot: int) -> None:
+        self._route_tables.clear()
+        u, i, k = self._slots[slot]
+        cb = self.compiled
+        e = cb.edge_dicts[int(cb.arc_edge[k])]
+        extra = float(self.congestion.get((e["node_a"], e["node_b"]), 0.0))
+        if cb.arc_reverse[k]:
+            extra = float(self.congestion.get((e["node_b"], e["node_a"]), extra))
+        self.graph[u][i] = (self.graph[u][i][0], self.cfg.edge_cost(e, extra_congestion=extra))
+
+    def refresh_costs(self) -> None:
+        """모든 간선 비용 재계산 (risk 등 변경 시, CompiledBuilding 배열 연산)."""
+        self._route_tables.clear()
+        costs = self.compiled.arc_costs(self.cfg, self.congestion).tolist()
+        for u, i, k in self._slots:
+            self.graph[u][i] = (self.graph[u][i][0], costs[k])
+
+    def update_congestion(
+        self,
+        edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]],
+        tick: Optional[float] = None,
+    ) -> None:
+        """
+        혼잡도 스냅샷 갱신.
+        - 같은 tick 에 같은 edge_congestion 객체로 다시 호출되면 아무 것도 하지 않음
+        - 그 외에는 이전 스냅샷과 값이 달라진 key 에 연결된 slot 만 패치
+        """
+        edge_congestion = edge_congestion or {}
+        if tick is not None and tick == self._tick and edge_congestion is self._congestion_src:
+            return
+
+        old = self.congestion
+        changed = [k for k, v in edge_congestion.items() if old.get(k) != v]
+        changed.extend(k for k in old if k not in edge_congestion)
+
+        self.congestion = dict(edge_congestion)
+        self._congestion_src = edge_congestion
+        self._tick = tick
+
+        patched = set()
+        for key in changed:
+            for k in self._slots_by_pair.get(key, ()):
+                if k not in patched:
+                    patched.add(k)
+                    self._patch_slot(k)
+
+
+def get_routing_graph(
+    building: dict,
+    cfg: AStarConfig,
+    edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+    tick: Optional[float] = None,
+) -> Tuple[Graph, Dict[NodeId, dict]]:
+    """
+    build_graph() 의 캐시 버전. 결과는 build_graph(building, cfg, edge_congestion) 와 동일.
+
+    - cfg 가중치별로 RoutingGraph 하나를 building["_routing_graph_cache"] 에 보관
+    - topology 버전이 바뀌면 재구성, cost 버전이 바뀌면 비용만 재계산
+    - tick: 같은 tick 안의 재라우팅은 혼잡도 비교 없이 같은 그래프를 공유
+    """
+    rg = _cached_routing_graph(building, cfg, edge_congestion, tick)
+    return rg.graph, rg.node_by_id
+
+
+def get_route_table(
+    building: dict,
+    cfg: AStarConfig,
+    goal: NodeId,
+    edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+    tick: Optional[float] = None,
+) -> "RouteTable":
+    """
+    get_routing_graph() 와 같은 캐시 그래프 위에서 goal 로의 RouteTable 을 반환.
+    비용(혼잡/위험/폐쇄)이 바뀌지 않았다면 같은 tick / 다음 tick 에서도 재사용된다.
+    """
+    rg = _cached_routing_graph(building, cfg, edge_congestion, tick)
+    return rg.route_table(goal)
+
+
+def _cached_routing_graph(
+    building: dict,
+    cfg: AStarConfig,
+    edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]],
+    tick: Optional[float],
+) -> RoutingGraph:
+    caches: Dict[tuple, RoutingGraph] = building.setdefault(_GRAPH_CACHE_KEY, {})
+    key = (cfg.length_weight, cfg.congestion_weight, cfg.risk_weight)
+
+    rg = caches.get(key)
+    cb = get_compiled(building)
+    if (
+        rg is None
+        or rg.compiled is not cb
+        or rg.topology_version != building.get(_TOPOLOGY_VERSION_KEY, 0)
+    ):
+        rg = RoutingGraph(building, cfg)
+        caches[key] = rg
+    elif rg.cost_version != building.get(_COST_VERSION_KEY, 0):
+        rg.cost_version = building.get(_COST_VERSION_KEY, 0)
+        rg.refresh_costs()
+
+    rg.update_congestion(edge_congestion, tick=tick)
+    return rg
+
+
+# --------------------------------------------------------
+# 3. A* 경로 탐색
+# --------------------------------------------------------
 
 def astar_path(
     graph: Graph,
@@ -170,24 +439,19 @@ def astar_path(
     표준 A* 경로 탐색.
     - graph: build_graph() 결과
     - start, goal: node id
-    - building: 휴리스틱용 pos_map 계산에 사용 (없으면 node_by_id의 pos 사용)
+    - building: 휴리스틱용 위치 인덱스 계산에 사용 (없으면 node_by_id의 pos 사용)
+      두 경우 모두 캐시된 NodePositionIndex 를 쓰므로 휴리스틱 값은 같다.
     """
     if start not in graph and start != goal:
         return []
 
-    # pos_map 구성
+    # 휴리스틱: goal 까지의 거리 벡터 (index 로 조회)
     if building is not None:
-        pos_map = _node_pos_map(building)
+        pos_index = node_position_index(building)
     else:
-        # node_by_id 안에 pos 가 있다고 가정
-        pos_map = {}
-        for nid, n in node_by_id.items():
-            pos = n.get("pos", {}) or {}
-            x = float(pos.get("x", 0.0))
-            y = float(pos.get("y", 0.0))
-            floor = n.get("floor", "F0")
-            z = float(hash(floor) % 10)  # fallback용 대충 값
-            pos_map[nid] = (x, y, z)
+        pos_index = _position_index_for(node_by_id)
+    node_index = pos_index.index
+    h_to_goal = pos_index.heuristic_to(goal)
 
     open_set: List[Tuple[float, NodeId]] = []
     heapq.heappush(open_set, (0.0, start))
@@ -213,12 +477,381 @@ def astar_path(
             if tentative_g < g_score.get(neighbor, float("inf")):
                 came_from[neighbor] = current
                 g_score[neighbor] = tentative_g
-                f = tentative_g + _heuristic(neighbor, goal, pos_map)
+                f = tentative_g + h_to_goal[node_index[neighbor]]
                 heapq.heappush(open_set, (f, neighbor))
 
     return []  # no path
 
 
+# --------------------------------------------------------
+# 3+. 역방향 Dijkstra route table (공통 goal 용)
+# --------------------------------------------------------
+#
+# 모든 에이전트의 goal 이 SUPER_EXIT 하나이므로, goal 에서 역방향으로
+# 최단경로 트리를 한 번 만들어 두면 경로 조회는 next hop 을 따라가기만 하면 된다.
+# - routing="astar"      : 기존처럼 매번 astar_path()
+# - routing="route_table": RouteTable.path_from() (O(경로 길이))
+# - routing="incremental": IncrementalRoutePlanner (이벤트 변화분만 수리, 아래 3++)
+
+ROUTING_MODES = ("astar", "route_table", "incremental")
+
+
+class RouteTable:
+    """
+    graph 위에서 goal 까지의 최단경로 트리.
+
+    - dist[u]: u -> goal 최소 비용
+    - next_hop[u]: u 에서 goal 방향 다음 노드
+    """
+
+    def __init__(self, graph: Graph, goal: NodeId) -> None:
+        self.goal = goal
+
+        # 역방향 인접 리스트: v -> [(u, cost)]  (원래 간선 u -> v)
+        reverse: Dict[NodeId, List[Tuple[NodeId, float]]] = defaultdict(list)
+        for u, nbrs in graph.items():
+            for v, cost in nbrs:
+                reverse[v].append((u, cost))
+
+        self.dist: Dict[NodeId, float] = {goal: 0.0}
+        self.next_hop: Dict[NodeId, NodeId] = {}
+
+        heap: List[Tuple[float, NodeId]] = [(0.0, goal)]
+        done = set()
+        while heap:
+            d, v = heapq.heappop(heap)
+            if v in done:
+                continue
+            done.add(v)
+            for u, cost in reverse.get(v, []):
+                nd = d + cost
+                if nd < self.dist.get(u, float("inf")):
+                    self.dist[u] = nd
+                    self.next_hop[u] = v
+                    heapq.heappush(heap, (nd, u))
+
+    def path_from(self, start: NodeId) -> List[NodeId]:
+        """start -> goal 경로 (도달 불가면 [])."""
+        if start == self.goal:
+            return [start]
+        if start not in self.next_hop:
+            return []
+        path = [start]
+        cur = start
+        while cur != self.goal:
+            cur = self.next_hop[cur]
+            path.append(cur)
+        return path
+
+
+def path_cost(graph: Graph, path: List[NodeId]) -> float:
+    """graph 기준 path 의 총 비용 (간선이 없으면 inf)."""
+    total = 0.0
+    for u, v in zip(path, path[1:]):
+        for nb, cost in graph.get(u, []):
+            if nb == v:
+                total += cost
+                break
+        else:
+            return float("inf")
+    return total
+
+
+def compare_route_table_with_astar(
+    graph: Graph,
+    node_by_id: Dict[NodeId, dict],
+    goal: NodeId,
+    building: Optional[dict] = None,
+    starts: Optional[Iterable[NodeId]] = None,
+    rel_tol: float = 1e-9,
+) -> List[dict]:
+    """
+    RouteTable 경로 비용과 astar_path() 경로 비용을 start 별로 비교.
+
+    - starts 가 None 이면 graph 의 모든 노드
+    - 비용이 다른(rel_tol 초과) 경우 또는 도달 가능 여부가 다른 경우만 반환
+      [{"start", "astar_cost", "table_cost", "astar_path", "table_path"}, ...]
+    - 비용이 같고 경로만 다른 경우(동률 경로)는 불일치로 보지 않는다
+    """
+    table = RouteTable(graph, goal)
+    if starts is None:
+        starts = list(graph.keys())
+
+    mismatches: List[dict] = []
+    for start in starts:
+        a_path = astar_path(graph, node_by_id, start, goal, building=building)
+        t_path = table.path_from(start)
+        a_cost = path_cost(graph, a_path) if a_path else float("inf")
+        t_cost = path_cost(graph, t_path) if t_path else float("inf")
+
+        same = (
+            a_cost == t_cost
+            or math.isclose(a_cost, t_cost, rel_tol=rel_tol, abs_tol=rel_tol)
+        )
+        if not same:
+            mismatches.append(
+                {
+                    "start": start,
+                    "astar_cost": a_cost,
+                    "table_cost": t_cost,
+                    "astar_path": a_path,
+                    "table_path": t_path,
+                }
+            )
+    return mismatches
+
+
+# --------------------------------------------------------
+# 3++. 증분 재계획 (LPA* / D* Lite 방식, goal 기준 역방향)
+# --------------------------------------------------------
+#
+# goal 까지의 비용 g(u) 와 one-step lookahead rhs(u) = min_{u->v} c(u,v) + g(v) 를 유지.
+# 간선 비용이 바뀌면(폐쇄 = inf) 그 간선의 시작 노드 rhs 만 다시 계산하고,
+# g != rhs 인 노드만 우선순위 큐로 처리한다 → 작업량이 변화 크기에 비례.
+# 시작점이 에이전트마다 다르므로 start 기준 조기 종료 없이 큐가 빌 때까지 처리한다.
+
+_PLANNER_CACHE_KEY = "_incremental_planners"
+_INF = float("inf")
+
+
+class IncrementalRoutePlanner:
+    """
+    building 의 모든 edge(닫힌 것 포함)를 방향별 arc 로 보관하고,
+    닫힌 edge / 닫힌 node 에 붙은 arc 는 비용 inf 로 취급한다.
+
+    - sync(building, edge_congestion, tick): change log + 혼잡도 변화분을 반영해 수리
+    - path_from(start): g 가 최소가 되는 다음 노드를 따라가며 경로 생성
+    - last_expanded: 마지막 수리에서 큐에서 꺼낸 노드 수 (변화 크기 지표)
+    """
+
+    def __init__(self, building: dict, cfg: AStarConfig, goal: NodeId) -> None:
+        self.cfg = cfg
+        self.goal = goal
+        cb = get_compiled(building)
+        self.compiled = cb
+        self.n_nodes = len(cb.node_ids)
+
+        # arc k: (edge, u, v, is_reverse) — CompiledBuilding 의 arc 순서 그대로
+        ids = cb.node_ids
+        self._arc_edge_idx: List[int] = cb.arc_edge.tolist()
+        self._arc_src_idx: List[int] = cb.arc_src.tolist()
+        self._arc_dst_idx: List[int] = cb.arc_dst.tolist()
+        self._arcs: List[Tuple[dict, NodeId, NodeId, bool]] = [
+            (cb.edge_dicts[i], ids[u], ids[v], rev)
+            for i, u, v, rev in zip(
+                self._arc_edge_idx, self._arc_src_idx, self._arc_dst_idx, cb.arc_reverse.tolist()
+            )
+        ]
+        self._out: Dict[NodeId, List[int]] = defaultdict(list)
+        self._in: Dict[NodeId, List[int]] = defaultdict(list)
+        self._arcs_by_node: Dict[NodeId, List[int]] = defaultdict(list)
+        # edge 양 끝점 (node_a, node_b) 기준 — id(e) 는 building 을 deepcopy 하면 맞지 않음
+        self._arcs_by_edge: Dict[Tuple[NodeId, NodeId], List[int]] = defaultdict(list)
+        self._arcs_by_pair: Dict[Tuple[NodeId, NodeId], List[int]] = defaultdict(list)
+
+        for k, (e, u, v, _rev) in enumerate(self._arcs):
+            self._out[u].append(k)
+            self._in[v].append(k)
+            self._arcs_by_node[u].append(k)
+            self._arcs_by_node[v].append(k)
+            self._arcs_by_edge[(e["node_a"], e["node_b"])].append(k)
+            # 역방향 비용은 (b, a) 혼잡도가 없으면 (a, b) 값을 쓰므로 두 key 모두 연결
+            self._arcs_by_pair[(e["node_a"], e["node_b"])].append(k)
+            self._arcs_by_pair[(e["node_b"], e["node_a"])].append(k)
+
+        self.congestion: Dict[Tuple[NodeId, NodeId], float] = {}
+        self._congestion_src: Optional[dict] = None
+        self._tick: Optional[float] = None
+        self._log_cursor = change_log_end(building)
+
+        self.cost: List[float] = cb.arc_costs(cfg).tolist()
+        self.g: Dict[NodeId, float] = {}
+        self.rhs: Dict[NodeId, float] = {goal: 0.0}
+        self._heap: List[Tuple[float, NodeId]] = []
+        self._open: Dict[NodeId, float] = {}
+        self.last_expanded = 0
+
+        self._update_vertex(goal)
+        self._compute()
+
+    # ---------------- 비용 ----------------
+
+    def _arc_cost(self, k: int) -> float:
+        cb = self.compiled
+        if not (
+            cb.edge_open[self._arc_edge_idx[k]]
+            and cb.node_open[self._arc_src_idx[k]]
+            and cb.node_open[self._arc_dst_idx[k]]
+        ):
+            return _INF
+        e, u, v, rev = self._arcs[k]
+        extra = float(self.congestion.get((e["node_a"], e["node_b"]), 0.0))
+        if rev:
+            extra = float(self.congestion.get((e["node_b"], e["node_a"]), extra))
+        return self.cfg.edge_cost(e, extra_congestion=extra)
+
+    # ---------------- LPA* ----------------
+
+    def _g(self, nid: NodeId) -> float:
+        return self.g.get(nid, _INF)
+
+    def _recompute_rhs(self, u: NodeId) -> None:
+        if u == self.goal:
+            return
+        best = _INF
+        for k in self._out.get(u, ()):
+            c = self.cost[k]
+            if c == _INF:
+                continue
+            val = c + self._g(self._arcs[k][2])
+            if val < best:
+                best = val
+        self.rhs[u] = best
+
+    def _update_vertex(self, u: NodeId) -> None:
+        g = self._g(u)
+        rhs = self.rhs.get(u, _INF)
+        if g != rhs:
+            key = min(g, rhs)
+            if self._open.get(u) != key:
+                self._open[u] = key
+                heapq.heappush(self._heap, (key, u))
+        else:
+            self._open.pop(u, None)
+
+    def _compute(self) -> None:
+        expanded = 0
+        while self._heap:
+            key, u = heapq.heappop(self._heap)
+            if self._open.get(u) != key:
+                continue  # 이미 처리됐거나 key 가 바뀐 항목
+            del self._open[u]
+            expanded += 1
+
+            g_old = self._g(u)
+            rhs = self.rhs.get(u, _INF)
+            if g_old > rhs:
+                # over-consistent: g 확정, 선행 노드 rhs 갱신
+                self.g[u] = rhs
+                for k in self._in.get(u, ()):
+                    c = self.cost[k]
+                    p = self._arcs[k][1]
+                    if c != _INF and p != self.goal and c + rhs < self.rhs.get(p, _INF):
+                        self.rhs[p] = c + rhs
+                        self._update_vertex(p)
+            else:
+                # under-consistent: g 를 inf 로 올리고 u 와 선행 노드 rhs 재계산
+                self.g[u] = _INF
+                self._recompute_rhs(u)
+                self._update_vertex(u)
+                preds = {self._arcs[k][1] for k in self._in.get(u, ()) if self.cost[k] != _INF}
+                for p in preds:
+                    self._recompute_rhs(p)
+                    self._update_vertex(p)
+        self.last_expanded = expanded
+
+    # ---------------- 변화 반영 ----------------
+
+    def sync(
+        self,
+        building: dict,
+        edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+        tick: Optional[float] = None,
+    ) -> None:
+        """change log(이벤트) 와 혼잡도 변화분을 반영해 필요한 부분만 수리."""
+        self.compiled.sync(building)
+        end = change_log_end(building)
+        edge_congestion = edge_congestion or {}
+        same_tick = (
+            tick is not None and tick == self._tick and edge_congestion is self._congestion_src
+        )
+        if same_tick and self._log_cursor == end:
+            return
+
+        changed: set = set()
+        for entry in changes_since(building, self._log_cursor):
+            if entry["nodes"] is None and entry["edges"] is None:
+                changed = set(range(len(self._arcs)))
+                break
+            for nid in entry["nodes"]:
+                changed.update(self._arcs_by_node.get(nid, ()))
+            for e in entry["edges"]:
+                changed.update(self._arcs_by_edge.get((e["node_a"], e["node_b"]), ()))
+        self._log_cursor = end
+
+        if not same_tick:
+            old = self.congestion
+            keys = [k for k, v in edge_congestion.items() if old.get(k) != v]
+            keys.extend(k for k in old if k not in edge_congestion)
+            self.congestion = dict(edge_congestion)
+            self._congestion_src = edge_congestion
+            self._tick = tick
+            for key in keys:
+                changed.update(self._arcs_by_pair.get(key, ()))
+
+        touched = set()
+        for k in changed:
+            c = self._arc_cost(k)
+            if c != self.cost[k]:
+                self.cost[k] = c
+                touched.add(self._arcs[k][1])
+
+        if not touched:
+            self.last_expanded = 0
+            return
+        for u in touched:
+            self._recompute_rhs(u)
+            self._update_vertex(u)
+        self._compute()
+
+    def path_from(self, start: NodeId) -> List[NodeId]:
+        """start -> goal 경로 (도달 불가면 [])."""
+        if start == self.goal:
+            return [start]
+        if self._g(start) == _INF:
+            return []
+        path = [start]
+        cur = start
+        while cur != self.goal and len(path) <= self.n_nodes + 1:
+            best, best_v = _INF, None
+            for k in self._out.get(cur, ()):
+                c = self.cost[k]
+                if c == _INF:
+                    continue
+                v = self._arcs[k][2]
+                val = c + self._g(v)
+                if val < best:
+                    best, best_v = val, v
+            if best_v is None:
+                return []
+            cur = best_v
+            path.append(cur)
+        return path if cur == self.goal else []
+
+
+def get_incremental_planner(
+    building: dict,
+    cfg: AStarConfig,
+    goal: NodeId,
+    edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+    tick: Optional[float] = None,
+) -> IncrementalRoutePlanner:
+    """
+    (cfg 가중치, goal) 별 IncrementalRoutePlanner 를 building 에 캐시해 두고,
+    호출 시점까지의 변화분을 반영(sync)해서 반환.
+    node / edge 가 추가·삭제되어 CompiledBuilding 이 다시 만들어진 경우에만 새로 만든다.
+    """
+    planners: Dict[tuple, IncrementalRoutePlanner] = building.setdefault(_PLANNER_CACHE_KEY, {})
+    key = (cfg.length_weight, cfg.congestion_weight, cfg.risk_weight, goal)
+
+    planner = planners.get(key)
+    if planner is None or planner.compiled is not get_compiled(building):
+        planner = IncrementalRoutePlanner(building, cfg, goal)
+        planners[key] = planner
+    planner.sync(building, edge_congestion, tick=tick)
+    return planner
+
+
 # --------------------------------------------------------
 # 4. 재라우팅 정책 및 적용
 # --------------------------------------------------------
@@ -235,10 +868,7 @@ def _has_closed_node_ahead(agent: dict, building: dict) -> bool:
     pos_idx = int(agent.get("pos_idx", 0))
     pos_idx = max(0, min(pos_idx, len(path) - 1))
 
-    closed_nodes = {
-        n["id"] for n in building.get("nodes", [])
-        if n.get("state", "open") != "open"
-    }
+    closed_nodes = closed_node_set(building)
 
     for nid in path[pos_idx + 1:]:
         if nid in closed_nodes:
@@ -277,9 +907,12 @@ def reroute_agent(
     cfg: AStarConfig,
     current_time: float,
     edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+    routing: str = "astar",
 ) -> None:
     """
     단일 agent에 대해 경로를 재계산.
+    - routing: "astar" (매번 A*) | "route_table" (goal 기준 최단경로 트리에서 조회)
+               | "incremental" (이벤트 변화분만 수리하는 IncrementalRoutePlanner)
     - reroute_attempts: A* 재계산 시도 횟수
     - reroute_history: 실제로 path가 바뀐 경우만 기록
       {"time": t, "old_path": [...], "new_path": [...]}
@@ -304,8 +937,24 @@ def reroute_agent(
     agent.setdefault("reroute_attempts", 0)
     agent["reroute_attempts"] += 1
 
-    graph, node_by_id = build_graph(building, cfg, edge_congestion=edge_congestion)
-    new_path = astar_path(graph, node_by_id, current_node, goal_id, building=building)
+    # 같은 tick(current_time) 의 재라우팅은 캐시된 그래프 하나를 공유
+    if routing == "route_table":
+        table = get_route_table(
+            building, cfg, goal_id, edge_congestion=edge_congestion, tick=current_time
+        )
+        new_path = table.path_from(current_node)
+    elif routing == "incremental":
+        planner = get_incremental_planner(
+            building, cfg, goal_id, edge_congestion=edge_congestion, tick=current_time
+        )
+        new_path = planner.path_from(current_node)
+    elif routing == "astar":
+        graph, node_by_id = get_routing_graph(
+            building, cfg, edge_congestion=edge_congestion, tick=current_time
+        )
+        new_path = astar_path(graph, node_by_id, current_node, goal_id, building=building)
+    else:
+        raise ValueError(f"Unknown routing mode '{routing}' (expected one of {ROUTING_MODES})")
     if not new_path:
         return
 
@@ -343,7 +992,9 @@ def apply_rerouting_for_nodes(
     """
     node_to_agent_idxs를 돌면서 재라우트 조건이 만족되는 agent에 대해
     reroute_agent() 호출.
+    - policy["routing"]: "astar"(기본) | "route_table" | "incremental"
     """
+    routing = policy.get("routing", "astar")
     for nid, idxs in node_to_agent_idxs.items():
         current_cong = len(idxs)
 
@@ -365,6 +1016,7 @@ def apply_rerouting_for_nodes(
                     cfg=cfg,
                     current_time=current_time,
                     edge_congestion=edge_congestion,
+                    routing=routing,
                 )
                 continue
 
@@ -382,6 +1034,7 @@ def apply_rerouting_for_nodes(
                     cfg=cfg,
                     current_time=current_time,
                     edge_congestion=edge_congestion,
+                    routing=routing,
                 )
 
 
@@ -406,6 +1059,19 @@ def _build_undirected_adj(building: dict) -> Dict[NodeId, List[NodeId]]:
     return adj
 
 
+def checked_compiled(building: dict):
+    """
+    이벤트 처리용 CompiledBuilding.
+    mark_* 없이 building 의 state / risk 를 직접 바꾼 경우가 있으면
+    전체 변경으로 기록해서 (라우팅 캐시 포함) 다시 동기화한 뒤 반환한다. (O(N+E))
+    """
+    cb = get_compiled(building)
+    if not cb.matches(building):
+        mark_topology_changed(building)
+        cb.sync(building)
+    return cb
+
+
 def increase_risk_around_node_radius(
     building: dict,
     node_id: NodeId,
@@ -432,42 +1098,25 @@ def increase_risk_around_node_radius(
     if hops <= 0:
         return
 
-    adj = _build_undirected_adj(building)
+    cb = checked_compiled(building)
 
-    # BFS로 node_id 기준 hop 거리 계산
-    dist: Dict[NodeId, int] = {node_id: 0}
-    queue: List[NodeId] = [node_id]
-
-    while queue:
-        cur = queue.pop(0)
-        d = dist[cur]
-        if d >= hops:
-            continue
-        for nb in adj.get(cur, []):
-            if nb not in dist:
-                dist[nb] = d + 1
-                queue.append(nb)
+    # BFS로 node_id 기준 hop 거리 계산 (무방향 CSR, 도달 못 한 노드는 -1)
+    dist = cb.hop_distances(node_id, hops)
 
     # 모든 엣지에 대해, 끝점 중 하나라도 dist <= hops 이면 risk 증가
-    for e in building.get("edges", []):
-        a = e.get("node_a")
-        b = e.get("node_b")
-        da = dist.get(a, None)
-        db = dist.get(b, None)
+    affected = np.flatnonzero((dist[cb.edge_a] >= 0) | (dist[cb.edge_b] >= 0))
+    if affected.size == 0:
+        return
 
-        if da is None and db is None:
-            continue
-        # 두 끝점 거리 중 최소가 hops 이하면 "영향권"으로 본다
-        d_min = min([d for d in (da, db) if d is not None])
-        if d_min > hops:
-            continue
+    old_risk = cb.risk[affected]
+    if mode == "add":
+        new_risk = old_risk + risk_value
+    else:  # "max"
+        new_risk = np.maximum(old_risk, risk_value)
 
-        old_risk = float(e.get("risk", 0.0))
-        if mode == "add":
-            new_risk = old_risk + risk_value
-        else:  # "max"
-            new_risk = max(old_risk, risk_value)
-        e["risk"] = new_risk
+    changed_edges = cb.set_edge_risk(affected, new_risk)
+    if changed_edges:
+        mark_costs_changed(building, edges=changed_edges)
 
 
 def mark_node_on_fire(
@@ -496,7 +1145,9 @@ def mark_node_on_fire(
     if close_node:
         for n in building.get("nodes", []):
             if n.get("id") == node_id:
-                n["state"] = "closed"
+                if n.get("state", "open") != "closed":
+                    n["state"] = "closed"
+                    mark_topology_changed(building, nodes=[node_id])
                 break
 
     # 2) 주변 엣지 risk 증가 (방-문-복도 구조까지 포함)
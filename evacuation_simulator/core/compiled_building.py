@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+compiled_building.py
+
+- building JSON(dict) 을 정수 인덱스 + CSR 배열 형태로 컴파일
+  - node id -> int intern
+  - 간선 속성(length, weight_factor, risk, state, directionality)은 평행 NumPy 배열
+  - 방향 인접(arc) CSR: offsets / targets / arc_edge
+  - 무방향 인접 CSR (위험도 전파 BFS, 노드에 붙은 간선 조회용)
+- building dict 가 원본(source of truth)이고, 컴파일 결과는 change log 로 동기화
+  (astar_logic.mark_topology_changed / mark_costs_changed 참고)
+- to_json_dict() 로 현재 상태를 JSON dict 형태로 다시 내보낼 수 있음
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+NodeId = str
+
+_COMPILED_KEY = "_compiled_building"
+_CHANGE_LOG_KEY = "_route_change_log"
+_CHANGE_LOG_BASE_KEY = "_route_change_log_base"
+# change log 최대 길이. 넘으면 앞쪽을 잘라내고 base(잘라낸 항목 수)를 올린다.
+# cursor 는 base 를 포함한 절대 위치라서, 잘린 구간보다 뒤처진 소비자는 전체 재계산으로 처리.
+_CHANGE_LOG_LIMIT = 256
+
+
+def change_log_end(building: dict) -> int:
+    """change log 끝 위치 (잘라낸 항목 포함, 소비자 cursor 기준)."""
+    return building.get(_CHANGE_LOG_BASE_KEY, 0) + len(building.get(_CHANGE_LOG_KEY, ()))
+
+
+def changes_since(building: dict, cursor: int) -> list:
+    """cursor 이후 change log 항목 (cursor 가 이미 잘린 구간이면 전체 변경 항목 하나)."""
+    base = building.get(_CHANGE_LOG_BASE_KEY, 0)
+    if cursor < base:
+        return [{"nodes": None, "edges": None}]
+    return building.get(_CHANGE_LOG_KEY, [])[cursor - base:]
+
+
+def append_change(building: dict, entry: dict) -> None:
+    """change log 에 항목 추가 (_CHANGE_LOG_LIMIT 를 넘으면 오래된 절반을 버림)."""
+    log = building.setdefault(_CHANGE_LOG_KEY, [])
+    log.append(entry)
+    if len(log) > _CHANGE_LOG_LIMIT:
+        drop = len(log) - _CHANGE_LOG_LIMIT // 2
+        del log[:drop]
+        building[_CHANGE_LOG_BASE_KEY] = building.get(_CHANGE_LOG_BASE_KEY, 0) + drop
+
+
+class CompiledBuilding:
+    """
+    building dict 의 정수 인덱스 / CSR 표현.
+
+    - arc 는 간선 순서대로 (정방향, 양방향이면 역방향) 생성된다 → arc_* 리스트/배열
+      (build_graph() 인접 리스트 순서와 동일)
+    - offsets/targets/arc_edge 는 arc 를 출발 노드 기준으로 정렬한 CSR
+      (같은 노드 안에서는 간선 순서 유지)
+    - 닫힌 간선 / 닫힌 노드도 CSR 에 포함되며, edge_open / node_open 마스크로 거른다
+    """
+
+    def __init__(self, building: dict) -> None:
+        nodes = building.get("nodes", [])
+        edges = building.get("edges", [])
+
+        self.n_node_dicts = len(nodes)
+        self.node_ids: List[NodeId] = []
+        self.node_index: Dict[NodeId, int] = {}
+        self.node_dicts: List[Optional[dict]] = []
+        for n in nodes:
+            nid = n.get("id")
+            if nid is None or nid in self.node_index:
+                continue
+            self._intern(nid, n)
+
+        self.edge_dicts: List[dict] = edges
+        n_edges = len(edges)
+        self.edge_a = np.zeros(n_edges, dtype=np.int32)
+        self.edge_b = np.zeros(n_edges, dtype=np.int32)
+        self.bidirectional = np.zeros(n_edges, dtype=bool)
+        self.length = np.zeros(n_edges, dtype=float)
+        self.weight_factor = np.zeros(n_edges, dtype=float)
+        self.risk = np.zeros(n_edges, dtype=float)
+        self.edge_open = np.zeros(n_edges, dtype=bool)
+
+        for i, e in enumerate(edges):
+            self.edge_a[i] = self._intern(e["node_a"])
+            self.edge_b[i] = self._intern(e["node_b"])
+            self.bidirectional[i] = e.get("directionality", "bidirectional") == "bidirectional"
+            self._load_edge(i)
+
+        self.node_open = np.ones(len(self.node_ids), dtype=bool)
+        for i in range(len(self.node_ids)):
+            self._load_node(i)
+
+        # (node_a, node_b) -> edge index 목록 (혼잡도 key 조회용)
+        self._edges_by_ab: Dict[Tuple[NodeId, NodeId], List[int]] = {}
+        for i, e in enumerate(edges):
+            self._edges_by_ab.setdefault((e["node_a"], e["node_b"]), []).append(i)
+
+        # ---- arc (간선 순서 기준) ----
+        arc_src: List[int] = []
+        arc_dst: List[int] = []
+        arc_edge: List[int] = []
+        arc_rev: List[bool] = []
+        for i in range(n_edges):
+            a = int(self.edge_a[i])
+            b = int(self.edge_b[i])
+            arc_src.append(a)
+            arc_dst.append(b)
+            arc_edge.append(i)
+            arc_rev.append(False)
+            if self.bidirectional[i]:
+                arc_src.append(b)
+                arc_dst.append(a)
+                arc_edge.append(i)
+                arc_rev.append(True)
+
+        self.arc_src = np.array(arc_src, dtype=np.int32)
+        self.arc_dst = np.array(arc_dst, dtype=np.int32)
+        self.arc_edge = np.array(arc_edge, dtype=np.int32)
+        self.arc_reverse = np.array(arc_rev, dtype=bool)
+
+        n_nodes = len(self.node_ids)
+
+        # ---- 방향 CSR ----
+        order = np.argsort(self.arc_src, kind="stable")
+        self.arc_order = order  # CSR 위치 -> arc index
+        self.offsets = _csr_offsets(self.arc_src, n_nodes)
+        self.targets = self.arc_dst[order]
+        self.csr_edge = self.arc_edge[order]
+
+        # ---- 무방향 CSR (양 끝점 모두에서 간선 참조) ----
+        und_src = np.concatenate([self.edge_a, self.edge_b])
+        und_dst = np.concatenate([self.edge_b, self.edge_a])
+        und_edge = np.concatenate([np.arange(n_edges), np.arange(n_edges)]).astype(np.int32)
+        # 노드별로 간선 순서가 유지되도록 (src, edge) 기준 정렬
+        und_order = np.lexsort((und_edge, und_src))
+        self.und_offsets = _csr_offsets(und_src, n_nodes)
+        self.und_targets = und_dst[und_order]
+        self.und_edge = und_edge[und_order]
+
+        # BFS 등 순수 파이썬 루프용 list 사본
+        self._und_offsets_l = self.und_offsets.tolist()
+        self._und_targets_l = self.und_targets.tolist()
+        self._und_edge_l = self.und_edge.tolist()
+
+        self._log_cursor = change_log_end(building)
+
+    # ----------------------------------------------------
+    # intern / dict -> 배열
+    # ----------------------------------------------------
+
+    def _intern(self, nid: NodeId, node: Optional[dict] = None) -> int:
+        idx = self.node_index.get(nid)
+        if idx is None:
+            idx = len(self.node_ids)
+            self.node_index[nid] = idx
+            self.node_ids.append(nid)
+            self.node_dicts.append(node)
+        return idx
+
+    def _load_edge(self, i: int) -> None:
+        e = self.edge_dicts[i]
+        self.length[i] = float(e.get("length", 1.0))
+        self.weight_factor[i] = float(e.get("weight_factor", 1.0))
+        self.risk[i] = float(e.get("risk", 0.0))
+        self.edge_open[i] = e.get("state", "open") == "open"
+
+    def _load_node(self, i: int) -> None:
+        n = self.node_dicts[i]
+        self.node_open[i] = n is None or n.get("state", "open") == "open"
+
+    def matches(self, building: dict) -> bool:
+        """배열이 building dict 의 state / risk / length / weight_factor 와 같은지 (직접 수정 검출용)."""
+        edges = self.edge_dicts
+        if not np.array_equal(self.edge_open, [e.get("state", "open") == "open" for e in edges]):
+            return False
+        if not np.array_equal(self.risk, [float(e.get("risk", 0.0)) for e in edges]):
+            return False
+        if not np.array_equal(self.length, [float(e.get("length", 1.0)) for e in edges]):
+            return False
+        if not np.array_equal(self.weight_factor, [float(e.get("weight_factor", 1.0)) for e in edges]):
+            return False
+        node_open = [n is None or n.get("state", "open") == "open" for n in self.node_dicts]
+        return bool(np.array_equal(self.node_open, node_open))
+
+    def sync(self, building: dict) -> None:
+        """change log 에서 마지막 sync 이후 바뀐 node / edge 만 다시 읽어옴."""
+        end = change_log_end(building)
+        if self._log_cursor == end:
+            return
+        edge_pos = None
+        for entry in changes_since(building, self._log_cursor):
+            if entry["nodes"] is None and entry["edges"] is None:
+                for i in range(len(self.edge_dicts)):
+                    self._load_edge(i)
+                for i in range(len(self.node_ids)):
+                    self._load_node(i)
+                continue
+            for nid in entry["nodes"]:
+                idx = self.node_index.get(nid)
+                if idx is not None:
+                    self._load_node(idx)
+            if entry["edges"]:
+                if edge_pos is None:
+                    edge_pos = {id(e): i for i, e in enumerate(self.edge_dicts)}
+                for e in entry["edges"]:
+                    i = edge_pos.get(id(e))
+                    if i is not None:
+                        self._load_edge(i)
+        self._log_cursor = end
+
+    # ----------------------------------------------------
+    # 조회
+    # ----------------------------------------------------
+
+    def arc_usable(self) -> np.ndarray:
+        """arc 별 통행 가능 여부 (간선 open + 양 끝 노드 open)."""
+        return (
+            self.edge_open[self.arc_edge]
+            & self.node_open[self.arc_src]
+            & self.node_open[self.arc_dst]
+        )
+
+    def arc_congestion(
+        self, edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]]
+    ) -> np.ndarray:
+        """
+        arc 별 혼잡도 값. build_graph() 와 같은 규칙:
+        - 정방향 arc: (a, b) 값 (없으면 0)
+        - 역방향 arc: (b, a) 값, 없으면 (a, b) 값
+        """
+        n_edges = len(self.edge_dicts)
+        fwd = np.zeros(n_edges, dtype=float)
+        rev = np.zeros(n_edges, dtype=float)
+        has_rev = np.zeros(n_edges, dtype=bool)
+        for (u, v), val in (edge_congestion or {}).items():
+            for i in self._edges_by_ab.get((u, v), ()):
+                fwd[i] = float(val)
+            for i in self._edges_by_ab.get((v, u), ()):
+                rev[i] = float(val)
+                has_rev[i] = True
+        rev = np.where(has_rev, rev, fwd)
+        return np.where(self.arc_reverse, rev[self.arc_edge], fwd[self.arc_edge])
+
+    def arc_costs(
+        self,
+        cfg,
+        edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+    ) -> np.ndarray:
+        """
+        arc 별 cfg.edge_cost() 값 (통행 불가 arc 는 inf).
+        AStarConfig.edge_cost 를 그대로 쓰는 경우 벡터 연산, 재정의한 경우 arc 별 호출.
+        """
+        cong = self.arc_congestion(edge_congestion)
+        e = self.arc_edge
+        if _uses_default_edge_cost(cfg):
+            c_len = cfg.length_weight * self.length[e] * self.weight_factor[e]
+            c_cong = cfg.congestion_weight * np.maximum(0.0, cong)
+            c_risk = cfg.risk_weight * self.risk[e]
+            costs = c_len + c_cong + c_risk
+        else:
+            costs = np.array(
+                [
+                    cfg.edge_cost(self.edge_dicts[i], extra_congestion=c)
+                    for i, c in zip(e.tolist(), cong.tolist())
+                ],
+                dtype=float,
+            )
+        return np.where(self.arc_usable(), costs, np.inf)
+
+    def to_graph(
+        self,
+        cfg,
+        edge_congestion: Optional[Dict[Tuple[NodeId, NodeId], float]] = None,
+    ) -> Dict[NodeId, List[Tuple[NodeId, float]]]:
+        """build_graph() 와 같은 인접 리스트 dict 생성."""
+        costs = self.arc_costs(cfg, edge_congestion).tolist()
+        src = self.arc_src.tolist()
+        dst = self.arc_dst.tolist()
+        ids = self.node_ids
+        graph: Dict[NodeId, List[Tuple[NodeId, float]]] = {}
+        for k in np.flatnonzero(self.arc_usable()).tolist():
+            graph.setdefault(ids[src[k]], []).append((ids[dst[k]], costs[k]))
+        return graph
+
+    def node_by_id(self) -> Dict[NodeId, dict]:
+        return {nid: n for nid, n in zip(self.node_ids, self.node_dicts) if n is not None}
+
+    def incident_edges(self, node_id: NodeId) -> List[int]:
+        """node_id 에 붙은 간선 index (간선 순서, 상태 무관)."""
+        idx = self.node_index.get(node_id)
+        if idx is None:
+            return []
+        lo, hi = self._und_offsets_l[idx], self._und_offsets_l[idx + 1]
+        out: List[int] = []
+        for i in self._und_edge_l[lo:hi]:
+            if not out or out[-1] != i:  # self-loop 중복 제거
+                out.append(i)
+        return out
+
+    def undirected_neighbors(self, node_id: NodeId) -> List[NodeId]:
+        """open 간선 기준 무방향 이웃 (간선 순서)."""
+        idx = self.node_index.get(node_id)
+        if idx is None:
+            return []
+        lo, hi = self._und_offsets_l[idx], self._und_offsets_l[idx + 1]
+        return [
+            self.node_ids[t]
+            for t, i in zip(self._und_targets_l[lo:hi], self._und_edge_l[lo:hi])
+            if self.edge_open[i]
+        ]
+
+    def hop_distances(self, node_id: NodeId, hops: int) -> np.ndarray:
+        """
+        node_id 에서 open 간선(무방향)으로 hops 이내 노드의 hop 거리.
+        도달하지 않은 노드는 -1.
+        """
+        dist = np.full(len(self.node_ids), -1, dtype=np.int64)
+        src = self.node_index.get(node_id)
+        if src is None:
+            return dist
+        dist_l = dist.tolist()
+        dist_l[src] = 0
+        frontier = [src]
+        offsets = self._und_offsets_l
+        targets = self._und_targets_l
+        edge_ids = self._und_edge_l
+        edge_open = self.edge_open.tolist()
+        d = 0
+        while frontier and d < hops:
+            d += 1
+            nxt: List[int] = []
+            for u in frontier:
+                for j in range(offsets[u], offsets[u + 1]):
+                    v = targets[j]
+                    if dist_l[v] < 0 and edge_open[edge_ids[j]]:
+                        dist_l[v] = d
+                        nxt.append(v)
+            frontier = nxt
+        return np.array(dist_l, dtype=np.int64)
+
+    # ----------------------------------------------------
+    # 배열 -> dict
+    # ----------------------------------------------------
+
+    def set_edge_risk(self, edge_idxs, values) -> List[dict]:
+        """
+        간선 risk 를 배열과 edge dict 양쪽에 기록.
+        반환: 값이 실제로 바뀐 edge dict 목록 (mark_costs_changed 에 넘길 용도)
+        """
+        changed: List[dict] = []
+        for i, val in zip(np.asarray(edge_idxs).tolist(), np.asarray(values, dtype=float).tolist()):
+            e = self.edge_dicts[i]
+            if e.get("risk") != val:
+                changed.append(e)
+            e["risk"] = val
+            self.risk[i] = val
+        return changed
+
+    def to_json_dict(self, building: dict) -> dict:
+        """
+        현재 배열 상태(state, risk)를 반영한 JSON 직렬화 가능한 building dict 를 새로 만든다.
+        "_" 로 시작하는 캐시 key 는 제외.
+        """
+        out = {k: v for k, v in building.items() if not k.startswith("_") and k not in ("nodes", "edges")}
+
+        nodes_out = []
+        for n in building.get("nodes", []):
+            n2 = dict(n)
+            idx = self.node_index.get(n.get("id"))
+            if idx is not None and ("state" in n or not self.node_open[idx]):
+                n2["state"] = "open" if self.node_open[idx] else n.get("state", "closed")
+            nodes_out.append(n2)
+
+        edges_out = []
+        for i, e in enumerate(self.edge_dicts):
+            e2 = dict(e)
+            if "state" in e or not self.edge_open[i]:
+                e2["state"] = "open" if self.edge_open[i] else e.get("state", "closed")
+            if "risk" in e or self.risk[i] != 0.0:
+                e2["risk"] = float(self.risk[i])
+            edges_out.append(e2)
+
+        out["nodes"] = nodes_out
+        out["edges"] = edges_out
+        return out
+
+
+def _csr_offsets(src: np.ndarray, n_nodes: int) -> np.ndarray:
+    counts = np.bincount(src, minlength=n_nodes) if src.size else np.zeros(n_nodes, dtype=np.int64)
+    offsets = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _uses_default_edge_cost(cfg) -> bool:
+    from .astar_logic import AStarConfig
+
+    return type(cfg).edge_cost is AStarConfig.edge_cost
+
+
+def get_compiled(building: dict) -> CompiledBuilding:
+    """
+    building 에 캐시된 CompiledBuilding (없거나 node/edge 수가 바뀌었으면 새로 컴파일).
+    캐시가 있으면 change log 기준으로 바뀐 부분만 동기화한다.
+    """
+    cb = building.get(_COMPILED_KEY)
+    if (
+        cb is None
+        or cb.n_node_dicts != len(building.get("nodes", []))
+        or len(cb.edge_dicts) != len(building.get("edges", []))
+        or cb.edge_dicts is not building.get("edges")
+    ):
+        cb = CompiledBuilding(building)
+        building[_COMPILED_KEY] = cb
+    else:
+        cb.sync(building)
+    return cb
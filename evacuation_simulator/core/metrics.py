@@ -0,0 +1,253 @@
+"""
+metrics.py
+
+- 경량 타이밍 계측: 고정 bucket histogram + decorator / context manager / tick 단계 타이머
+- Prometheus text 출력 (runners/server.py 의 GET /metrics)
+- 시뮬레이션은 ProcessPoolExecutor worker 에서 돌기 때문에
+  worker 는 snapshot() 을 작업 결과와 함께 돌려주고, 서버가 merge() 로 합친다
+- SIM_METRICS=0 이면 timed() 는 원래 함수를 그대로 돌려주고, simulate() 도 타이머를 만들지 않는다
+"""
+
+import bisect
+import os
+import threading
+import time
+from functools import wraps
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+ENABLED = os.environ.get("SIM_METRICS", "1") == "1"
+
+# 초 단위 bucket
+STEP_BUCKETS = (1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5)
+RUN_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels) + ([extra] if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in items) + "}"
+
+
+class Histogram:
+    """고정 bucket histogram. observe() 는 bisect + lock 한 번"""
+
+    def __init__(self, name: str, labels: LabelKey, buckets: Iterable[float]):
+        self.name = name
+        self.labels = labels
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)   # 마지막 = +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        """with hist.time(): ... 블록 실행 시간 기록"""
+        return _Timer(self) if ENABLED else _NULL_TIMER
+
+    def samples(self) -> list:
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            lines.append(f"{self.name}_bucket{_format_labels(self.labels, ('le', repr(bound)))} {cumulative}")
+        cumulative += counts[-1]
+        lines.append(f"{self.name}_bucket{_format_labels(self.labels, ('le', '+Inf'))} {cumulative}")
+        lines.append(f"{self.name}_sum{_format_labels(self.labels)} {total}")
+        lines.append(f"{self.name}_count{_format_labels(self.labels)} {cumulative}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("hist", "t0")
+
+    def __init__(self, hist: Histogram):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Callback:
+    """/metrics 를 만들 때 fn() 값을 읽는 gauge / counter"""
+
+    def __init__(self, name: str, labels: LabelKey, fn: Callable[[], float]):
+        self.name = name
+        self.labels = labels
+        self.fn = fn
+
+    def samples(self) -> list:
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        return [] if value is None else [f"{self.name}{_format_labels(self.labels)} {float(value)}"]
+
+
+class Registry:
+    """
+    metric 모음 + Prometheus text exposition.
+    같은 이름은 label 만 다른 series 로 묶어서 HELP / TYPE 를 한 번만 출력한다.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families: Dict[str, list] = {}   # name -> [type, help, {label key: metric}]
+
+    def _register(self, kind: str, name: str, help_text: str, labels: Optional[dict], factory):
+        key: LabelKey = tuple(sorted(labels.items())) if labels else ()
+        with self._lock:
+            family = self._families.setdefault(name, [kind, help_text, {}])
+            if family[0] != kind:
+                raise ValueError(f"metric {name} is already registered as {family[0]}")
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory(key)
+            return metric
+
+    def histogram(self, name: str, help_text: str, labels: Optional[dict] = None,
+                  buckets: Iterable[float] = STEP_BUCKETS) -> Histogram:
+        return self._register("histogram", name, help_text, labels,
+                              lambda key: Histogram(name, key, buckets))
+
+    def gauge(self, name: str, help_text: str, fn: Callable[[], float], labels: Optional[dict] = None):
+        metric = self._register("gauge", name, help_text, labels, lambda key: _Callback(name, key, fn))
+        metric.fn = fn
+        return metric
+
+    def counter(self, name: str, help_text: str, fn: Callable[[], float], labels: Optional[dict] = None):
+        metric = self._register("counter", name, help_text, labels, lambda key: _Callback(name, key, fn))
+        metric.fn = fn
+        return metric
+
+    def snapshot(self) -> dict:
+        """
+        histogram 값만 pickle 가능한 dict 로 (worker 프로세스 → 서버).
+        {name: (help, [(label key, bounds, counts, sum), ...])}
+        """
+        out = {}
+        with self._lock:
+            families = [(name, help_text, list(series.values()))
+                        for name, (kind, help_text, series) in self._families.items() if kind == "histogram"]
+        for name, help_text, series in families:
+            rows = []
+            for h in series:
+                with h._lock:
+                    if not any(h.counts):
+                        continue
+                    rows.append((h.labels, h.bounds, list(h.counts), h.sum))
+            if rows:
+                out[name] = (help_text, rows)
+        return out
+
+    def merge(self, snapshot: Optional[dict]) -> None:
+        """다른 프로세스의 snapshot() 을 더함 (bucket 이 다르면 건너뜀)"""
+        for name, (help_text, rows) in (snapshot or {}).items():
+            for labels, bounds, counts, total in rows:
+                h = self.histogram(name, help_text, dict(labels), bounds)
+                if h.bounds != tuple(bounds):
+                    continue
+                with h._lock:
+                    for i, c in enumerate(counts):
+                        h.counts[i] += c
+                    h.sum += total
+
+    def reset(self) -> None:
+        """histogram 값 초기화 (worker 가 작업마다 자기 몫만 돌려주도록)"""
+        with self._lock:
+            series = [m for kind, _, s in self._families.values() if kind == "histogram" for m in s.values()]
+        for h in series:
+            with h._lock:
+                h.counts = [0] * len(h.counts)
+                h.sum = 0.0
+
+    def render(self) -> str:
+        with self._lock:
+            families = [(name, kind, help_text, list(series.values()))
+                        for name, (kind, help_text, series) in self._families.items()]
+        lines = []
+        for name, kind, help_text, series in families:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for metric in series:
+                lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+histogram = REGISTRY.histogram
+gauge = REGISTRY.gauge
+counter = REGISTRY.counter
+render = REGISTRY.render
+
+
+def timed(hist: Histogram):
+    """함수 실행 시간을 hist 에 기록하는 decorator (계측이 꺼져 있으면 원래 함수 그대로)"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - t0)
+        return wrapper
+    return decorator
+
+
+class StepTimer:
+    """
+    tick 루프 단계별 시간 측정.
+
+    - lap(phase): 직전 lap 이후 시간을 그 단계 histogram 에 기록 (단계 경계마다 perf_counter 한 번)
+    - start(): 매 tick 시작 시 호출 (tick 사이 루프 조건 검사 시간은 제외)
+    - 계측이 꺼져 있으면 step_timer() 가 None 을 돌려주므로 엔진은 `if timer is not None` 만 검사
+    """
+
+    def __init__(self, engine: str, phases: Iterable[str]):
+        self._hists = {
+            phase: histogram("sim_step_phase_seconds", "simulate() tick 단계별 시간",
+                             labels={"engine": engine, "phase": phase})
+            for phase in phases
+        }
+        self._t = time.perf_counter()
+
+    def start(self) -> None:
+        self._t = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self._hists[phase].observe(now - self._t)
+        self._t = now
+
+
+def step_timer(engine: str, phases: Iterable[str]) -> Optional[StepTimer]:
+    return StepTimer(engine, phases) if ENABLED else None
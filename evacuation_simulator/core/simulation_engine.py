@@ -13,8 +13,9 @@ sim_core.py
 """
 
 import json
+import heapq
 import random
-from collections import defaultdict
+from collections import defaultdict, deque
 from typing import Dict, List, Callable, Tuple
 
 import numpy as np
@@ -25,6 +26,8 @@ from .astar_logic import (
     AStarConfig,
     apply_rerouting_for_nodes,
 )
+from .agent_soa import AgentSoA, PHASE_NODE, PHASE_EDGE
+from . import metrics
 
 
 
@@ -101,7 +104,31 @@ def build_node_dynamics(building: dict) -> Dict[str, dict]:
 DynamicHook = Callable[[dict, int, List[dict], Dict[str, dict]], None]
 # signature: hook(building, t_step, agents, node_dynamics)
 
+# 간선 점유 테이블: (cur, nxt) -> 현재 그 간선을 이동 중인 인원 수
+# - edge 진입 시 +1, 다음 노드 도착 시 -1 (0이 되면 key 삭제)
+# - build_graph()는 (b, a) key 가 없을 때 (a, b) 값을 쓰므로 0인 key 를 남기지 않는다
+EdgeOccupancy = Dict[Tuple[str, str], int]
 
+
+def _edge_enter(occupancy: dict, key: tuple) -> None:
+    occupancy[key] = occupancy.get(key, 0) + 1
+
+
+def _edge_leave(occupancy: dict, key: tuple) -> None:
+    n = occupancy.get(key, 0) - 1
+    if n > 0:
+        occupancy[key] = n
+    else:
+        occupancy.pop(key, None)
+
+
+# tick 엔진 ("dict" / "soa") 단계 이름 (sim_step_phase_seconds 의 phase label)
+TICK_PHASES = ("hook", "edges", "arrivals", "collect", "congestion_log", "reroute", "service", "enter")
+
+RUN_SECONDS = metrics.histogram("sim_run_seconds", "simulate() 한 번 실행 시간", buckets=metrics.RUN_BUCKETS)
+
+
+@metrics.timed(RUN_SECONDS)
 def simulate(
     building: dict,
     agents: List[dict],
@@ -116,6 +143,7 @@ def simulate(
     min_speed_factor: float = 0.2,    # 아무리 막혀도 v_eff ≥ v0 * 이 값
     reroute_policy: dict | None = None,
     reroute_cfg: AStarConfig | None = None,
+    engine: str = "dict",
 ) -> Tuple[np.ndarray, Dict[str, List[int]]]:
     """
     공통 시뮬 엔진.
@@ -131,9 +159,50 @@ def simulate(
         * 둘 다 None이면 재라우팅 없음
         * 둘 다 주어지면, 노드 위에서 혼잡·정체 조건을 만족하는 에이전트는
           astar_logic.reroute_agent()로 path를 다시 계산
-        * 이때, 현재 간선 위 인원수를 edge_congestion 맵으로 만들어
+        * 이때, 간선 점유 테이블(edge_occupancy)을 edge_congestion 맵으로 그대로 넘겨
           A* 비용에 반영 (혼잡한 간선일수록 비용↑)한다.
+    - engine:
+        * "dict": 에이전트를 dict 그대로 순회하는 기본 엔진
+        * "soa" : 에이전트 상태를 NumPy 배열(AgentSoA)로 보관하는 엔진.
+                  같은 seed 에서 "dict" 와 동일한 결과를 내고, 종료 시 agent dict 에 다시 써 넣는다.
+        * "event": 고정 dt tick 대신 간선 도착 / 노드 서비스 완료 이벤트를 우선순위 큐로 처리하는
+                  이산 사건(next-event) 엔진. 실행 시간이 (에이전트 수 × tick) 이 아니라 이동 횟수에 비례.
+                  노드 통과는 FIFO + 1/service_rate_ps 간격, 시간은 연속값이라
+                  tick 엔진과 결과가 통계적으로만 일치한다 (runners/compare_engines.py 참고).
     """
+    if engine == "soa":
+        return _simulate_soa(
+            building=building,
+            agents=agents,
+            node_dynamics=node_dynamics,
+            max_steps=max_steps,
+            rng_seed=rng_seed,
+            dynamic_hook=dynamic_hook,
+            default_speed_mps=default_speed_mps,
+            dt=dt,
+            congestion_alpha=congestion_alpha,
+            min_speed_factor=min_speed_factor,
+            reroute_policy=reroute_policy,
+            reroute_cfg=reroute_cfg,
+        )
+    if engine == "event":
+        return _simulate_event(
+            building=building,
+            agents=agents,
+            node_dynamics=node_dynamics,
+            max_steps=max_steps,
+            rng_seed=rng_seed,
+            dynamic_hook=dynamic_hook,
+            default_speed_mps=default_speed_mps,
+            dt=dt,
+            congestion_alpha=congestion_alpha,
+            min_speed_factor=min_speed_factor,
+            reroute_policy=reroute_policy,
+            reroute_cfg=reroute_cfg,
+        )
+    if engine != "dict":
+        raise ValueError(f"Unknown engine '{engine}' (expected 'dict', 'soa' or 'event')")
+
     if rng_seed is not None:
         random.seed(rng_seed)
 
@@ -166,6 +235,17 @@ def simulate(
         if "last_move_time" not in a:
             a["last_move_time"] = 0.0
 
+    # 시작 시점에 이미 간선 위에 있는 에이전트로 점유 테이블 초기화
+    edge_occupancy: EdgeOccupancy = {}
+    for a in agents:
+        if a.get("done") or a.get("phase") != "edge":
+            continue
+        path = a.get("path", [])
+        pos_idx = int(a.get("pos_idx", 0))
+        if pos_idx >= len(path) - 1:
+            continue
+        _edge_enter(edge_occupancy, (path[pos_idx], path[pos_idx + 1]))
+
     # --- 간선 위 혼잡 효과를 반영하기 위한 내부 함수 ---
 
     def effective_edge_speed(agent: dict, cur: str, nxt: str) -> float:
@@ -173,23 +253,11 @@ def simulate(
         현재 cur -> nxt 간선에서의 혼잡도를 보고,
         간선 위에서의 유효 속도 v_eff 를 계산.
 
-        - 간선 위에 같은 cur->nxt 를 지나고 있는 사람 수를 세고,
+        - 간선 위에 같은 cur->nxt 를 지나고 있는 사람 수 (edge_occupancy),
         - 간선 양 끝 노드의 width (door 폭 등)도 병목으로 반영.
         """
-        # cur->nxt 를 실제로 밟고 있는 사람 수 세기
-        n_edge = 0
-        for other in agents:
-            if other.get("done"):
-                continue
-            if other.get("phase") != "edge":
-                continue
-            if other.get("pos_idx", 0) >= len(other.get("path", [])) - 1:
-                continue
-            if (
-                other["path"][other["pos_idx"]] == cur
-                and other["path"][other["pos_idx"] + 1] == nxt
-            ):
-                n_edge += 1
+        # cur->nxt 를 실제로 밟고 있는 사람 수
+        n_edge = edge_occupancy.get((cur, nxt), 0)
 
         # 간선 양 끝 노드의 width 정보 활용 (door 폭 차이 반영)
         w_start = node_by_id.get(cur, {}).get("width", 1.0)
@@ -216,12 +284,19 @@ def simulate(
 
     t = 0.0   # 실제 시간 [초]
     step = 0  # tick index
+    timer = metrics.step_timer("dict", TICK_PHASES)  # 계측이 꺼져 있으면 None
 
     while any(not a.get("done") for a in agents) and step < max_steps:
+        if timer is not None:
+            timer.start()
+
         # 0) 시나리오 동적 업데이트 (불 번짐 등)
         if dynamic_hook is not None:
             dynamic_hook(building, step, agents, node_dynamics)
 
+        if timer is not None:
+            timer.lap("hook")
+
         # 1) edge 위를 이동 중인 에이전트 업데이트
         for a in agents:
             if a.get("done"):
@@ -230,12 +305,17 @@ def simulate(
                 a["edge_time_left"] -= dt
                 if a["edge_time_left"] <= 0.0:
                     # 간선 이동 완료 → 다음 노드 도착
+                    path = a["path"]
+                    _edge_leave(edge_occupancy, (path[a["pos_idx"]], path[a["pos_idx"] + 1]))
                     a["phase"] = "node"
                     a["edge_time_left"] = 0.0
                     a["pos_idx"] += 1
                     # 노드/edge에서 실제 위치가 바뀐 시각 기록
                     a["last_move_time"] = t
 
+        if timer is not None:
+            timer.lap("edges")
+
         # 2) 목표 노드(경로 마지막)에 도착한 에이전트 완료 처리
         for a in agents:
             if a.get("done"):
@@ -245,6 +325,9 @@ def simulate(
                 a["finish_time"] = t
                 done_times.append(t)
 
+        if timer is not None:
+            timer.lap("arrivals")
+
         # 3) 노드별 대기 중인 에이전트 수집 (node phase + 미완료)
         node_to_agent_idxs: Dict[str, List[int]] = defaultdict(list)
         for idx, a in enumerate(agents):
@@ -260,27 +343,18 @@ def simulate(
             cur = path[pos_idx]
             node_to_agent_idxs[cur].append(idx)
 
+        if timer is not None:
+            timer.lap("collect")
+
         # 4) 혼잡 기록 (노드 위 사람 수)
         for nid, idxs in node_to_agent_idxs.items():
             congestion_log[nid].append(len(idxs))
 
-        # 4.5) 🔥 현재 간선 위 사람 수로 edge_congestion 맵 구성
+        if timer is not None:
+            timer.lap("congestion_log")
+
+        # 4.5) 🔥 현재 간선 위 사람 수 = edge_occupancy (매 tick 재구성하지 않음)
         #       (A* 재계산 시 혼잡한 간선 비용을 높이는 데 사용)
-        edge_congestion: Dict[Tuple[str, str], float] = defaultdict(float)
-        for a in agents:
-            if a.get("done"):
-                continue
-            if a.get("phase") != "edge":
-                continue
-            path = a.get("path", [])
-            if not path:
-                continue
-            pos_idx = int(a.get("pos_idx", 0))
-            if pos_idx >= len(path) - 1:
-                continue
-            cur = path[pos_idx]
-            nxt = path[pos_idx + 1]
-            edge_congestion[(cur, nxt)] += 1.0
 
         # 4.6) 재라우팅 (옵션: 혼잡 / 정체시간 기준)
         if reroute_policy is not None and reroute_cfg is not None:
@@ -291,9 +365,12 @@ def simulate(
                 current_time=t,
                 policy=reroute_policy,
                 cfg=reroute_cfg,
-                edge_congestion=edge_congestion,  # 👈 이제 실제 혼잡 맵 전달
+                edge_congestion=edge_occupancy,  # 👈 간선 점유 테이블을 그대로 전달
             )
 
+        if timer is not None:
+            timer.lap("reroute")
+
         # 5) 각 노드에서 service_rate_ps에 따라 edge로 출발 가능한 인원 계산
         movers: set[int] = set()
         for nid, idxs in node_to_agent_idxs.items():
@@ -318,6 +395,9 @@ def simulate(
             for idx in idxs[:max_leavers]:
                 movers.add(idx)
 
+        if timer is not None:
+            timer.lap("service")
+
         # 6) 실제로 edge로 진입 (노드 → 간선), 혼잡 기반 v_eff 적용
         for idx in movers:
             a = agents[idx]
@@ -349,9 +429,13 @@ def simulate(
             a["phase"] = "edge"
             a["edge_time_left"] = travel_time
             a["edge_total_time"] = travel_time
+            _edge_enter(edge_occupancy, (cur, nxt))
             # edge 진입 시점에 last_move_time 을 갱신하고 싶으면 여기에 넣어도 됨
             # a["last_move_time"] = t
 
+        if timer is not None:
+            timer.lap("enter")
+
         # 시간 진행
         step += 1
         t += dt
@@ -360,6 +444,486 @@ def simulate(
 
 
 
+def _simulate_soa(
+    building: dict,
+    agents: List[dict],
+    node_dynamics: Dict[str, dict],
+    max_steps: int,
+    rng_seed: int | None,
+    dynamic_hook: DynamicHook | None,
+    default_speed_mps: float,
+    dt: float,
+    congestion_alpha: float,
+    min_speed_factor: float,
+    reroute_policy: dict | None,
+    reroute_cfg: AStarConfig | None,
+) -> Tuple[np.ndarray, Dict[str, List[int]]]:
+    """
+    simulate(engine="soa") 구현.
+
+    - edge 이동 / 도착 / 완료 처리는 AgentSoA 배열에 대한 마스크 연산
+    - 노드별 대기열 구성 순서, random 호출 순서, movers 처리 순서는
+      dict 엔진과 동일하게 맞춰서 같은 seed → 같은 결과를 보장
+    - dynamic_hook 에는 agent dict 리스트가 그대로 넘어가지만,
+      hot state(pos_idx, phase 등)는 재라우팅 대상 / 시뮬 종료 시점에만 dict 로 동기화된다.
+    """
+    if rng_seed is not None:
+        random.seed(rng_seed)
+
+    node_by_id = {n["id"]: n for n in building["nodes"]}
+
+    for a in agents:
+        if "speed_mps" not in a:
+            a["speed_mps"] = float(default_speed_mps)
+
+    soa = AgentSoA(agents, node_ids=node_by_id.keys())
+
+    # (int a, int b) -> edge_length (dict 엔진과 동일하게 시작 시점의 open edge 기준)
+    edge_length: Dict[Tuple[int, int], float] = {}
+    for e in building["edges"]:
+        if e.get("state", "open") != "open":
+            continue
+        a_i = soa.intern(e["node_a"])
+        b_i = soa.intern(e["node_b"])
+        L = float(e["length"])
+        edge_length[(a_i, b_i)] = L
+        if e.get("directionality") == "bidirectional":
+            edge_length[(b_i, a_i)] = L
+
+    use_reroute = reroute_policy is not None and reroute_cfg is not None
+    alpha = max(congestion_alpha, 0.0)
+
+    # 간선 점유 테이블 (정수 node id 기준, dict 엔진의 edge_occupancy 와 동일한 규칙)
+    edge_count: Dict[Tuple[int, int], int] = {}
+    on_edge_idxs = np.flatnonzero(
+        ~soa.done & (soa.phase == PHASE_EDGE) & (soa.pos_idx < soa.path_len - 1)
+    )
+    for c, n in zip(soa.node_at(on_edge_idxs).tolist(), soa.node_at(on_edge_idxs, 1).tolist()):
+        _edge_enter(edge_count, (c, n))
+
+    done_times: List[float] = []
+    congestion_log: Dict[str, List[int]] = defaultdict(list)
+
+    t = 0.0
+    step = 0
+    timer = metrics.step_timer("soa", TICK_PHASES)
+
+    while not soa.done.all() and step < max_steps:
+        if timer is not None:
+            timer.start()
+
+        # 0) 시나리오 동적 업데이트
+        if dynamic_hook is not None:
+            dynamic_hook(building, step, agents, node_dynamics)
+
+        if timer is not None:
+            timer.lap("hook")
+
+        # 1) edge 위 에이전트 이동시간 감소 + 도착 처리
+        on_edge = ~soa.done & (soa.phase == PHASE_EDGE)
+        soa.edge_time_left[on_edge] -= dt
+        arrived = on_edge & (soa.edge_time_left <= 0.0)
+        arrived_idxs = np.flatnonzero(arrived)
+        if arrived_idxs.size:
+            for c, n in zip(soa.node_at(arrived_idxs).tolist(), soa.node_at(arrived_idxs, 1).tolist()):
+                _edge_leave(edge_count, (c, n))
+        soa.phase[arrived] = PHASE_NODE
+        soa.edge_time_left[arrived] = 0.0
+        soa.pos_idx[arrived] += 1
+        soa.last_move_time[arrived] = t
+
+        if timer is not None:
+            timer.lap("edges")
+
+        # 2) 경로 마지막 노드에 도착한 에이전트 완료 처리
+        finished = ~soa.done & (soa.phase == PHASE_NODE) & (soa.pos_idx >= soa.path_len - 1)
+        n_finished = int(np.count_nonzero(finished))
+        if n_finished:
+            soa.done[finished] = True
+            soa.finish_time[finished] = t
+            done_times.extend([t] * n_finished)
+
+        if timer is not None:
+            timer.lap("arrivals")
+
+        # 3) 노드별 대기 에이전트 수집
+        #    dict 엔진과 같은 순서: 노드는 처음 등장한 에이전트 index 순, 노드 안에서는 index 오름차순
+        node_to_agent_idxs: Dict[str, List[int]] = {}
+        waiting = np.flatnonzero(~soa.done & (soa.phase == PHASE_NODE))
+        if waiting.size:
+            curs = soa.node_at(waiting)
+            order = np.argsort(curs, kind="stable")
+            sorted_curs = curs[order]
+            sorted_idxs = waiting[order]
+            uniq, starts = np.unique(sorted_curs, return_index=True)
+            ends = np.append(starts[1:], sorted_idxs.size)
+            for g in np.argsort(sorted_idxs[starts], kind="stable").tolist():
+                nid = soa.node_ids[int(uniq[g])]
+                node_to_agent_idxs[nid] = sorted_idxs[starts[g]:ends[g]].tolist()
+
+        if timer is not None:
+            timer.lap("collect")
+
+        # 4) 혼잡 기록
+        for nid, idxs in node_to_agent_idxs.items():
+            congestion_log[nid].append(len(idxs))
+
+        if timer is not None:
+            timer.lap("congestion_log")
+
+        # 4.6) 재라우팅: 대상(노드 위) 에이전트만 dict 로 동기화 후 다시 읽어옴
+        if use_reroute and node_to_agent_idxs:
+            for idxs in node_to_agent_idxs.values():
+                for idx in idxs:
+                    soa.sync_agent(idx, agents[idx])
+
+            edge_congestion = {
+                (soa.node_ids[c], soa.node_ids[n]): float(k)
+                for (c, n), k in edge_count.items()
+            }
+            apply_rerouting_for_nodes(
+                building=building,
+                agents=agents,
+                node_to_agent_idxs=node_to_agent_idxs,
+                current_time=t,
+                policy=reroute_policy,
+                cfg=reroute_cfg,
+                edge_congestion=edge_congestion,
+            )
+
+            for idxs in node_to_agent_idxs.values():
+                for idx in idxs:
+                    soa.load_agent(idx, agents[idx])
+
+        if timer is not None:
+            timer.lap("reroute")
+
+        # 5) service_rate_ps 기반 출발 인원 선택 (dict 엔진과 같은 random 호출 순서)
+        movers: set[int] = set()
+        for nid, idxs in node_to_agent_idxs.items():
+            occ = len(idxs)
+            if occ == 0:
+                continue
+
+            s = node_dynamics.get(nid, {}).get("service_rate_ps", 1e9)
+            q = s * dt
+
+            base = int(q)
+            frac = q - base
+            max_leavers = base
+            if random.random() < frac:
+                max_leavers += 1
+
+            if max_leavers > occ:
+                max_leavers = occ
+
+            random.shuffle(idxs)
+            for idx in idxs[:max_leavers]:
+                movers.add(idx)
+
+        if timer is not None:
+            timer.lap("service")
+
+        # 6) 간선 진입 (set 순회 순서도 dict 엔진과 동일)
+        for idx in movers:
+            if soa.done[idx] or soa.phase[idx] != PHASE_NODE:
+                continue
+            pos_idx = int(soa.pos_idx[idx])
+            if pos_idx >= soa.path_len[idx] - 1:
+                continue
+
+            cur_i = int(soa.path_mat[idx, pos_idx])
+            nxt_i = int(soa.path_mat[idx, pos_idx + 1])
+            L = edge_length.get((cur_i, nxt_i))
+            if L is None:
+                raise KeyError(
+                    f"Edge length not found for ({soa.node_ids[cur_i]} -> {soa.node_ids[nxt_i]})"
+                )
+
+            n_edge = edge_count.get((cur_i, nxt_i), 0)
+            cur = soa.node_ids[cur_i]
+            nxt = soa.node_ids[nxt_i]
+            w_start = node_by_id.get(cur, {}).get("width", 1.0)
+            w_end = node_by_id.get(nxt, {}).get("width", w_start)
+            w_eff = max(0.5, min(w_start, w_end))
+            density = n_edge / w_eff
+
+            v0 = float(soa.speed_mps[idx])
+            if alpha <= 0.0:
+                factor = 1.0
+            else:
+                factor = 1.0 / (1.0 + alpha * max(0.0, density - 1.0))
+            factor = max(min_speed_factor, factor)
+
+            v_eff = max(v0 * factor, 1e-6)
+            travel_time = L / v_eff
+
+            soa.phase[idx] = PHASE_EDGE
+            soa.edge_time_left[idx] = travel_time
+            soa.edge_total_time[idx] = travel_time
+            _edge_enter(edge_count, (cur_i, nxt_i))
+
+        if timer is not None:
+            timer.lap("enter")
+
+        step += 1
+        t += dt
+
+    soa.to_agents(agents)
+    return np.array(done_times, dtype=float), congestion_log
+
+
+# --------------------------------------------------------
+# 3++. 이산 사건(next-event) 엔진
+# --------------------------------------------------------
+#
+# 이벤트 큐 항목: (시각, 종류, seq, 대상)
+# - 같은 시각이면 종류 값 순서: hook → 간선 도착 → 노드 서비스
+#   (tick 엔진의 "hook → 도착/완료 → 출발" 순서와 동일)
+# - seq 는 같은 시각·종류에서 삽입 순서를 유지하기 위한 카운터
+
+_EV_HOOK = 0
+_EV_ARRIVE = 1
+_EV_SERVICE = 2
+
+
+def _simulate_event(
+    building: dict,
+    agents: List[dict],
+    node_dynamics: Dict[str, dict],
+    max_steps: int,
+    rng_seed: int | None,
+    dynamic_hook: DynamicHook | None,
+    default_speed_mps: float,
+    dt: float,
+    congestion_alpha: float,
+    min_speed_factor: float,
+    reroute_policy: dict | None,
+    reroute_cfg: AStarConfig | None,
+) -> Tuple[np.ndarray, Dict[str, List[int]]]:
+    """
+    simulate(engine="event") 구현.
+
+    - 간선 도착: 간선 진입 시각 + L / v_eff 에 도착 이벤트 예약 (v_eff 는 진입 시점 혼잡도로 계산)
+    - 노드 서비스: 노드마다 FIFO 대기열, 한 명 내보낼 때마다 1 / service_rate_ps 초 뒤 다음 서비스
+    - dynamic_hook / 혼잡 기록 / 재라우팅: 정수 step 경계(t = step * dt)마다 이벤트로 호출
+      (재라우팅 조건 검사는 노드에서 대기 중인 에이전트만 대상)
+    - 노드 도착 시점에도 앞 경로에 닫힌 노드가 있는지 바로 확인해서 재라우팅
+    - edge_time_left 는 간선 진입 / 종료 시점에만 갱신된다 (이동 중에는 갱신하지 않음)
+    """
+    if rng_seed is not None:
+        random.seed(rng_seed)
+
+    node_by_id = {n["id"]: n for n in building["nodes"]}
+
+    # dict 엔진과 동일하게 시작 시점의 open edge 기준 길이 맵
+    edge_length: Dict[Tuple[str, str], float] = {}
+    for e in building["edges"]:
+        if e.get("state", "open") != "open":
+            continue
+        a = e["node_a"]
+        b = e["node_b"]
+        L = float(e["length"])
+        edge_length[(a, b)] = L
+        if e.get("directionality") == "bidirectional":
+            edge_length[(b, a)] = L
+
+    for a in agents:
+        if "speed_mps" not in a:
+            a["speed_mps"] = float(default_speed_mps)
+        if "phase" not in a:
+            a["phase"] = "node"
+        if "edge_time_left" not in a:
+            a["edge_time_left"] = 0.0
+        if "edge_total_time" not in a:
+            a["edge_total_time"] = 0.0
+        if "last_move_time" not in a:
+            a["last_move_time"] = 0.0
+
+    use_reroute = reroute_policy is not None and reroute_cfg is not None
+    alpha = max(congestion_alpha, 0.0)
+    horizon = max_steps * dt
+
+    events: List[tuple] = []
+    seq = 0
+
+    def push(time: float, kind: int, target) -> None:
+        nonlocal seq
+        heapq.heappush(events, (time, kind, seq, target))
+        seq += 1
+
+    edge_occupancy: EdgeOccupancy = {}
+    queues: Dict[str, deque] = {}          # node -> 대기 중인 agent index (FIFO)
+    service_pending: set = set()           # 서비스 이벤트가 예약된 node
+    next_free: Dict[str, float] = {}       # node -> 다음 사람을 내보낼 수 있는 시각
+    arrival_at: Dict[int, float] = {}      # 간선 위 agent index -> 도착 예정 시각
+
+    done_times: List[float] = []
+    congestion_log: Dict[str, List[int]] = defaultdict(list)
+    n_done = sum(1 for a in agents if a.get("done"))
+
+    def current_node(a: dict) -> str:
+        path = a["path"]
+        return path[max(0, min(int(a.get("pos_idx", 0)), len(path) - 1))]
+
+    def schedule_service(nid: str, t: float) -> None:
+        if nid in service_pending:
+            return
+        service_pending.add(nid)
+        push(max(t, next_free.get(nid, t)), _EV_SERVICE, nid)
+
+    def finish(idx: int, t: float) -> None:
+        nonlocal n_done
+        a = agents[idx]
+        a["done"] = True
+        a["finish_time"] = t
+        done_times.append(t)
+        n_done += 1
+
+    def enqueue(idx: int, t: float) -> None:
+        nid = current_node(agents[idx])
+        queues.setdefault(nid, deque()).append(idx)
+        schedule_service(nid, t)
+
+    # 초기 상태: 간선 위 에이전트는 남은 시간 뒤 도착, 노드 위 에이전트는 대기열로
+    # (경로가 비었거나 노드 하나뿐이면 tick 엔진 step 0 과 같이 t=0 에 완료)
+    for idx, a in enumerate(agents):
+        if a.get("done"):
+            continue
+        if not a.get("path"):
+            finish(idx, 0.0)
+            continue
+        if a.get("phase") == "edge" and int(a.get("pos_idx", 0)) < len(a["path"]) - 1:
+            path = a["path"]
+            _edge_enter(edge_occupancy, (path[a["pos_idx"]], path[a["pos_idx"] + 1]))
+            arrival_at[idx] = float(a["edge_time_left"])
+            push(arrival_at[idx], _EV_ARRIVE, idx)
+        elif int(a.get("pos_idx", 0)) >= len(a["path"]) - 1:
+            finish(idx, 0.0)
+        else:
+            enqueue(idx, 0.0)
+
+    push(0.0, _EV_HOOK, 0)
+
+    t = 0.0
+    while events and n_done < len(agents):
+        t_ev, kind, _, target = heapq.heappop(events)
+        if t_ev >= horizon:
+            break
+        t = t_ev
+
+        if kind == _EV_HOOK:
+            step = target
+            # 0) 시나리오 동적 업데이트
+            if dynamic_hook is not None:
+                dynamic_hook(building, step, agents, node_dynamics)
+
+            # 혼잡 기록 (노드 위 대기 인원)
+            node_to_agent_idxs = {nid: list(q) for nid, q in queues.items() if q}
+            for nid, idxs in node_to_agent_idxs.items():
+                congestion_log[nid].append(len(idxs))
+
+            # 재라우팅 (노드 위 대기 에이전트만)
+            if use_reroute and node_to_agent_idxs:
+                apply_rerouting_for_nodes(
+                    building=building,
+                    agents=agents,
+                    node_to_agent_idxs=node_to_agent_idxs,
+                    current_time=t,
+                    policy=reroute_policy,
+                    cfg=reroute_cfg,
+                    edge_congestion=edge_occupancy,
+                )
+
+            if step + 1 < max_steps:
+                push((step + 1) * dt, _EV_HOOK, step + 1)
+
+        elif kind == _EV_ARRIVE:
+            idx = target
+            a = agents[idx]
+            path = a["path"]
+            _edge_leave(edge_occupancy, (path[a["pos_idx"]], path[a["pos_idx"] + 1]))
+            arrival_at.pop(idx, None)
+            a["phase"] = "node"
+            a["edge_time_left"] = 0.0
+            a["pos_idx"] += 1
+            a["last_move_time"] = t
+
+            if a["pos_idx"] >= len(path) - 1:
+                finish(idx, t)
+                continue
+
+            # 도착 즉시 앞 경로 폐쇄 여부 확인 (tick 엔진은 다음 tick 재라우팅에서 처리)
+            if use_reroute:
+                apply_rerouting_for_nodes(
+                    building=building,
+                    agents=agents,
+                    node_to_agent_idxs={path[a["pos_idx"]]: [idx]},
+                    current_time=t,
+                    policy=reroute_policy,
+                    cfg=reroute_cfg,
+                    edge_congestion=edge_occupancy,
+                )
+            enqueue(idx, t)
+
+        else:  # _EV_SERVICE
+            nid = target
+            service_pending.discard(nid)
+            q = queues.get(nid)
+            if not q:
+                continue
+
+            idx = q.popleft()
+            a = agents[idx]
+            path = a["path"]
+            pos_idx = int(a["pos_idx"])
+
+            # 재라우팅으로 경로가 현재 노드에서 끝나게 된 경우
+            if pos_idx >= len(path) - 1:
+                finish(idx, t)
+            else:
+                cur = path[pos_idx]
+                nxt = path[pos_idx + 1]
+                L = edge_length.get((cur, nxt))
+                if L is None:
+                    raise KeyError(f"Edge length not found for ({cur} -> {nxt})")
+
+                # 진입 시점 혼잡도 + width 반영 유효 속도 (dict 엔진 effective_edge_speed 와 동일)
+                n_edge = edge_occupancy.get((cur, nxt), 0)
+                w_start = node_by_id.get(cur, {}).get("width", 1.0)
+                w_end = node_by_id.get(nxt, {}).get("width", w_start)
+                w_eff = max(0.5, min(w_start, w_end))
+                density = n_edge / w_eff
+                if alpha <= 0.0:
+                    factor = 1.0
+                else:
+                    factor = 1.0 / (1.0 + alpha * max(0.0, density - 1.0))
+                factor = max(min_speed_factor, factor)
+                v_eff = max(float(a["speed_mps"]) * factor, 1e-6)
+                travel_time = L / v_eff
+
+                a["phase"] = "edge"
+                a["edge_time_left"] = travel_time
+                a["edge_total_time"] = travel_time
+                _edge_enter(edge_occupancy, (cur, nxt))
+                arrival_at[idx] = t + travel_time
+                push(t + travel_time, _EV_ARRIVE, idx)
+
+            # 다음 사람은 1 / service_rate_ps 초 뒤
+            rate = node_dynamics.get(nid, {}).get("service_rate_ps", 1e9)
+            next_free[nid] = t + 1.0 / max(rate, 1e-9)
+            if q:
+                schedule_service(nid, t)
+            else:
+                del queues[nid]
+
+    # 종료 시점 기준 남은 이동시간 기록
+    for idx, t_arr in arrival_at.items():
+        agents[idx]["edge_time_left"] = max(0.0, t_arr - t)
+
+    return np.array(done_times, dtype=float), congestion_log
+
+
 # --------------------------------------------------------
 # 3+. 시각화를 위한 보조 유틸: 간선 중간 위치 보간
 # --------------------------------------------------------
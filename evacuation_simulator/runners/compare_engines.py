@@ -0,0 +1,188 @@
+# compare_engines.py
+# - tick 엔진(engine="dict")과 이산 사건 엔진(engine="event")의 통계 비교
+# - 같은 시나리오 / seed 조합을 두 엔진으로 실행하고
+#   (1) seed 별 t50/t80/t99/평균 완료시간의 평균 ± 표준편차, 쌍대(paired) 차이의 95% 신뢰구간
+#   (2) 전체 완료시간 분포의 2-표본 Kolmogorov–Smirnov 통계량 D 와 근사 p-value
+#   (3) 실행 시간 비교
+#   를 출력
+# - tick 엔진은 간선 도착을 다음 tick 경계로 올림 처리하므로(hop 당 평균 약 dt/2),
+#   event 엔진 완료시간이 경로 hop 수 × dt/2 정도 짧게 나오는 것이 정상
+#
+# 예)
+#   python compare_engines.py --scenarios s1 s9 --seeds 1 2 3 4 5 --per-floor 200
+import sys
+import os
+import io
+import copy
+import time
+import math
+import argparse
+from contextlib import redirect_stdout
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+sys.path.append(current_dir)
+
+from core.astar_logic import load_building
+from core.simulation_engine import compute_stats
+from run_agent_path_demo import get_agent_paths_with_history
+from run_sweep import DEFAULT_BUILDING_PATH, _scenario_hook_name
+
+METRICS = ("t50", "t80", "t99", "mean")
+
+
+def ks_2samp(x, y):
+    """
+    2-표본 Kolmogorov–Smirnov 검정 (scipy 없이).
+    반환: (D, p_value)  — p_value 는 점근 분포 근사
+    """
+    x = np.sort(np.asarray(x, dtype=float))
+    y = np.sort(np.asarray(y, dtype=float))
+    n1, n2 = x.size, y.size
+    if n1 == 0 or n2 == 0:
+        return float("nan"), float("nan")
+
+    grid = np.concatenate([x, y])
+    cdf_x = np.searchsorted(x, grid, side="right") / n1
+    cdf_y = np.searchsorted(y, grid, side="right") / n2
+    d = float(np.max(np.abs(cdf_x - cdf_y)))
+
+    ne = n1 * n2 / (n1 + n2)
+    lam = (math.sqrt(ne) + 0.12 + 0.11 / math.sqrt(ne)) * d
+    if lam < 1e-3:
+        return d, 1.0
+    p = 2.0 * sum((-1) ** (k - 1) * math.exp(-2.0 * k * k * lam * lam) for k in range(1, 101))
+    return d, float(min(max(p, 0.0), 1.0))
+
+
+def _run_once(building, scenario, seed, engine, per_floor, max_steps):
+    t0 = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = get_agent_paths_with_history(
+            scenario_name=_scenario_hook_name(scenario),
+            building=copy.deepcopy(building),
+            per_floor=per_floor,
+            max_steps=max_steps,
+            rng_seed=seed,
+            engine=engine,
+        )
+    elapsed = time.perf_counter() - t0
+
+    done_times = np.asarray(result["done_times"], dtype=float)
+    t50, t80, t99 = compute_stats(done_times)
+    return {
+        "done_times": done_times,
+        "t50": t50,
+        "t80": t80,
+        "t99": t99,
+        "mean": float(done_times.mean()) if done_times.size else float("nan"),
+        "n_finished": result["global_stats"]["n_finished"],
+        "reroute_events": result["global_reroute"]["total_events"],
+        "elapsed_s": elapsed,
+    }
+
+
+def compare_engines(
+    scenarios,
+    seeds,
+    building_path: str = DEFAULT_BUILDING_PATH,
+    per_floor=None,
+    max_steps: int = 2000,
+    engines=("dict", "event"),
+    verbose: bool = True,
+):
+    """
+    시나리오별로 두 엔진을 같은 seed 로 실행하고 통계 비교 결과를 반환.
+
+    반환: {scenario: {"runs": {engine: [run, ...]}, "summary": {...}}}
+    """
+    base_engine, test_engine = engines
+    building = load_building(building_path)
+    if isinstance(per_floor, int):
+        per_floor = {fl: per_floor for fl in building.get("floors", [])}
+
+    report = {}
+    for scenario in scenarios:
+        runs = {eng: [] for eng in engines}
+        for seed in seeds:
+            for eng in engines:
+                runs[eng].append(_run_once(building, scenario, seed, eng, per_floor, max_steps))
+
+        summary = {}
+        for m in METRICS:
+            a = np.array([r[m] for r in runs[base_engine]], dtype=float)
+            b = np.array([r[m] for r in runs[test_engine]], dtype=float)
+            diff = b - a
+            n = diff.size
+            half = 1.96 * diff.std(ddof=1) / math.sqrt(n) if n > 1 else float("nan")
+            summary[m] = {
+                base_engine: (float(a.mean()), float(a.std(ddof=1)) if n > 1 else 0.0),
+                test_engine: (float(b.mean()), float(b.std(ddof=1)) if n > 1 else 0.0),
+                "diff_mean": float(diff.mean()),
+                "diff_ci95": (float(diff.mean() - half), float(diff.mean() + half)),
+                "rel_diff": float(diff.mean() / a.mean()) if a.mean() else float("nan"),
+            }
+
+        pooled_a = np.concatenate([r["done_times"] for r in runs[base_engine]])
+        pooled_b = np.concatenate([r["done_times"] for r in runs[test_engine]])
+        summary["ks"] = ks_2samp(pooled_a, pooled_b)
+        summary["elapsed_s"] = {
+            eng: float(sum(r["elapsed_s"] for r in runs[eng])) for eng in engines
+        }
+        summary["reroute_events"] = {
+            eng: float(np.mean([r["reroute_events"] for r in runs[eng]])) for eng in engines
+        }
+
+        report[scenario] = {"runs": runs, "summary": summary}
+        if verbose:
+            _print_summary(scenario, summary, engines, len(seeds))
+    return report
+
+
+def _print_summary(scenario, summary, engines, n_seeds):
+    base_engine, test_engine = engines
+    print("=" * 70)
+    print(f"[Scenario] {scenario}  (seeds={n_seeds}, {base_engine} vs {test_engine})")
+    for m in METRICS:
+        st = summary[m]
+        a_mean, a_std = st[base_engine]
+        b_mean, b_std = st[test_engine]
+        lo, hi = st["diff_ci95"]
+        print(
+            f"  {m:>4}: {base_engine}={a_mean:7.1f}±{a_std:5.1f}  {test_engine}={b_mean:7.1f}±{b_std:5.1f}  "
+            f"diff={st['diff_mean']:+6.1f}s [{lo:+.1f}, {hi:+.1f}] ({st['rel_diff'] * 100:+.1f}%)"
+        )
+    d, p = summary["ks"]
+    print(f"  KS (pooled done_times): D={d:.3f}, p={p:.3g}")
+    rr = summary["reroute_events"]
+    print(f"  reroute events (mean): {base_engine}={rr[base_engine]:.1f}, {test_engine}={rr[test_engine]:.1f}")
+    el = summary["elapsed_s"]
+    speedup = el[base_engine] / el[test_engine] if el[test_engine] > 0 else float("nan")
+    print(f"  runtime: {base_engine}={el[base_engine]:.2f}s, {test_engine}={el[test_engine]:.2f}s (x{speedup:.2f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="tick 엔진 vs 이산 사건 엔진 통계 비교")
+    parser.add_argument("--scenarios", nargs="+", default=["s1", "s9", "s10", "s11"])
+    parser.add_argument("--seeds", nargs="+", type=int, default=[1, 2, 3, 4, 5])
+    parser.add_argument("--per-floor", type=int, default=200)
+    parser.add_argument("--max-steps", type=int, default=2000)
+    parser.add_argument("--building", default=DEFAULT_BUILDING_PATH)
+    parser.add_argument("--engines", nargs=2, default=["dict", "event"])
+    args = parser.parse_args()
+
+    compare_engines(
+        args.scenarios,
+        args.seeds,
+        building_path=args.building,
+        per_floor=args.per_floor,
+        max_steps=args.max_steps,
+        engines=tuple(args.engines),
+    )
+
+
+if __name__ == "__main__":
+    main()
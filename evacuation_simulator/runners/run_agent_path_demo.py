@@ -30,10 +30,18 @@ def get_agent_paths_with_history(
     max_steps: int = 2000,
     dt: float = 1.0,
     rng_seed: int = 42,
+    engine: str = "dict",
+    routing: str = "astar",
+    building=None,
+    astar_cfg=None,
+    reroute_policy=None,
 ):
     """
     단일 에이전트의 초기/최종 경로 + 리라우트 히스토리 + 전체 통계를 모두 계산하는 헬퍼.
 
+    - building: 이미 로드한 building dict (주어지면 building_path 대신 사용, hook 이 직접 수정함)
+    - astar_cfg / reroute_policy: 기본값(DEFAULT_ASTAR_CFG / DEFAULT_REROUTE_POLICY) 대신 사용할 설정
+
     반환 dict 예시:
     {
         "scenario": str,
@@ -75,8 +83,14 @@ def get_agent_paths_with_history(
         "global_reroute_attempts": int,
     }
     """
+    if astar_cfg is None:
+        astar_cfg = DEFAULT_ASTAR_CFG
+    if reroute_policy is None:
+        reroute_policy = DEFAULT_REROUTE_POLICY
+
     # 1) 건물 로드
-    building = load_building(building_path)
+    if building is None:
+        building = load_building(building_path)
     floors = building.get("floors")
 
     # 2) 층별 인원 설정 (기본: 각 층 300명)
@@ -89,7 +103,8 @@ def get_agent_paths_with_history(
         floors=floors,
         per_floor=per_floor,
         rng_seed=rng_seed,
-        astar_cfg=DEFAULT_ASTAR_CFG,
+        astar_cfg=astar_cfg,
+        routing=routing,
     )
 
     if agent_index < 0 or agent_index >= len(agents):
@@ -122,8 +137,9 @@ def get_agent_paths_with_history(
         rng_seed=rng_seed,
         dynamic_hook=dynamic_hook,
         dt=dt,
-        reroute_policy=DEFAULT_REROUTE_POLICY,
-        reroute_cfg=DEFAULT_ASTAR_CFG,
+        reroute_policy=dict(reroute_policy, routing=routing),
+        reroute_cfg=astar_cfg,
+        engine=engine,
     )
 
     # 7) 전체 통계 계산 ------------------------------------------
@@ -290,6 +306,8 @@ def run_demo_full(
     dt: float = 1.0,
     rng_seed: int = 42,
     verbose: bool = True,
+    engine: str = "dict",
+    routing: str = "astar",
 ):
     """
     시각화 없이:
@@ -299,6 +317,8 @@ def run_demo_full(
       - 선택 에이전트의 경로 타임라인(agent_path_timeline)과
         reroute_attempts / reroute_history 모두 result에 포함
       - 출구 통계는 (assigned_exit 기준) + (실제 사용 exit 기준) 둘 다 제공
+      - engine: simulate() 엔진 선택 ("dict" | "soa" | "event")
+      - routing: 경로 계산 방식 ("astar" | "route_table")
     """
     result = get_agent_paths_with_history(
         scenario_name=scenario_name,
@@ -308,6 +328,8 @@ def run_demo_full(
         max_steps=max_steps,
         dt=dt,
         rng_seed=rng_seed,
+        engine=engine,
+        routing=routing,
     )
 
     if verbose:
@@ -0,0 +1,313 @@
+# run_sweep.py
+# - 시나리오 × seed × A* 가중치 × 리라우트 정책 조합을 프로세스 풀로 한 번에 실행
+# - worker 마다 building JSON 은 한 번만 로드하고, 실행마다 deepcopy (hook 이 building 을 수정하므로)
+# - 실행별 t50/t80/t99, 출구별 통계, 리라우트 횟수를 하나의 컬럼형 파일(.npz)로 저장
+#
+# 예)
+#   python run_sweep.py --scenarios s2 s9 s10 --seeds 42 43 44 \
+#       --weights 4,1,1 1,0,0 --stuck-times 10 20 --workers 4 --out sweep.npz
+from __future__ import annotations
+
+import sys
+import os
+import io
+import copy
+import time
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout
+
+import numpy as np
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.append(parent_dir)
+sys.path.append(current_dir)
+
+from core.astar_logic import AStarConfig, load_building
+from scenarios.scenario_fire_pack import (
+    DEFAULT_ASTAR_CFG,
+    DEFAULT_REROUTE_POLICY,
+    SCENARIO_MAP,
+)
+from run_agent_path_demo import get_agent_paths_with_history
+
+DEFAULT_BUILDING_PATH = os.path.join(parent_dir, "config", "mockup_building_with_edges.json")
+
+# worker 프로세스별로 한 번만 로드한 원본 building
+_WORKER_BUILDING = None
+
+
+# =========================================================
+# 조합(grid) 구성
+# =========================================================
+
+def _scenario_hook_name(scenario: str) -> str:
+    """"s2" 같은 SCENARIO_MAP key 를 hook 함수 이름으로 변환 (이미 함수 이름이면 그대로)."""
+    if scenario in SCENARIO_MAP:
+        return SCENARIO_MAP[scenario].dynamic_hook.__name__
+    return scenario
+
+
+def build_sweep_grid(
+    scenarios,
+    seeds=(42,),
+    astar_cfgs=None,
+    reroute_policies=None,
+):
+    """
+    실행할 조합 목록 생성.
+
+    - scenarios: SCENARIO_MAP key("s1".."s12") 또는 scenario_fire_pack hook 이름, "baseline"
+    - astar_cfgs: AStarConfig 리스트 (기본: [DEFAULT_ASTAR_CFG])
+    - reroute_policies: DEFAULT_REROUTE_POLICY 에 덮어쓸 dict 리스트 (기본: [{}])
+
+    반환: worker 로 넘길 task dict 리스트 (pickle 가능한 값만 포함)
+    """
+    astar_cfgs = list(astar_cfgs or [DEFAULT_ASTAR_CFG])
+    reroute_policies = list(reroute_policies or [{}])
+
+    tasks = []
+    for scenario, seed, (cfg_idx, cfg), (pol_idx, pol) in itertools.product(
+        scenarios, seeds, enumerate(astar_cfgs), enumerate(reroute_policies)
+    ):
+        tasks.append(
+            {
+                "scenario": scenario,
+                "hook": _scenario_hook_name(scenario),
+                "seed": int(seed),
+                "cfg_index": cfg_idx,
+                "cfg": cfg,
+                "policy_index": pol_idx,
+                "policy": dict(DEFAULT_REROUTE_POLICY, **pol),
+            }
+        )
+    return tasks
+
+
+# =========================================================
+# worker
+# =========================================================
+
+def _init_worker(building_path: str) -> None:
+    global _WORKER_BUILDING
+    _WORKER_BUILDING = load_building(building_path)
+
+
+def _run_task(task: dict, per_floor=None, max_steps: int = 2000, dt: float = 1.0,
+              engine: str = "dict", routing: str = "astar") -> dict:
+    """task 하나 실행 → 결과 row(dict). 시나리오 hook 의 print 는 버린다."""
+    building = copy.deepcopy(_WORKER_BUILDING)
+    cfg = task["cfg"]
+    policy = task["policy"]
+
+    t0 = time.perf_counter()
+    with redirect_stdout(io.StringIO()):
+        result = get_agent_paths_with_history(
+            scenario_name=task["hook"],
+            building=building,
+            per_floor=per_floor,
+            max_steps=max_steps,
+            dt=dt,
+            rng_seed=task["seed"],
+            engine=engine,
+            routing=routing,
+            astar_cfg=cfg,
+            reroute_policy=policy,
+        )
+    elapsed = time.perf_counter() - t0
+
+    g = result["global_stats"]
+    gr = result["global_reroute"]
+    row = {
+        "scenario": task["scenario"],
+        "seed": task["seed"],
+        "cfg_index": task["cfg_index"],
+        "cfg_name": cfg.name,
+        "length_weight": cfg.length_weight,
+        "congestion_weight": cfg.congestion_weight,
+        "risk_weight": cfg.risk_weight,
+        "policy_index": task["policy_index"],
+        "max_stuck_time": float(policy.get("max_stuck_time", np.nan)),
+        "congestion_threshold": float(policy.get("congestion_threshold", np.nan)),
+        "n_agents": g["n_agents"],
+        "n_finished": g["n_finished"],
+        "t50": g["t50"],
+        "t80": g["t80"],
+        "t99": g["t99"],
+        "reroute_attempts": result["global_reroute_attempts"],
+        "reroute_events": gr["total_events"],
+        "reroute_avg_per_agent": gr["avg_per_agent"],
+        "reroute_max_per_agent": gr["max_per_agent"],
+        "elapsed_s": elapsed,
+    }
+    # 출구별 통계 (실제 사용 exit 기준) → exit_<ID>_count / _t50 / _t80 / _t99
+    for exit_id, st in result["exit_stats_used"].items():
+        for key in ("count", "t50", "t80", "t99"):
+            row[f"exit_{exit_id}_{key}"] = st[key]
+    return row
+
+
+def _run_task_star(args) -> dict:
+    task, kwargs = args
+    return _run_task(task, **kwargs)
+
+
+# =========================================================
+# 결과 저장 (컬럼형)
+# =========================================================
+
+def rows_to_columns(rows):
+    """
+    row dict 리스트 → {컬럼명: np.ndarray}.
+    특정 row 에 없는 출구 컬럼은 count=0, 시간=NaN 으로 채운다.
+    """
+    keys = []
+    for r in rows:
+        for k in r:
+            if k not in keys:
+                keys.append(k)
+
+    columns = {}
+    for k in keys:
+        if k.startswith("exit_"):
+            fill = 0 if k.endswith("_count") else np.nan
+        else:
+            fill = None
+        values = [r.get(k, fill) for r in rows]
+        columns[k] = np.asarray(values)
+    return columns
+
+
+def save_sweep_results(path: str, rows) -> None:
+    """컬럼형 NumPy 아카이브(.npz)로 저장. 컬럼 하나 = 배열 하나."""
+    np.savez_compressed(path, **rows_to_columns(rows))
+
+
+def load_sweep_results(path: str):
+    """save_sweep_results() 로 저장한 파일 → {컬럼명: np.ndarray}"""
+    with np.load(path, allow_pickle=False) as data:
+        return {k: data[k] for k in data.files}
+
+
+# =========================================================
+# 실행
+# =========================================================
+
+def run_sweep(
+    tasks,
+    building_path: str = DEFAULT_BUILDING_PATH,
+    out_path: str | None = "sweep_results.npz",
+    workers: int | None = None,
+    per_floor=None,
+    max_steps: int = 2000,
+    dt: float = 1.0,
+    engine: str = "dict",
+    routing: str = "astar",
+    verbose: bool = True,
+):
+    """
+    tasks(build_sweep_grid 결과)를 프로세스 풀로 실행.
+
+    - workers: 프로세스 수 (None 이면 CPU 수, 1 이면 풀 없이 현재 프로세스에서 실행)
+    - out_path: 결과 .npz 경로 (None 이면 저장하지 않음)
+    - 반환: row dict 리스트 (tasks 순서 유지)
+    """
+    kwargs = {
+        "per_floor": per_floor,
+        "max_steps": max_steps,
+        "dt": dt,
+        "engine": engine,
+        "routing": routing,
+    }
+    jobs = [(t, kwargs) for t in tasks]
+
+    t0 = time.perf_counter()
+    rows = []
+    if workers == 1:
+        _init_worker(building_path)
+        for job in jobs:
+            rows.append(_run_task_star(job))
+            if verbose:
+                _print_row(rows[-1], len(rows), len(jobs))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_worker,
+            initargs=(building_path,),
+        ) as pool:
+            for row in pool.map(_run_task_star, jobs):
+                rows.append(row)
+                if verbose:
+                    _print_row(row, len(rows), len(jobs))
+
+    if out_path:
+        save_sweep_results(out_path, rows)
+    if verbose:
+        print(f"[Sweep] {len(rows)} runs in {time.perf_counter() - t0:.1f}s"
+              + (f" → {out_path}" if out_path else ""))
+    return rows
+
+
+def _print_row(row: dict, i: int, n: int) -> None:
+    print(
+        f"[{i}/{n}] {row['scenario']} seed={row['seed']} cfg={row['cfg_name']} "
+        f"policy={row['policy_index']} t50={row['t50']:.1f}s t80={row['t80']:.1f}s "
+        f"t99={row['t99']:.1f}s reroutes={row['reroute_events']} ({row['elapsed_s']:.1f}s)"
+    )
+
+
+def _parse_weights(text: str) -> AStarConfig:
+    """"4,1,1" → AStarConfig(length, congestion, risk)"""
+    lw, cw, rw = (float(x) for x in text.split(","))
+    return AStarConfig(name=f"w{text}", length_weight=lw, congestion_weight=cw, risk_weight=rw)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="시나리오 sweep (프로세스 풀)")
+    parser.add_argument("--scenarios", nargs="+", default=list(SCENARIO_MAP.keys()),
+                        help="SCENARIO_MAP key 또는 hook 이름 (기본: s1..s12 전부)")
+    parser.add_argument("--seeds", nargs="+", type=int, default=[42])
+    parser.add_argument("--weights", nargs="+", default=None,
+                        help="A* 가중치 length,congestion,risk (예: 4,1,1 1,0,0)")
+    parser.add_argument("--stuck-times", nargs="+", type=float, default=None,
+                        help="reroute policy max_stuck_time 후보")
+    parser.add_argument("--cong-thresholds", nargs="+", type=float, default=None,
+                        help="reroute policy congestion_threshold 후보")
+    parser.add_argument("--per-floor", type=int, default=None, help="층별 인원 (기본: 900)")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", default="dict", choices=["dict", "soa", "event"])
+    parser.add_argument("--routing", default="astar")
+    parser.add_argument("--building", default=DEFAULT_BUILDING_PATH)
+    parser.add_argument("--out", default="sweep_results.npz")
+    args = parser.parse_args()
+
+    astar_cfgs = [_parse_weights(w) for w in args.weights] if args.weights else None
+
+    stuck_times = args.stuck_times or [DEFAULT_REROUTE_POLICY["max_stuck_time"]]
+    thresholds = args.cong_thresholds or [DEFAULT_REROUTE_POLICY["congestion_threshold"]]
+    policies = [
+        {"max_stuck_time": st, "congestion_threshold": th}
+        for st, th in itertools.product(stuck_times, thresholds)
+    ]
+
+    building = load_building(args.building)
+    per_floor = None
+    if args.per_floor is not None:
+        per_floor = {fl: args.per_floor for fl in building.get("floors", [])}
+
+    tasks = build_sweep_grid(args.scenarios, args.seeds, astar_cfgs, policies)
+    run_sweep(
+        tasks,
+        building_path=args.building,
+        out_path=args.out,
+        workers=args.workers,
+        per_floor=per_floor,
+        engine=args.engine,
+        routing=args.routing,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,16 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
+from typing import Dict, Optional
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import hashlib
 import io
 import sys
 import os
+import time
+import uuid
 from contextlib import redirect_stdout
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -10,33 +18,259 @@ parent_dir = os.path.dirname(current_dir)
 sys.path.append(parent_dir)
 
 from run_agent_path_demo import run_demo_full
+from core import metrics
+
+DEFAULT_BUILDING_PATH = os.path.join(parent_dir, "config", "mockup_building_with_edges.json")
+
+# 시뮬레이션 프로세스 풀 크기 / 대기 가능한 작업 수 / 보관할 결과 수
+SIM_MAX_WORKERS = int(os.environ.get("SIM_MAX_WORKERS", "2"))
+SIM_MAX_PENDING = int(os.environ.get("SIM_MAX_PENDING", "16"))
+SIM_CACHE_SIZE = int(os.environ.get("SIM_CACHE_SIZE", "64"))
+SIM_MAX_JOBS = int(os.environ.get("SIM_MAX_JOBS", "256"))
 
 app = FastAPI()
 
+# 요청 / 작업 단위 계측 (시뮬레이션 단계별 시간은 worker 가 돌려준 snapshot 을 합침)
+JOB_SECONDS = metrics.histogram("sim_job_seconds", "시뮬레이션 작업 실행 시간 (제출 → 완료)",
+                                buckets=metrics.RUN_BUCKETS)
+_counts = {"submitted": 0, "cache_hits": 0, "inflight_hits": 0, "rejected": 0, "errors": 0}
+metrics.counter("sim_jobs_submitted_total", "프로세스 풀에 제출한 작업 수", lambda: _counts["submitted"])
+metrics.counter("sim_cache_hits_total", "결과 캐시로 바로 응답한 요청 수", lambda: _counts["cache_hits"])
+metrics.counter("sim_inflight_hits_total", "실행 중인 같은 작업에 합류한 요청 수", lambda: _counts["inflight_hits"])
+metrics.counter("sim_jobs_rejected_total", "대기열이 가득 차서 503 으로 거절한 요청 수", lambda: _counts["rejected"])
+metrics.counter("sim_job_errors_total", "실패한 작업 수", lambda: _counts["errors"])
+metrics.gauge("sim_jobs_inflight", "실행 중인 작업 수", lambda: len(_inflight))
+metrics.gauge("sim_result_cache_size", "결과 캐시 항목 수", lambda: len(_result_cache))
+
 class SimulationRequest(BaseModel):
     scenario_name: str
-    agent_index: int = 800 
+    agent_index: int = 800
+    rng_seed: int = 42
+    per_floor: Optional[Dict[str, int]] = None
+
+
+def _run_simulation_job(scenario_name: str, agent_index: int, rng_seed: int,
+                        per_floor, building_path: str) -> tuple:
+    """
+    worker 프로세스에서 실행. stdout 캡처는 프로세스마다 독립이므로
+    동시에 여러 요청이 들어와도 출력이 섞이지 않는다.
+    반환: (출력 텍스트, 이 작업의 metrics snapshot) - 서버가 snapshot 을 자기 registry 에 합친다
+    """
+    # worker 프로세스는 재사용되므로 이전 작업 계측값은 비우고 시작
+    metrics.REGISTRY.reset()
+    f = io.StringIO()
+    with redirect_stdout(f):
+        run_demo_full(
+            scenario_name=scenario_name,
+            agent_index=agent_index,
+            building_path=building_path,
+            per_floor=per_floor,
+            rng_seed=rng_seed,
+            verbose=True
+        )
+    return f.getvalue(), (metrics.REGISTRY.snapshot() if metrics.ENABLED else None)
+
+
+# --------------------------------------------------------
+# 작업 큐 / 결과 캐시
+# --------------------------------------------------------
+
+_pool: Optional[ProcessPoolExecutor] = None
+_jobs: "OrderedDict[str, dict]" = OrderedDict()         # job_id -> 작업 상태
+_inflight: Dict[tuple, str] = {}                         # cache key -> 실행 중 job_id
+_result_cache: "OrderedDict[tuple, str]" = OrderedDict() # cache key -> 출력 텍스트 (LRU)
+_building_hash_cache: Dict[str, tuple] = {}              # path -> (mtime, sha256)
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=SIM_MAX_WORKERS)
+    return _pool
+
+
+def _building_hash(path: str) -> str:
+    mtime = os.path.getmtime(path)
+    cached = _building_hash_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+    with open(path, "rb") as fp:
+        digest = hashlib.sha256(fp.read()).hexdigest()
+    _building_hash_cache[path] = (mtime, digest)
+    return digest
+
+
+def _cache_key(req: SimulationRequest) -> tuple:
+    # agent_index 도 출력(선택 에이전트 경로)에 영향을 주므로 key 에 포함
+    per_floor = tuple(sorted(req.per_floor.items())) if req.per_floor else None
+    return (
+        req.scenario_name,
+        req.rng_seed,
+        per_floor,
+        _building_hash(DEFAULT_BUILDING_PATH),
+        req.agent_index,
+    )
+
+
+def _new_job(key: tuple, status: str) -> dict:
+    job_id = uuid.uuid4().hex
+    job = {
+        "job_id": job_id,
+        "key": key,
+        "status": status,   # running | done | error
+        "result": None,
+        "error": None,
+        "cached": False,
+        "created": time.time(),
+        "finished": None,
+        "event": asyncio.Event(),
+    }
+    _jobs[job_id] = job
+    # 오래된 완료 작업부터 정리
+    while len(_jobs) > SIM_MAX_JOBS:
+        old_id = next((j for j, v in _jobs.items() if v["status"] in ("done", "error")), None)
+        if old_id is None:
+            break
+        del _jobs[old_id]
+    return job
+
+
+def _job_view(job: dict) -> dict:
+    out = {
+        "job_id": job["job_id"],
+        "status": job["status"],
+        "cached": job["cached"],
+    }
+    if job["finished"] is not None:
+        out["elapsed_s"] = round(job["finished"] - job["created"], 3)
+    if job["status"] == "done":
+        out["result"] = job["result"]
+    if job["status"] == "error":
+        out["error"] = job["error"]
+    return out
+
+
+def _finish_job(job: dict, fut: "asyncio.Future") -> None:
+    _inflight.pop(job["key"], None)
+    job["finished"] = time.time()
+    exc = RuntimeError("cancelled") if fut.cancelled() else fut.exception()
+    if metrics.ENABLED:
+        JOB_SECONDS.observe(job["finished"] - job["created"])
+    if exc is not None:
+        _counts["errors"] += 1
+        job["status"] = "error"
+        job["error"] = str(exc)
+    else:
+        output, snapshot = fut.result()
+        metrics.REGISTRY.merge(snapshot)
+        job["status"] = "done"
+        job["result"] = output
+        _result_cache[job["key"]] = job["result"]
+        _result_cache.move_to_end(job["key"])
+        while len(_result_cache) > SIM_CACHE_SIZE:
+            _result_cache.popitem(last=False)
+    job["event"].set()
+
+
+def _get_job(job_id: str) -> dict:
+    job = _jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"job '{job_id}' not found")
+    return job
+
 
 @app.post("/simulate")
 async def run_simulation(req: SimulationRequest):
     """
     Flutter 앱에서 호출하는 API.
+    시뮬레이션을 프로세스 풀에 넣고 job_id 를 바로 돌려준다.
+    - 같은 (scenario_name, rng_seed, per_floor, building hash) 결과가 캐시에 있으면 즉시 done
+    - 같은 조건으로 실행 중인 작업이 있으면 그 job_id 를 돌려준다
     """
     try:
-        f = io.StringIO()
-        
-        with redirect_stdout(f):
-            run_demo_full(
-                scenario_name=req.scenario_name,
-                agent_index=req.agent_index,
-                verbose=True 
-            )
-        output_text = f.getvalue()
-        return {"result": output_text}
-
-    except Exception as e:
+        key = _cache_key(req)
+    except OSError as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    cached = _result_cache.get(key)
+    if cached is not None:
+        _result_cache.move_to_end(key)
+        _counts["cache_hits"] += 1
+        job = _new_job(key, "done")
+        job["result"] = cached
+        job["cached"] = True
+        job["finished"] = job["created"]
+        job["event"].set()
+        return _job_view(job)
+
+    inflight_id = _inflight.get(key)
+    if inflight_id is not None and inflight_id in _jobs:
+        _counts["inflight_hits"] += 1
+        return _job_view(_jobs[inflight_id])
+
+    if len(_inflight) >= SIM_MAX_PENDING:
+        _counts["rejected"] += 1
+        raise HTTPException(status_code=503, detail="simulation queue is full")
+
+    job = _new_job(key, "running")
+    _inflight[key] = job["job_id"]
+
+    loop = asyncio.get_running_loop()
+    fut = loop.run_in_executor(
+        _get_pool(),
+        _run_simulation_job,
+        req.scenario_name,
+        req.agent_index,
+        req.rng_seed,
+        req.per_floor,
+        DEFAULT_BUILDING_PATH,
+    )
+    fut.add_done_callback(lambda f, job=job: _finish_job(job, f))
+    _counts["submitted"] += 1
+    return _job_view(job)
+
+
+@app.get("/simulate/{job_id}")
+async def get_simulation(job_id: str):
+    """작업 상태 조회 (done 이면 result 포함)"""
+    return _job_view(_get_job(job_id))
+
+
+@app.get("/simulate/{job_id}/stream")
+async def stream_simulation(job_id: str):
+    """작업이 끝날 때까지 기다렸다가 출력 텍스트를 줄 단위로 스트리밍"""
+    job = _get_job(job_id)
+
+    async def body():
+        await job["event"].wait()
+        if job["status"] == "error":
+            yield f"[error] {job['error']}\n"
+            return
+        for line in job["result"].splitlines(keepends=True):
+            yield line
+
+    return StreamingResponse(body(), media_type="text/plain; charset=utf-8")
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Prometheus text exposition.
+    - sim_step_phase_seconds{engine, phase}: simulate() tick 단계별 시간 (worker 에서 측정)
+    - sim_run_seconds: simulate() 한 번, sim_job_seconds: 작업 제출 → 완료
+    """
+    if not metrics.ENABLED:
+        raise HTTPException(status_code=404, detail="metrics disabled (SIM_METRICS=0)")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.on_event("shutdown")
+def _shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
+    uvicorn.run("server:app", host="0.0.0.0", port=8000, reload=True)
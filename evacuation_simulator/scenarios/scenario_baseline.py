@@ -6,7 +6,7 @@ from typing import List, Dict, Optional
 
 import sys
 sys.path.append("..")  # 부모 디렉토리를 PYTHONPATH에 추가
-from core.astar_logic import AStarConfig, build_graph, astar_path
+from core.astar_logic import AStarConfig, RouteTable, build_graph, astar_path
 
 
 SCENARIO_ID = "baseline_F1_F2_F3_uniform"
@@ -19,12 +19,15 @@ def build_agents(
     rng_seed: Optional[int] = 42,
     astar_cfg: Optional[AStarConfig] = None,
     grouping_params: Optional[dict] = None,
+    routing: str = "astar",
 ) -> List[dict]:
     """
     - floors 에 지정된 각 층(F1, F2, F3)에 대해 room 목록을 찾고,
     - 층마다 n_agents_per_floor 명을 room에 균등 랜덤 분포
     - room별로 A* 경로 한 번씩 계산해서 path 공유
     - grouping_params 로 그룹핑(같은 방 사람끼리 그룹 등) 옵션 제공
+    - routing="route_table" / "incremental" 이면 room별 A* 대신
+      SUPER_EXIT 기준 최단경로 트리(RouteTable)에서 경로 조회 (초기 그래프는 고정이라 둘은 같음)
 
     grouping_params 예시:
       {
@@ -49,6 +52,7 @@ def build_agents(
 
     graph, node_by_id = build_graph(building, astar_cfg)
     goal_id = "SUPER_EXIT"
+    route_table = RouteTable(graph, goal_id) if routing != "astar" else None
 
     # ===== 2) 그루핑 파라미터 =====
     grouping_params = grouping_params or {}
@@ -89,7 +93,10 @@ def build_agents(
         for room_id, cnt in room_pop.items():
             if cnt == 0:
                 continue
-            path = astar_path(graph, node_by_id, room_id, goal_id)
+            if route_table is not None:
+                path = route_table.path_from(room_id)
+            else:
+                path = astar_path(graph, node_by_id, room_id, goal_id, building=building)
             room_paths[room_id] = path
 
         # 4) agents 생성 (+ 그룹 id 부여)
@@ -9,7 +9,8 @@ from types import SimpleNamespace
 import sys
 sys.path.append("..")  # 부모 디렉토리를 PYTHONPATH에 추가
 
-from core.astar_logic import AStarConfig
+from core.astar_logic import AStarConfig, mark_topology_changed, mark_costs_changed
+from core.compiled_building import get_compiled
 from .scenario_baseline import build_agents as baseline_build_agents
 
 
@@ -41,6 +42,7 @@ def build_agents_with_floor_split(
     rng_seed: int = 42,
     astar_cfg: AStarConfig | None = None,
     grouping_params: dict | None = None,
+    routing: str = "astar",
 ) -> List[dict]:
     """
     per_floor = {"F1":300,"F2":300,"F3":300} 이런 식으로 층별 인원 지정
@@ -57,6 +59,7 @@ def build_agents_with_floor_split(
             rng_seed=rng_seed,
             astar_cfg=astar_cfg,
             grouping_params=grouping_params,
+            routing=routing,
         )
         agents.extend(sub_agents)
     return agents
@@ -67,11 +70,12 @@ def build_agents_with_floor_split(
 # =========================================================
 
 def _iter_edges_touching(building: dict, node_id: str):
-    for e in building.get("edges", []):
+    cb = get_compiled(building)
+    for i in cb.incident_edges(node_id):
+        e = cb.edge_dicts[i]
         if e.get("state", "open") != "open":
             continue
-        if e["node_a"] == node_id or e["node_b"] == node_id:
-            yield e
+        yield e
 
 
 def close_node(building: dict, node_id: str):
@@ -79,12 +83,20 @@ def close_node(building: dict, node_id: str):
     화재 노드 자체는 통행 불가 → closed 처리
     (노드 + 그 노드와 연결된 edge 전부)
     """
+    changed_nodes = []
+    changed_edges = []
     for n in building.get("nodes", []):
-        if n["id"] == node_id:
+        if n["id"] == node_id and n.get("state", "open") != "closed":
             n["state"] = "closed"
-    for e in building.get("edges", []):
-        if e["node_a"] == node_id or e["node_b"] == node_id:
+            changed_nodes.append(node_id)
+    cb = get_compiled(building)
+    for i in cb.incident_edges(node_id):
+        e = cb.edge_dicts[i]
+        if e.get("state", "open") != "closed":
             e["state"] = "closed"
+            changed_edges.append(e)
+    if changed_nodes or changed_edges:
+        mark_topology_changed(building, nodes=changed_nodes, edges=changed_edges)
 
 
 def increase_risk_around_node(building: dict, node_id: str, risk_value: float):
@@ -92,10 +104,16 @@ def increase_risk_around_node(building: dict, node_id: str, risk_value: float):
     화재 노드 주변(연결된 엣지)에 risk 부여
     - 엣지 dict에 e["risk"] 필드를 설정
     """
+    changed_edges = []
     for e in _iter_edges_touching(building, node_id):
         # 이미 더 큰 risk가 있으면 유지
         old = float(e.get("risk", 0.0))
-        e["risk"] = max(old, risk_value)
+        new = max(old, risk_value)
+        if new != e.get("risk"):
+            changed_edges.append(e)
+        e["risk"] = new
+    if changed_edges:
+        mark_costs_changed(building, edges=changed_edges)
 
 
 def set_fire(building: dict, node_id: str, risk_value: float = 5.0):
@@ -225,7 +243,8 @@ def _wrap(
     if floor_split is None:
         # baseline과 동일: 각 층 n_agents_per_floor를 그대로 사용
         def build_agents(building, floors=None, n_agents_per_floor=900,
-                         rng_seed=42, astar_cfg=None, grouping_params=None):
+                         rng_seed=42, astar_cfg=None, grouping_params=None,
+                         routing="astar"):
             return baseline_build_agents(
                 building=building,
                 floors=floors,
@@ -233,11 +252,13 @@ def _wrap(
                 rng_seed=rng_seed,
                 astar_cfg=astar_cfg,
                 grouping_params=grouping_params,
+                routing=routing,
             )
     else:
         # 층별 분포 고정 버전
         def build_agents(building, floors=None, n_agents_per_floor=0,
-                         rng_seed=42, astar_cfg=None, grouping_params=None):
+                         rng_seed=42, astar_cfg=None, grouping_params=None,
+                         routing="astar"):
             if floors is None:
                 floors_use = ["F1", "F2", "F3"]
             else:
@@ -249,6 +270,7 @@ def _wrap(
                 rng_seed=rng_seed,
                 astar_cfg=astar_cfg,
                 grouping_params=grouping_params,
+                routing=routing,
             )
 
     return SimpleNamespace(
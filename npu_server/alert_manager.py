@@ -1,43 +1,136 @@
-import subprocess
-import sys
+import queue
+import threading
 import time
 
+from fire_alert import AlertLog, trigger_alert
+import metrics
+
+
+SEVERITY_RANK = {'trivial': 0, 'moderate': 1, 'severe': 2}
+
+TRIGGER_SECONDS = metrics.histogram('npu_alert_trigger_seconds', '알림 발동 처리 시간 (요청 스레드)')
+DELIVER_SECONDS = metrics.histogram('npu_alert_deliver_seconds', '알림 묶음 출력 / 로그 기록 시간 (worker 스레드)')
+
 
 class AlertManager:
+    """
+    화재 알림 관리자
+
+    - 알림은 큐에 넣고 백그라운드 worker 스레드 하나가 처리 (요청 스레드는 기다리지 않음)
+    - worker 는 큐에 쌓인 알림을 stream 별로 병합 (가장 높은 심각도 + 최신 정보 + 건수)
+    - 로그 파일은 열어둔 채로 쓰고, 처리한 묶음마다 flush
+    - close() 에서 남은 알림을 처리하고 스레드 / 파일을 정리
+    """
     
-    def __init__(self, script_path, cooldown=30):
-        self.script_path = script_path
+    def __init__(self, log_path="fire_alerts.log", cooldown=30, queue_size=64):
         self.cooldown = cooldown
         
         self.last_alert_time = 0
         self.alert_count = 0
         self.active = False
+        
+        self.delivered = 0
+        self.coalesced = 0
+        self.dropped = 0
+        
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._log = AlertLog(log_path)
+        
+        self._thread = threading.Thread(target=self._worker, name="alert-worker", daemon=True)
+        self._thread.start()
     
-    def trigger(self, severity, detections_info):
+    @metrics.timed(TRIGGER_SECONDS)
+    def trigger(self, severity, detections_info, session=None):
         current_time = time.time()
         
-        if current_time - self.last_alert_time < self.cooldown:
-            return False
+        # cooldown 은 stream 별 (session 이 없으면 전체 기준)
+        state = session if session is not None else self
+        with self._lock:
+            if current_time - state.last_alert_time < self.cooldown:
+                return False
+            # 동시에 들어온 같은 stream 알림이 중복 발동하지 않도록 먼저 예약
+            previous = state.last_alert_time
+            state.last_alert_time = current_time
         
+        stream_id = session.stream_id if session is not None else None
         try:
-            print(f"화재 알림 발동! 심각도: {severity}")
-            
-            subprocess.Popen([
-                sys.executable,
-                self.script_path,
-                severity,
-                str(detections_info)
-            ])
+            self._queue.put_nowait((severity, dict(detections_info), stream_id))
+        except queue.Full:
+            # 버린 알림이 cooldown 을 쓰지 않도록 되돌림 (다음 위험 프레임에서 다시 시도)
+            with self._lock:
+                if state.last_alert_time == current_time:
+                    state.last_alert_time = previous
+            self.dropped += 1
+            print(f"알림 큐 가득 참 - 알림 버림 (stream: {stream_id})")
+            return False
+        
+        print(f"화재 알림 발동! 심각도: {severity}" + (f" (stream: {stream_id})" if stream_id else ""))
+        
+        state.active = True
+        if session is not None:
+            session.alert_count += 1
+        
+        self.last_alert_time = current_time
+        self.alert_count += 1
+        self.active = True
+        
+        return True
+    
+    def _drain(self, first):
+        # 지금 큐에 있는 알림을 모두 꺼내 stream 별로 병합. 반환: (병합 결과, 종료 신호 여부)
+        pending = {}
+        item = first
+        while True:
+            severity, info, stream_id = item
+            merged = pending.get(stream_id)
+            if merged is None:
+                pending[stream_id] = [severity, info, 1]
+            else:
+                if SEVERITY_RANK.get(severity, 0) >= SEVERITY_RANK.get(merged[0], 0):
+                    merged[0] = severity
+                merged[1] = info
+                merged[2] += 1
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return pending, False
+            if item is None:
+                return pending, True
+    
+    def _worker(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
             
-            self.last_alert_time = current_time
-            self.alert_count += 1
-            self.active = True
+            pending, stopping = self._drain(item)
             
-            return True
-        
-        except Exception as e:
-            print(f"알림 스크립트 실행 오류: {e}")
-            return False
+            with DELIVER_SECONDS.time():
+                for stream_id, (severity, info, count) in pending.items():
+                    try:
+                        trigger_alert(severity, info, stream_id, log=self._log, count=count)
+                    except Exception as e:
+                        print(f"알림 처리 오류: {e}")
+                    self.delivered += 1
+                    self.coalesced += count - 1
+                
+                self._log.flush()
+    
+    def get_stats(self):
+        return {
+            'alert_count': self.alert_count,
+            'delivered': self.delivered,
+            'coalesced': self.coalesced,
+            'dropped': self.dropped,
+            'queue_size': self._queue.qsize()
+        }
+    
+    def close(self):
+        self._queue.put(None)
+        self._thread.join(timeout=5.0)
+        self._log.close()
     
     def reset(self):
         self.active = False
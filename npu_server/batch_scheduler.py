@@ -0,0 +1,184 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+import metrics
+
+
+INFER_SECONDS = metrics.histogram('npu_infer_batch_seconds', 'NPU 배치 추론 시간 (배치 텐서 복사 포함)')
+WAIT_SECONDS = metrics.histogram('npu_infer_wait_seconds', '프레임이 배치에 들어가기까지 대기 시간')
+BATCH_SIZE = metrics.histogram('npu_infer_batch_size', '배치 크기', buckets=(1, 2, 3, 4, 6, 8, 16))
+
+
+class BatchScheduler:
+    """
+    여러 요청 스레드의 프레임을 모아서 한 번에 추론하는 마이크로 배치 스케줄러
+
+    - 첫 프레임이 들어온 뒤 max_wait 초 동안 또는 max_batch 개가 찰 때까지 모은다
+    - 모은 프레임은 (N, H, W, C) 텐서 하나로 infer_fn 에 넘긴다
+    - infer_fn 은 이 스케줄러 스레드에서만 호출되므로 NPU 엔진 접근이 직렬화된다
+    """
+
+    def __init__(self, infer_fn, max_batch=4, max_wait=0.005, queue_depth=32):
+        """
+        Args:
+            infer_fn: (N, H, W, C) 배열 → 프레임별 출력 리스트(길이 N)
+            max_batch (int): 배치 최대 크기
+            max_wait (float): 배치를 모으는 최대 대기 시간 (초)
+            queue_depth (int): 대기열 최대 길이 (초과 시 submit 이 queue.Full)
+        """
+        self.infer_fn = infer_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait))
+
+        self._queue = queue.Queue(maxsize=queue_depth)
+        self._running = True
+
+        # (max_batch, H, W, C) 배치 텐서. 첫 배치의 shape / dtype 으로 한 번만 할당
+        self._batch_buf = None
+
+        self.total_batches = 0
+        self.total_frames = 0
+        self.max_batch_seen = 0
+        self.total_wait = 0.0
+        self.total_infer = 0.0
+        self.max_infer = 0.0
+
+        self._thread = threading.Thread(target=self._loop, name="npu-batch", daemon=True)
+        self._thread.start()
+
+    def submit(self, input_data, timeout=None, release=None):
+        """
+        전처리된 프레임 하나(H, W, C)를 넣고 추론 결과를 기다린다.
+        대기열이 가득 차 있으면 queue.Full 을 그대로 올린다.
+        """
+        return self.submit_async(input_data, release=release).result(timeout=timeout)
+
+    def submit_async(self, input_data, block=False, release=None):
+        """
+        submit() 의 비동기 버전. 추론이 끝나면 완료되는 Future 를 돌려준다.
+        block=True 면 대기열에 자리가 날 때까지 기다린다 (파이프라인 내부 backpressure).
+        release 가 있으면 input_data 를 배치 텐서로 복사한 직후 release(input_data) 를 호출한다
+        (전처리 버퍼 재사용용).
+        """
+        future = Future()
+        if not self._running:
+            future.set_exception(RuntimeError("scheduler stopped"))
+            return future
+        self._queue.put((input_data, future, time.perf_counter(), release), block=block)
+        return future
+
+    def queue_size(self):
+        return self._queue.qsize()
+
+    def get_stats(self):
+        return {
+            'batches': self.total_batches,
+            'batched_frames': self.total_frames,
+            'avg_batch_size': self.total_frames / max(self.total_batches, 1),
+            'max_batch_size': self.max_batch_seen,
+            'queue_size': self.queue_size(),
+            'queue_depth': self._queue.maxsize,
+            'avg_wait_ms': self.total_wait / max(self.total_frames, 1) * 1000.0,
+            'avg_infer_ms': self.total_infer / max(self.total_batches, 1) * 1000.0,
+            'max_infer_ms': self.max_infer * 1000.0,
+        }
+
+    def stop(self):
+        self._running = False
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout=1.0)
+        self._fail_pending()
+
+    def _fail_pending(self):
+        # 추론되지 못한 대기 프레임: future 를 실패로 끝내서 result() 대기 / done callback 이 바로 풀리게 한다
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if item is None:
+                continue
+            data, future, _, release = item
+            if release is not None:
+                release(data)
+            future.set_exception(RuntimeError("scheduler stopped"))
+
+    def _collect(self):
+        try:
+            first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            return []
+        if first is None:
+            return []
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _fill_batch(self, batch):
+        first = batch[0][0]
+        buf = self._batch_buf
+        if buf is None or buf.shape[1:] != first.shape or buf.dtype != first.dtype:
+            buf = np.empty((self.max_batch,) + first.shape, dtype=first.dtype)
+            self._batch_buf = buf
+
+        for i, (data, _, _, release) in enumerate(batch):
+            np.copyto(buf[i], data)
+            if release is not None:
+                release(data)
+        return buf[:len(batch)]
+
+    def _loop(self):
+        while self._running:
+            batch = self._collect()
+            if not batch:
+                continue
+
+            t0 = time.perf_counter()
+            futures = [f for _, f, _, _ in batch]
+            outputs, error = None, None
+            try:
+                inputs = self._fill_batch(batch)
+                outputs = self.infer_fn(inputs)
+            except Exception as e:
+                print(f"배치 추론 오류: {e}")
+                error = e
+
+            elapsed = time.perf_counter() - t0
+            if metrics.ENABLED:
+                INFER_SECONDS.observe(elapsed)
+                BATCH_SIZE.observe(len(batch))
+                for _, _, t, _ in batch:
+                    WAIT_SECONDS.observe(t0 - t)
+            self.total_wait += sum(t0 - t for _, _, t, _ in batch)
+            self.total_infer += elapsed
+            self.max_infer = max(self.max_infer, elapsed)
+            self.total_batches += 1
+            self.total_frames += len(batch)
+            self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+            # done callback (다음 stage 로 넘기기) 은 여기서 실행된다
+            for i, f in enumerate(futures):
+                if error is not None:
+                    f.set_exception(error)
+                else:
+                    f.set_result(outputs[i])
@@ -0,0 +1,108 @@
+"""
+전처리 벤치마크: legacy (프레임마다 새 배열) vs fused (미리 할당한 버퍼)
+
+모드마다 별도 프로세스에서 실행해서 peak RSS 를 따로 잰다.
+
+    python3 bench_preprocess.py --frames 500 --width 1280 --height 720
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+import numpy as np
+
+MODES = [
+    ('legacy', 'float32'),
+    ('fused', 'float32'),
+    ('legacy', 'uint8'),
+    ('fused', 'uint8'),
+]
+
+
+def _legacy(frame, input_size, dtype):
+    input_frame = cv2.resize(frame, (input_size, input_size))
+    input_frame = cv2.cvtColor(input_frame, cv2.COLOR_BGR2RGB)
+    if dtype == 'uint8':
+        return input_frame
+    input_data = np.expand_dims(input_frame, axis=0).astype(np.float32) / 255.0
+    return input_data[0]
+
+
+def run_worker(mode, dtype, frames, width, height, input_size):
+    from preprocess import FramePreprocessor
+
+    rng = np.random.default_rng(0)
+    sources = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(4)]
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    if mode == 'fused':
+        pre = FramePreprocessor(input_size=input_size, dtype=dtype, pool_size=2)
+        fn = pre
+        release = pre.release
+    else:
+        fn = lambda f: _legacy(f, input_size, dtype)
+        release = None
+
+    # 배치 스케줄러처럼 결과를 배치 버퍼로 복사한 뒤 release
+    batch_buf = np.empty((input_size, input_size, 3), dtype=dtype)
+
+    for i in range(10):
+        out = fn(sources[i % len(sources)])
+        np.copyto(batch_buf, out)
+        if release is not None:
+            release(out)
+
+    t0 = time.perf_counter()
+    for i in range(frames):
+        out = fn(sources[i % len(sources)])
+        np.copyto(batch_buf, out)
+        if release is not None:
+            release(out)
+    elapsed = time.perf_counter() - t0
+
+    rss_after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        'mode': mode,
+        'dtype': dtype,
+        'fps': frames / elapsed,
+        'ms_per_frame': elapsed / frames * 1000.0,
+        'peak_rss_mb': rss_after / 1024.0,
+        'rss_growth_mb': (rss_after - rss_before) / 1024.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전처리 벤치마크 (legacy vs fused)")
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--width', type=int, default=1280)
+    parser.add_argument('--height', type=int, default=720)
+    parser.add_argument('--input-size', type=int, default=640)
+    parser.add_argument('--worker', nargs=2, metavar=('MODE', 'DTYPE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args.worker[0], args.worker[1], args.frames,
+                            args.width, args.height, args.input_size)
+        print(json.dumps(result))
+        return
+
+    print(f"입력 {args.width}x{args.height} → {args.input_size}x{args.input_size}, {args.frames} 프레임")
+    print(f"{'mode':<8} {'dtype':<8} {'fps':>8} {'ms/frame':>9} {'peak RSS':>10} {'RSS 증가':>9}")
+    for mode, dtype in MODES:
+        out = subprocess.run(
+            [sys.executable, __file__, '--worker', mode, dtype,
+             '--frames', str(args.frames), '--width', str(args.width),
+             '--height', str(args.height), '--input-size', str(args.input_size)],
+            capture_output=True, text=True, check=True
+        )
+        r = json.loads(out.stdout.strip().splitlines()[-1])
+        print(f"{r['mode']:<8} {r['dtype']:<8} {r['fps']:8.1f} {r['ms_per_frame']:9.2f} "
+              f"{r['peak_rss_mb']:8.1f}MB {r['rss_growth_mb']:7.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
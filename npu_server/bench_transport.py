@@ -0,0 +1,125 @@
+"""
+전송 벤치마크: HTTP POST /detect vs TCP 바이너리 프레임 전송 (loopback)
+
+Mock 엔진으로 서버를 같은 프로세스에 띄우고 라즈베리파이 클라이언트로 프레임을 보낸다.
+
+    python3 bench_transport.py --frames 300 --window 4
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+os.environ.setdefault('NPU_MOCK', '1')
+
+import cv2
+import numpy as np
+from werkzeug.serving import make_server
+
+# npu_server 의 config 가 먼저 import 되도록 뒤에 추가
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'raspberry_pi'))
+
+import server
+from fire_detection_engine import FireDetectionEngine
+from pipeline import DetectionPipeline
+from alert_manager import AlertManager
+from tcp_server import TCPFrameServer
+import config
+
+from npu_client import NPUClient
+from npu_tcp_client import NPUTCPClient
+
+
+def _percentile(values, q):
+    return float(np.percentile(np.asarray(values) * 1000.0, q)) if values else 0.0
+
+
+def _report(name, frames, elapsed, latencies):
+    return {
+        'transport': name,
+        'fps': frames / elapsed,
+        'p50_ms': _percentile(latencies, 50),
+        'p99_ms': _percentile(latencies, 99),
+    }
+
+
+def bench_http(url, frame, frames, stream_id):
+    client = NPUClient(url)
+    latencies = []
+
+    t0 = time.perf_counter()
+    for i in range(frames):
+        t = time.perf_counter()
+        client.send_frame(frame, {'stream_id': stream_id, 'frame_number': i})
+        latencies.append(time.perf_counter() - t)
+    elapsed = time.perf_counter() - t0
+    return _report('http', frames, elapsed, latencies)
+
+
+def bench_tcp(url, port, frame, frames, window, stream_id):
+    client = NPUTCPClient(url, tcp_port=port, max_inflight=window)
+    sent = 0
+
+    t0 = time.perf_counter()
+    while sent < frames:
+        # window 가 차 있으면 (클라이언트가 버리는 대신) 잠깐 기다렸다가 다시 보낸다
+        if client.send_frame(frame, {'stream_id': stream_id, 'frame_number': sent}) is None:
+            time.sleep(0.0002)
+            continue
+        sent += 1
+    client.wait_idle(timeout=30.0)
+    elapsed = time.perf_counter() - t0
+
+    latencies = list(client.latencies)
+    client.close()
+    return _report(f'tcp (window {window})', frames, elapsed, latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="전송 벤치마크 (HTTP vs TCP)")
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--window', type=int, default=4, help='TCP pipelined 전송 시 최대 in-flight 프레임 수')
+    parser.add_argument('--width', type=int, default=640)
+    parser.add_argument('--height', type=int, default=480)
+    args = parser.parse_args()
+
+    # 카메라 영상처럼 부드러운 gradient + 약한 noise (순수 noise 는 JPEG 이 비현실적으로 커진다)
+    rng = np.random.default_rng(0)
+    gy, gx = np.mgrid[0:args.height, 0:args.width]
+    frame = np.stack([gx * 255 // args.width, gy * 255 // args.height, (gx + gy) % 256], axis=-1)
+    frame = np.clip(frame + rng.integers(-8, 9, frame.shape), 0, 255).astype(np.uint8)
+    jpeg = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])[1].tobytes()
+
+    server.engine = FireDetectionEngine(config.MODEL_PATH)
+    server.pipeline = DetectionPipeline(server.engine)
+    server.alert_manager = AlertManager(log_path=os.devnull, cooldown=config.ALERT_COOLDOWN)
+
+    http = make_server('127.0.0.1', 0, server.app, threaded=True)
+    threading.Thread(target=http.serve_forever, daemon=True).start()
+    tcp = TCPFrameServer(server.submit_frame, server.build_detect_response, host='127.0.0.1', port=0,
+                         overload_fn=server.overload_response).start()
+    url = f"http://127.0.0.1:{http.server_port}"
+
+    results = []
+    try:
+        # warmup
+        bench_http(url, frame, 20, 'warmup')
+        bench_tcp(url, tcp.port, frame, 20, 1, 'warmup')
+
+        results.append(bench_http(url, frame, args.frames, 'http'))
+        results.append(bench_tcp(url, tcp.port, frame, args.frames, 1, 'tcp1'))
+        results.append(bench_tcp(url, tcp.port, frame, args.frames, args.window, 'tcpN'))
+    finally:
+        tcp.stop()
+        http.shutdown()
+        server._shutdown()
+
+    print(f"\n프레임 {args.width}x{args.height} JPEG {len(jpeg) / 1024:.1f}KB, {args.frames}장, mock 엔진")
+    print(f"{'transport':<18}{'fps':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for r in results:
+        print(f"{r['transport']:<18}{r['fps']:>10.1f}{r['p50_ms']:>10.2f}{r['p99_ms']:>10.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,100 @@
+"""
+YOLO 디코더 벤치마크: decode_yolo_output_npu (기존, list + cv2.dnn.NMSBoxes)
+vs decode_yolo_output / decode_yolo_batch (NumPy, class-aware NMS)
+
+합성 NPU 출력 (6, 8400) 을 사용한다. 후보 박스는 몇 개의 화재 위치 주변에 몰리게 만든다.
+
+    python3 bench_yolo_decoder.py --iters 200 --candidates 300 --batch 4
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from yolo_decoder import decode_yolo_output_npu, decode_yolo_output, decode_yolo_batch
+
+
+def make_output(rng, num_boxes=8400, candidates=300, clusters=5, num_classes=2, input_size=640):
+    out = np.zeros((num_boxes, 6), dtype=np.float32)
+
+    cx = rng.uniform(0, input_size, num_boxes)
+    cy = rng.uniform(0, input_size, num_boxes)
+    w = rng.uniform(8, 64, num_boxes)
+    h = rng.uniform(8, 64, num_boxes)
+    out[:, 4] = rng.uniform(0.0, 0.2, num_boxes)
+    out[:, 5] = rng.integers(0, num_classes, num_boxes)
+
+    # conf 임계값을 넘는 후보는 clusters 개 위치 주변에 모인다 (NMS 대상)
+    idx = rng.choice(num_boxes, candidates, replace=False)
+    centers = rng.uniform(100, input_size - 100, (clusters, 2))
+    which = rng.integers(0, clusters, candidates)
+    cx[idx] = centers[which, 0] + rng.normal(0, 6, candidates)
+    cy[idx] = centers[which, 1] + rng.normal(0, 6, candidates)
+    w[idx] = rng.uniform(60, 90, candidates)
+    h[idx] = rng.uniform(60, 90, candidates)
+    out[idx, 4] = rng.uniform(0.3, 0.95, candidates)
+
+    out[:, 0] = cx - w / 2
+    out[:, 1] = cy - h / 2
+    out[:, 2] = cx + w / 2
+    out[:, 3] = cy + h / 2
+    return out.T.copy()[None]    # (1, 6, N) — NPU 출력 형태
+
+
+def reference_decode(output, conf_thres, iou_thres):
+    """
+    기존 방식(cv2) 을 올바르게 쓴 참조 구현: (x, y, w, h) 로 변환 + class-aware NMSBoxesBatched
+    기존 함수는 코너 좌표를 w/h 로 넘겨서 IoU 가 틀리므로 검출 수 / 속도 비교 기준으로 같이 잰다
+    """
+    rows = output[0].T
+    rows = rows[rows[:, 4] > conf_thres]
+    xywh = np.stack([rows[:, 0], rows[:, 1], rows[:, 2] - rows[:, 0], rows[:, 3] - rows[:, 1]], axis=1)
+    return cv2.dnn.NMSBoxesBatched(xywh, rows[:, 4], rows[:, 5].astype(np.int32), conf_thres, iou_thres)
+
+
+def bench(fn, iters):
+    for _ in range(5):
+        fn()
+    t0 = time.perf_counter()
+    for _ in range(iters):
+        fn()
+    return (time.perf_counter() - t0) / iters
+
+
+def main():
+    parser = argparse.ArgumentParser(description="YOLO 디코더 벤치마크")
+    parser.add_argument('--iters', type=int, default=200)
+    parser.add_argument('--boxes', type=int, default=8400)
+    parser.add_argument('--candidates', type=int, default=300)
+    parser.add_argument('--batch', type=int, default=4)
+    parser.add_argument('--conf', type=float, default=0.25)
+    parser.add_argument('--iou', type=float, default=0.45)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [make_output(rng, args.boxes, args.candidates) for _ in range(args.batch)]
+    batch = np.concatenate(frames, axis=0)
+
+    legacy = decode_yolo_output_npu(frames[0], args.conf, args.iou)
+    new = decode_yolo_output(frames[0], args.conf, args.iou)
+    print(f"출력 (6, {args.boxes}), 후보 {args.candidates}개, 배치 {args.batch}")
+    print(f"검출 수: 기존 {len(legacy)} / NumPy {len(new)} / 참조(cv2 xywh, class-aware) "
+          f"{len(reference_decode(frames[0], args.conf, args.iou))}")
+
+    t_legacy = bench(lambda: decode_yolo_output_npu(frames[0], args.conf, args.iou), args.iters)
+    t_ref = bench(lambda: reference_decode(frames[0], args.conf, args.iou), args.iters)
+    t_new = bench(lambda: decode_yolo_output(frames[0], args.conf, args.iou), args.iters)
+    t_legacy_b = bench(lambda: [decode_yolo_output_npu(f, args.conf, args.iou) for f in frames], args.iters)
+    t_batch = bench(lambda: decode_yolo_batch(batch, args.conf, args.iou), args.iters)
+
+    print(f"{'':<28} {'ms':>8} {'frames/s':>10}")
+    print(f"{'기존 (1 프레임)':<28} {t_legacy * 1000:8.3f} {1 / t_legacy:10.1f}")
+    print(f"{'cv2 xywh 참조 (1 프레임)':<28} {t_ref * 1000:8.3f} {1 / t_ref:10.1f}")
+    print(f"{'NumPy (1 프레임)':<28} {t_new * 1000:8.3f} {1 / t_new:10.1f}")
+    print(f"{'기존 x' + str(args.batch):<28} {t_legacy_b * 1000:8.3f} {args.batch / t_legacy_b:10.1f}")
+    print(f"{'NumPy 배치 ' + str(args.batch):<28} {t_batch * 1000:8.3f} {args.batch / t_batch:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,47 @@
+import os
+
 MODEL_PATH = "./fire.dxnn"
 
 PORT = 5000
+TCP_ENABLED = True
+TCP_PORT = 5001
 DEBUG = False
 
 INPUT_SIZE = 640
 CONF_THRES = 0.25
 IOU_THRES = 0.45
+ROI_MAX_CROPS = 16
 
 PERSISTENCE_THRESHOLD = 10.0
 GROWTH_FACTOR = 1.5
 
-ALERT_SCRIPT = "./fire_alert.py"
+TRACK_TTL = 5.0
+TRACK_MAX = 256
+TRACK_CELL_SIZE = 64
+TRACK_IOU_THRES = 0.3
+
+DEFAULT_STREAM_ID = "default"
+STREAM_MAX = 64
+STREAM_IDLE_TIMEOUT = 600.0
+
+ALERT_LOG_FILE = "./fire_alerts.log"
 ALERT_COOLDOWN = 30
+ALERT_QUEUE_SIZE = 64
+
+USE_MOCK_ENGINE = os.environ.get("NPU_MOCK", "0") == "1"
+METRICS_ENABLED = os.environ.get("NPU_METRICS", "1") == "1"
+
+BATCH_MAX_SIZE = 4
+BATCH_MAX_WAIT_MS = 5
+BATCH_QUEUE_DEPTH = 32
+BATCH_RESULT_TIMEOUT = 5.0
+NPU_BATCH_INFERENCE = True
+
+PREPROCESS_MODE = "fused"
+NPU_INPUT_DTYPE = "float32"
+PREPROCESS_BUFFERS = 8
+
+PIPELINE_DECODE_WORKERS = 2
+PIPELINE_PREPROCESS_WORKERS = 2
+PIPELINE_POSTPROCESS_WORKERS = 1
+PIPELINE_QUEUE_DEPTH = 16
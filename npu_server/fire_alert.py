@@ -1,9 +1,39 @@
 import sys
 import os
+import threading
 from datetime import datetime
 
 
-def trigger_alert(severity, detection_info):
+class AlertLog:
+    """
+    알림 로그 파일을 열어둔 채로 쓰는 로거 (알림마다 open/close 하지 않음)
+    """
+    
+    def __init__(self, log_file="fire_alerts.log"):
+        self.log_file = log_file
+        self._lock = threading.Lock()
+        self._fp = open(log_file, 'a', encoding='utf-8')
+    
+    def write(self, timestamp, severity, detection_info, stream_id=None, count=1):
+        line = f"{timestamp} | {stream_id or '-'} | {severity} | {detection_info}"
+        if count > 1:
+            line += f" | x{count}"
+        with self._lock:
+            self._fp.write(line + "\n")
+    
+    def flush(self):
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.flush()
+    
+    def close(self):
+        with self._lock:
+            if not self._fp.closed:
+                self._fp.flush()
+                self._fp.close()
+
+
+def trigger_alert(severity, detection_info, stream_id=None, log=None, count=1):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
     print("\n" + "="*60)
@@ -11,14 +41,21 @@ def trigger_alert(severity, detection_info):
     print("="*60)
     print(f"시간: {timestamp}")
     print(f"심각도: {severity.upper()}")
+    if stream_id:
+        print(f"스트림: {stream_id}")
+    if count > 1:
+        print(f"병합된 알림: {count}건")
     print(f"감지 정보: {detection_info}")
     print("="*60)
     
-    log_file = "fire_alerts.log"
+    own_log = log is None
     try:
-        with open(log_file, 'a', encoding='utf-8') as f:
-            f.write(f"{timestamp} | {severity} | {detection_info}\n")
-        print(f"로그 저장: {log_file}")
+        if own_log:
+            log = AlertLog()
+        log.write(timestamp, severity, detection_info, stream_id, count)
+        if own_log:
+            log.close()
+            print(f"로그 저장: {log.log_file}")
     except Exception as e:
         print(f"로그 저장 실패: {e}")
     
@@ -27,14 +64,17 @@ def trigger_alert(severity, detection_info):
 
 
 def main():
+    stream_id = None
     if len(sys.argv) >= 3:
         severity = sys.argv[1]
         detection_info = sys.argv[2]
+        if len(sys.argv) >= 4:
+            stream_id = sys.argv[3]
     else:
         severity = "severe"
         detection_info = "Test alert"
     
-    trigger_alert(severity, detection_info)
+    trigger_alert(severity, detection_info, stream_id)
 
 
 if __name__ == "__main__":
@@ -1,5 +1,7 @@
 import cv2
 import numpy as np
+import queue
+import threading
 import time
 
 try:
@@ -11,84 +13,209 @@ except ImportError:
     DX_ENGINE_AVAILABLE = False
 
 from temporal_analyzer import TemporalAnalyzerNPU
-from yolo_decoder import decode_yolo_output_npu
+from yolo_decoder import decode_yolo_output
+from batch_scheduler import BatchScheduler
+from mock_engine import MockInferenceEngine
+from preprocess import FramePreprocessor
+from stream_session import StreamRegistry
+import metrics
 import config
 
 
+DETECT_SECONDS = metrics.histogram('npu_detect_seconds', 'detect() 한 프레임 (전처리 + NPU 추론 + 후처리) 시간')
+POSTPROCESS_SECONDS = metrics.histogram('npu_postprocess_seconds', 'postprocess (YOLO 디코딩 + ROI 좌표 변환 + temporal) 시간')
+
+
 class FireDetectionEngine:
     
-    def __init__(self, model_path):
-        if not DX_ENGINE_AVAILABLE:
-            raise RuntimeError("dx_engine을 사용할 수 없습니다.")
+    def __init__(self, model_path, use_mock=None):
+        if use_mock is None:
+            use_mock = config.USE_MOCK_ENGINE
         
-        print(f"NPU 엔진 초기화 중...")
-        print(f"모델: {model_path}")
+        if use_mock:
+            self.engine = MockInferenceEngine()
+            self.engine.init(model_path)
+        else:
+            if not DX_ENGINE_AVAILABLE:
+                raise RuntimeError("dx_engine을 사용할 수 없습니다.")
+            
+            print(f"NPU 엔진 초기화 중...")
+            print(f"모델: {model_path}")
+            
+            self.engine = dx_engine.InferenceEngine()
+            ret = self.engine.init(model_path, dx_engine.ExecutionMode.NPU)
+            
+            if ret != 0:
+                raise RuntimeError(f"NPU 엔진 초기화 실패: {ret}")
+            
+            print(f"NPU 엔진 초기화 완료")
+        
+        # stream(카메라) 마다 temporal analyzer / 카운터 / 알림 cooldown 을 따로 둔다
+        self.sessions = StreamRegistry(
+            self._new_temporal_analyzer,
+            max_streams=config.STREAM_MAX,
+            idle_timeout=config.STREAM_IDLE_TIMEOUT
+        )
         
-        self.engine = dx_engine.InferenceEngine()
-        ret = self.engine.init(model_path, dx_engine.ExecutionMode.NPU)
+        self.total_frames = 0
+        self.fire_detections = 0
         
-        if ret != 0:
-            raise RuntimeError(f"NPU 엔진 초기화 실패: {ret}")
+        self.preprocessor = None
+        if config.PREPROCESS_MODE == 'fused':
+            self.preprocessor = FramePreprocessor(
+                input_size=config.INPUT_SIZE,
+                dtype=config.NPU_INPUT_DTYPE,
+                pool_size=config.PREPROCESS_BUFFERS
+            )
         
-        print(f"NPU 엔진 초기화 완료")
+        # 전체 카운터 보호 (stream 별 상태는 session.lock)
+        self._lock = threading.Lock()
         
-        self.temporal_analyzer = TemporalAnalyzerNPU(
+        # NPU 추론은 스케줄러 스레드 하나에서만 실행 (요청 간 마이크로 배치)
+        self.batch_inference = config.NPU_BATCH_INFERENCE
+        self._batch_verified = False    # 배치 추론이 한 번이라도 성공했는지 (이후 오류는 일시 오류로 취급)
+        self.scheduler = BatchScheduler(
+            self._infer_batch,
+            max_batch=config.BATCH_MAX_SIZE,
+            max_wait=config.BATCH_MAX_WAIT_MS / 1000.0,
+            queue_depth=config.BATCH_QUEUE_DEPTH
+        )
+    
+    def _new_temporal_analyzer(self):
+        return TemporalAnalyzerNPU(
             persistence_threshold=config.PERSISTENCE_THRESHOLD,
-            growth_factor=config.GROWTH_FACTOR
+            growth_factor=config.GROWTH_FACTOR,
+            track_ttl=config.TRACK_TTL,
+            max_tracks=config.TRACK_MAX,
+            cell_size=config.TRACK_CELL_SIZE,
+            iou_thres=config.TRACK_IOU_THRES
         )
-        
-        self.total_frames = 0
-        self.fire_detections = 0
     
-    def detect(self, frame):
-        self.total_frames += 1
+    def get_session(self, stream_id=None):
+        return self.sessions.get(stream_id or config.DEFAULT_STREAM_ID)
+    
+    def preprocess(self, frame):
+        if self.preprocessor is not None:
+            return self.preprocessor(frame)
         
         input_frame = cv2.resize(frame, (config.INPUT_SIZE, config.INPUT_SIZE))
         input_frame = cv2.cvtColor(input_frame, cv2.COLOR_BGR2RGB)
-        input_data = np.expand_dims(input_frame, axis=0).astype(np.float32) / 255.0
+        if config.NPU_INPUT_DTYPE == 'uint8':
+            return input_frame
+        return input_frame.astype(np.float32) / 255.0
+    
+    def release_input(self, input_data):
+        if self.preprocessor is not None:
+            self.preprocessor.release(input_data)
+    
+    def _infer_batch(self, batch):
+        n = batch.shape[0]
         
-        outputs = self.engine.inference(input_data)
+        if n > 1 and self.batch_inference:
+            try:
+                outputs = self.engine.inference(batch)
+            except (ValueError, TypeError) as e:
+                # 배치가 한 번도 성공하지 않았는데 shape / 인자 오류 → 모델이 batch=1 고정
+                if not self._batch_verified:
+                    print(f"배치 추론 미지원 ({e}) - 프레임 단위 추론으로 전환")
+                    self.batch_inference = False
+                else:
+                    print(f"배치 추론 오류 ({e}) - 이번 배치만 프레임 단위로 재시도")
+                outputs = None
+            except Exception as e:
+                # NPU / 드라이버 일시 오류: 이번 배치만 프레임 단위로, 배치 추론은 계속 사용
+                print(f"배치 추론 오류 ({e}) - 이번 배치만 프레임 단위로 재시도")
+                outputs = None
+            else:
+                if outputs is not None and len(outputs) > 0 and outputs[0].shape[0] == n:
+                    self._batch_verified = True
+                    return [outputs[0][i:i + 1] for i in range(n)]
+                # 출력 batch 차원이 다름 → 모델이 batch=1 고정, 이후에는 배치 호출을 시도하지 않는다
+                print("배치 추론 출력 형태 불일치 - 프레임 단위 추론으로 전환")
+                self.batch_inference = False
         
-        if outputs is None or len(outputs) == 0:
-            return {
-                'fire_detected': False,
-                'detections': [],
-                'temporal_analysis': None
-            }
+        results = []
+        for i in range(n):
+            outputs = self.engine.inference(batch[i:i + 1])
+            results.append(outputs[0] if outputs is not None and len(outputs) > 0 else None)
+        return results
+    
+    @metrics.timed(POSTPROCESS_SECONDS)
+    def postprocess(self, output, session=None, layout=None):
+        """layout (RoiLayout) 이 있으면 mosaic 기준 검출을 원본 프레임 기준으로 되돌린 뒤 temporal 분석"""
+        if session is None:
+            session = self.get_session()
         
-        detections = decode_yolo_output_npu(
-            outputs[0],
-            conf_thres=config.CONF_THRES,
-            iou_thres=config.IOU_THRES,
-            input_size=config.INPUT_SIZE
-        )
+        if output is None:
+            detections = []
+        else:
+            detections = decode_yolo_output(
+                output,
+                conf_thres=config.CONF_THRES,
+                iou_thres=config.IOU_THRES,
+                input_size=config.INPUT_SIZE
+            )
+            if layout is not None:
+                detections = layout.to_frame(detections, config.INPUT_SIZE)
         
         fire_detected = len(detections) > 0
         
-        if fire_detected:
-            self.fire_detections += 1
+        with self._lock:
+            self.total_frames += 1
+            if fire_detected:
+                self.fire_detections += 1
+        
+        with session.lock:
+            session.total_frames += 1
             
-            temporal_result = self.temporal_analyzer.analyze(
-                detections,
-                frame_timestamp=time.time()
-            )
-        else:
-            temporal_result = None
+            if fire_detected:
+                session.fire_detections += 1
+                
+                temporal_result = session.temporal_analyzer.analyze(
+                    detections,
+                    frame_timestamp=time.time()
+                )
+            else:
+                temporal_result = None
         
         return {
+            'stream_id': session.stream_id,
             'fire_detected': fire_detected,
             'detections': detections,
             'temporal_analysis': temporal_result
         }
     
+    @metrics.timed(DETECT_SECONDS)
+    def detect(self, frame, stream_id=None):
+        session = self.get_session(stream_id)
+        input_data = self.preprocess(frame)
+        try:
+            future = self.scheduler.submit_async(input_data, release=self.release_input)
+        except queue.Full:
+            self.release_input(input_data)
+            raise
+        output = future.result(timeout=config.BATCH_RESULT_TIMEOUT)
+        return self.postprocess(output, session)
+    
     def get_stats(self):
-        return {
-            'total_frames': self.total_frames,
-            'fire_detections': self.fire_detections,
-            'detection_rate': self.fire_detections / max(self.total_frames, 1)
-        }
+        with self._lock:
+            stats = {
+                'total_frames': self.total_frames,
+                'fire_detections': self.fire_detections,
+                'detection_rate': self.fire_detections / max(self.total_frames, 1)
+            }
+        stats['active_streams'] = len(self.sessions)
+        stats['evicted_streams'] = self.sessions.evicted
+        return stats
     
-    def reset(self):
-        self.temporal_analyzer.reset()
-        self.total_frames = 0
-        self.fire_detections = 0
+    def reset(self, stream_id=None):
+        if stream_id is not None:
+            return self.sessions.reset(stream_id)
+        
+        with self._lock:
+            self.total_frames = 0
+            self.fire_detections = 0
+        return self.sessions.reset()
+    
+    def close(self):
+        self.scheduler.stop()
@@ -0,0 +1,179 @@
+import bisect
+import threading
+import time
+from functools import wraps
+
+import config
+
+
+# NPU_METRICS=0 이면 timed() 가 원래 함수를 그대로 돌려주고 observe 도 하지 않음 (오버헤드 0)
+ENABLED = config.METRICS_ENABLED
+
+# 초 단위 bucket (0.5ms ~ 2.5s)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _format_labels(labels, extra=None):
+    items = list(labels.items()) if labels else []
+    if extra:
+        items.append(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+class Histogram:
+    """
+    고정 bucket histogram (Prometheus histogram 형식)
+
+    observe() 는 bisect + lock 한 번 (1µs 미만)
+    """
+
+    def __init__(self, name, labels=None, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.labels = dict(labels) if labels else {}
+        self.bounds = tuple(buckets)
+        self.counts = [0] * (len(self.bounds) + 1)    # 마지막 = +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        """with hist.time(): ... 블록 실행 시간 기록"""
+        return _Timer(self) if ENABLED else _NULL_TIMER
+
+    def samples(self):
+        with self._lock:
+            counts, total = list(self.counts), self.sum
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.bounds, counts):
+            cumulative += count
+            lines.append(f'{self.name}_bucket{_format_labels(self.labels, ("le", repr(bound)))} {cumulative}')
+        cumulative += counts[-1]
+        lines.append(f'{self.name}_bucket{_format_labels(self.labels, ("le", "+Inf"))} {cumulative}')
+        lines.append(f'{self.name}_sum{_format_labels(self.labels)} {total}')
+        lines.append(f'{self.name}_count{_format_labels(self.labels)} {cumulative}')
+        return lines
+
+
+class _Timer:
+    __slots__ = ('hist', 't0')
+
+    def __init__(self, hist):
+        self.hist = hist
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self.t0)
+        return False
+
+
+class _NullTimer:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Callback:
+    """/metrics 를 만들 때 fn() 을 읽는 gauge / counter (기존 통계 카운터를 그대로 사용)"""
+
+    def __init__(self, name, fn, labels=None):
+        self.name = name
+        self.fn = fn
+        self.labels = dict(labels) if labels else {}
+
+    def samples(self):
+        try:
+            value = self.fn()
+        except Exception:
+            return []
+        if value is None:
+            return []
+        return [f'{self.name}{_format_labels(self.labels)} {float(value)}']
+
+
+class Registry:
+    """
+    metric 모음 + Prometheus text exposition
+
+    같은 이름은 label 만 다른 series 로 묶어서 HELP / TYPE 를 한 번만 출력
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._families = {}     # name -> [type, help, {label key: metric}]
+
+    def _register(self, kind, name, help_text, labels, factory):
+        key = tuple(sorted(labels.items())) if labels else ()
+        with self._lock:
+            family = self._families.setdefault(name, [kind, help_text, {}])
+            if family[0] != kind:
+                raise ValueError(f"metric {name} 는 이미 {family[0]} 로 등록됨")
+            metric = family[2].get(key)
+            if metric is None:
+                metric = family[2][key] = factory()
+            return metric
+
+    def histogram(self, name, help_text, labels=None, buckets=DEFAULT_BUCKETS):
+        return self._register('histogram', name, help_text, labels,
+                              lambda: Histogram(name, labels, buckets))
+
+    def gauge(self, name, help_text, fn, labels=None):
+        metric = self._register('gauge', name, help_text, labels, lambda: _Callback(name, fn, labels))
+        metric.fn = fn
+        return metric
+
+    def counter(self, name, help_text, fn, labels=None):
+        metric = self._register('counter', name, help_text, labels, lambda: _Callback(name, fn, labels))
+        metric.fn = fn
+        return metric
+
+    def render(self):
+        with self._lock:
+            families = [(name, kind, help_text, list(series.values()))
+                        for name, (kind, help_text, series) in self._families.items()]
+        lines = []
+        for name, kind, help_text, series in families:
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {kind}')
+            for metric in series:
+                lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = Registry()
+histogram = REGISTRY.histogram
+gauge = REGISTRY.gauge
+counter = REGISTRY.counter
+render = REGISTRY.render
+
+
+def timed(hist):
+    """함수 실행 시간을 hist 에 기록하는 decorator (계측이 꺼져 있으면 원래 함수 그대로)"""
+    def decorator(fn):
+        if not ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            t0 = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                hist.observe(time.perf_counter() - t0)
+        return wrapper
+    return decorator
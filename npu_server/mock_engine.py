@@ -0,0 +1,49 @@
+import time
+
+import numpy as np
+
+
+class MockInferenceEngine:
+    """
+    NPU 없이 테스트하기 위한 dx_engine.InferenceEngine 대체품
+
+    - init() / inference() 인터페이스만 흉내낸다
+    - 입력 프레임의 빨강 비율이 높은 영역에 fire 박스를 하나 만든다
+    - 출력 형태: [(N, 6, num_boxes)]  (x1, y1, x2, y2, score, class)
+    - base_latency + per_frame_latency * N 만큼 sleep 해서 NPU 지연을 흉내낸다
+    """
+
+    def __init__(self, base_latency=0.010, per_frame_latency=0.002, num_boxes=8):
+        self.base_latency = base_latency
+        self.per_frame_latency = per_frame_latency
+        self.num_boxes = num_boxes
+        self.calls = 0
+
+    def init(self, model_path, mode=None):
+        print(f"Mock NPU 엔진 사용 (모델 무시: {model_path})")
+        return 0
+
+    def inference(self, input_data):
+        batch = np.asarray(input_data)
+        if batch.ndim == 3:
+            batch = batch[None]
+
+        n = batch.shape[0]
+        time.sleep(self.base_latency + self.per_frame_latency * n)
+        self.calls += 1
+
+        out = np.zeros((n, 6, self.num_boxes), dtype=np.float32)
+        for i in range(n):
+            img = batch[i].astype(np.float32)
+            if img.max() > 1.0:
+                img = img / 255.0
+            # RGB 입력 기준: R 이 높고 B 가 낮은 픽셀을 화재 후보로 본다
+            fire_mask = (img[..., 0] > 0.6) & (img[..., 2] < 0.4)
+            ratio = float(fire_mask.mean())
+            if ratio < 0.01:
+                continue
+
+            ys, xs = np.nonzero(fire_mask)
+            out[i, :, 0] = [xs.min(), ys.min(), xs.max() + 1, ys.max() + 1,
+                            min(0.99, 0.5 + ratio), 0]
+        return [out]
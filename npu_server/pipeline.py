@@ -0,0 +1,260 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import cv2
+import numpy as np
+
+import metrics
+import config
+
+
+REQUEST_SECONDS = metrics.histogram('npu_request_seconds', '프레임 end-to-end 처리 시간 (submit → 결과)')
+
+
+class _Job:
+    __slots__ = ('data', 'context', 'future', 't_submit', 't_enqueue')
+
+    def __init__(self, data, context=None):
+        self.data = data
+        self.context = context
+        self.future = Future()
+        self.t_submit = time.perf_counter()
+        self.t_enqueue = self.t_submit
+
+
+class PipelineStage:
+    """
+    bounded 큐 + worker 스레드 N개로 fn 을 실행하는 파이프라인 단계
+
+    - fn 결과는 다음 단계로 넘기고, 마지막 단계면 job.future 를 완료한다
+    - 예외가 나면 job.future 에 예외를 넣고 그 job 은 거기서 끝난다
+    - with_context=True 면 fn(job.data, job.context) 로 호출 (예: stream session)
+    """
+
+    def __init__(self, name, fn, workers=1, queue_depth=16, next_stage=None, with_context=False):
+        self.name = name
+        self.fn = fn
+        self.next_stage = next_stage
+        self._wait_hist = metrics.histogram('npu_stage_wait_seconds', '파이프라인 단계 큐 대기 시간',
+                                            labels={'stage': name})
+        self._service_hist = metrics.histogram('npu_stage_seconds', '파이프라인 단계 처리 시간 (decode = JPEG 디코딩, preprocess = resize / 정규화)',
+                                               labels={'stage': name})
+        self.with_context = with_context
+        self._queue = queue.Queue(maxsize=queue_depth)
+
+        self._stats_lock = threading.Lock()
+        self.processed = 0
+        self.errors = 0
+        self.total_wait = 0.0
+        self.total_service = 0.0
+        self.max_service = 0.0
+
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"pipe-{name}-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+        for t in self._threads:
+            t.start()
+
+    def put(self, job, block=True):
+        job.t_enqueue = time.perf_counter()
+        self._queue.put(job, block=block)
+
+    def stop(self):
+        for _ in self._threads:
+            self._queue.put(None)
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+    def get_stats(self):
+        with self._stats_lock:
+            n = max(self.processed, 1)
+            return {
+                'workers': len(self._threads),
+                'queue_size': self._queue.qsize(),
+                'queue_depth': self._queue.maxsize,
+                'processed': self.processed,
+                'errors': self.errors,
+                'avg_wait_ms': self.total_wait / n * 1000.0,
+                'avg_service_ms': self.total_service / n * 1000.0,
+                'max_service_ms': self.max_service * 1000.0,
+            }
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+
+            t0 = time.perf_counter()
+            try:
+                if self.with_context:
+                    result = self.fn(job.data, job.context)
+                else:
+                    result = self.fn(job.data)
+                error = None
+            except Exception as e:
+                result, error = None, e
+            t1 = time.perf_counter()
+
+            if metrics.ENABLED:
+                self._wait_hist.observe(t0 - job.t_enqueue)
+                self._service_hist.observe(t1 - t0)
+            with self._stats_lock:
+                self.processed += 1
+                self.total_wait += t0 - job.t_enqueue
+                self.total_service += t1 - t0
+                self.max_service = max(self.max_service, t1 - t0)
+                if error is not None:
+                    self.errors += 1
+
+            if error is not None:
+                job.future.set_exception(error)
+                continue
+
+            job.data = result
+            if self.next_stage is None:
+                job.future.set_result(result)
+            else:
+                self.next_stage.put(job)
+
+
+class BatchInferStage:
+    """BatchScheduler 를 파이프라인 단계로 감싼 NPU 추론 단계"""
+
+    name = 'infer'
+
+    def __init__(self, scheduler, next_stage, release=None):
+        self.scheduler = scheduler
+        self.next_stage = next_stage
+        self.release = release
+
+    def put(self, job, block=True):
+        future = self.scheduler.submit_async(job.data, block=block, release=self.release)
+        future.add_done_callback(lambda f, job=job: self._on_done(job, f))
+
+    def _on_done(self, job, future):
+        error = future.exception()
+        if error is not None:
+            job.future.set_exception(error)
+            return
+        job.data = future.result()
+        self.next_stage.put(job)
+
+    def stop(self):
+        pass
+
+    def get_stats(self):
+        return self.scheduler.get_stats()
+
+
+class FrameDecodeError(ValueError):
+    """JPEG 디코딩 실패 (클라이언트 잘못 → 400). 다른 단계의 ValueError 와 구분하기 위한 전용 예외"""
+
+
+def decode_jpeg(data):
+    npimg = np.frombuffer(data, np.uint8)
+    frame = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
+    if frame is None:
+        raise FrameDecodeError("Invalid frame")
+    return frame
+
+
+class DetectionPipeline:
+    """
+    /detect 처리 파이프라인
+
+        decode(JPEG) → preprocess → infer(NPU 배치) → postprocess(YOLO 디코딩 + temporal)
+
+    단계마다 bounded 큐와 worker 스레드가 있어서 프레임 k 를 NPU 가 추론하는 동안
+    프레임 k+1 의 디코딩/전처리가 진행된다. 첫 단계 큐가 가득 차면 submit 이 queue.Full.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        depth = config.PIPELINE_QUEUE_DEPTH
+
+        self.postprocess = PipelineStage(
+            'postprocess', self._postprocess,
+            workers=config.PIPELINE_POSTPROCESS_WORKERS, queue_depth=depth,
+            with_context=True
+        )
+        self.infer = BatchInferStage(engine.scheduler, self.postprocess, release=engine.release_input)
+        self.preprocess = PipelineStage(
+            'preprocess', engine.preprocess,
+            workers=config.PIPELINE_PREPROCESS_WORKERS, queue_depth=depth,
+            next_stage=self.infer
+        )
+        self.decode = PipelineStage(
+            'decode', decode_jpeg,
+            workers=config.PIPELINE_DECODE_WORKERS, queue_depth=depth,
+            next_stage=self.preprocess
+        )
+        self.stages = [self.decode, self.preprocess, self.infer, self.postprocess]
+
+        self._stats_lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.recent_latency = 0.0       # end-to-end 지연 EWMA (클라이언트 backpressure 용)
+
+    def _postprocess(self, output, context):
+        session, layout = context
+        return self.engine.postprocess(output, session, layout)
+
+    def submit(self, jpeg_bytes, session=None, layout=None):
+        """layout: ROI crop mosaic 이면 RoiLayout (검출 좌표를 원본 프레임 기준으로 되돌림)"""
+        job = _Job(jpeg_bytes, (session, layout))
+        self.decode.put(job, block=False)
+        with self._stats_lock:
+            self.submitted += 1
+        job.future.add_done_callback(lambda f, job=job: self._on_done(job))
+        return job.future
+
+    def process(self, jpeg_bytes, session=None, timeout=None, layout=None):
+        return self.submit(jpeg_bytes, session, layout).result(timeout=timeout)
+
+    def _on_done(self, job):
+        latency = time.perf_counter() - job.t_submit
+        if metrics.ENABLED:
+            REQUEST_SECONDS.observe(latency)
+        with self._stats_lock:
+            self.completed += 1
+            self.total_latency += latency
+            self.max_latency = max(self.max_latency, latency)
+            self.recent_latency += 0.1 * (latency - self.recent_latency)
+
+    def get_load(self):
+        """
+        클라이언트가 전송률을 조절할 때 쓰는 부하 정보 (/detect 응답, 503, /health 에 포함)
+        queue_depth: 받았지만 아직 끝나지 않은 프레임 수, load: queue_depth / queue_limit
+        track_ttl: 이 시간 동안 프레임이 없으면 트랙이 사라짐 → 클라이언트 최소 전송 간격의 상한
+        """
+        limit = config.PIPELINE_QUEUE_DEPTH
+        with self._stats_lock:
+            depth = self.submitted - self.completed
+            latency = self.recent_latency
+        return {
+            'queue_depth': depth,
+            'queue_limit': limit,
+            'load': round(depth / limit, 3),
+            'latency_ms': round(latency * 1000.0, 1),
+            'track_ttl': config.TRACK_TTL,
+        }
+
+    def get_stats(self):
+        stats = {stage.name: stage.get_stats() for stage in self.stages}
+        with self._stats_lock:
+            stats['end_to_end'] = {
+                'completed': self.completed,
+                'avg_latency_ms': self.total_latency / max(self.completed, 1) * 1000.0,
+                'max_latency_ms': self.max_latency * 1000.0,
+            }
+        return stats
+
+    def stop(self):
+        for stage in self.stages:
+            stage.stop()
@@ -0,0 +1,109 @@
+import math
+
+import numpy as np
+
+from yolo_decoder import DETECTION_DTYPE
+
+
+class RoiLayout:
+    """
+    클라이언트가 보낸 ROI mosaic 배치 정보
+
+    mosaic 은 원본 프레임의 ROI crop 들을 한 장에 배치한 이미지이고, metadata 로 다음을 받는다
+        frame_size:  [W, H]                        원본 프레임 크기
+        mosaic_size: [W, H]                        mosaic 이미지 크기
+        rois: [{'src': [x, y, w, h], 'dst': [x, y, w, h]}, ...]
+              src = 원본 프레임 영역, dst = mosaic 안 위치 (px)
+
+    to_frame() 은 mosaic 기준 검출 좌표를 "원본 프레임 전체를 보냈을 때" 의 모델 입력 좌표로 바꾼다.
+    → ROI 로 보낸 프레임과 전체 프레임이 섞여도 temporal 트랙 좌표가 같은 기준을 쓴다
+    """
+
+    def __init__(self, frame_size, mosaic_size, rois):
+        self.frame_w, self.frame_h = frame_size
+        self.mosaic_w, self.mosaic_h = mosaic_size
+        self.src = np.array([r[0] for r in rois], dtype=np.float32).reshape(-1, 4)
+        self.dst = np.array([r[1] for r in rois], dtype=np.float32).reshape(-1, 4)
+
+    def __len__(self):
+        return len(self.src)
+
+    @classmethod
+    def from_metadata(cls, metadata, max_rois=16):
+        """metadata 에 'rois' 가 없으면 None, 형식이 잘못되면 ValueError"""
+        rois = metadata.get('rois')
+        if not rois:
+            return None
+
+        def size(value, name):
+            try:
+                w, h = (float(v) for v in value)
+            except (TypeError, ValueError):
+                raise ValueError(f"잘못된 {name}: {value!r}")
+            if not (math.isfinite(w) and math.isfinite(h)) or w < 1 or h < 1:
+                raise ValueError(f"잘못된 {name}: {value!r}")
+            return w, h
+
+        def rect(value, name):
+            try:
+                x, y, w, h = (float(v) for v in value)
+            except (TypeError, ValueError):
+                raise ValueError(f"잘못된 {name}: {value!r}")
+            if not all(math.isfinite(v) for v in (x, y, w, h)) or w < 1 or h < 1:
+                raise ValueError(f"잘못된 {name}: {value!r}")
+            return x, y, w, h
+
+        if not isinstance(rois, list) or len(rois) > max_rois:
+            raise ValueError(f"ROI 는 최대 {max_rois} 개")
+
+        frame_size = size(metadata.get('frame_size'), 'frame_size')
+        mosaic_size = size(metadata.get('mosaic_size'), 'mosaic_size')
+        parsed = []
+        for roi in rois:
+            if not isinstance(roi, dict):
+                raise ValueError(f"잘못된 ROI: {roi!r}")
+            parsed.append((rect(roi.get('src'), 'src'), rect(roi.get('dst'), 'dst')))
+        return cls(frame_size, mosaic_size, parsed)
+
+    def to_frame(self, detections, input_size):
+        """
+        mosaic 기준 검출 (모델 입력 input_size 좌표) → 원본 프레임 기준 모델 입력 좌표
+        중심이 어느 ROI 에도 없는 검출 (mosaic 빈 영역) 은 버린다
+        """
+        if len(detections) == 0 or len(self) == 0:
+            return np.empty(0, dtype=DETECTION_DTYPE)
+
+        # 모델 입력 → mosaic px
+        sx = self.mosaic_w / input_size
+        sy = self.mosaic_h / input_size
+        x1 = detections['x1'] * sx
+        y1 = detections['y1'] * sy
+        x2 = detections['x2'] * sx
+        y2 = detections['y2'] * sy
+        cx = (x1 + x2) / 2
+        cy = (y1 + y2) / 2
+
+        # 검출 중심이 들어 있는 ROI (N, R)
+        dx, dy, dw, dh = self.dst.T
+        inside = ((cx[:, None] >= dx) & (cx[:, None] < dx + dw) &
+                  (cy[:, None] >= dy) & (cy[:, None] < dy + dh))
+        keep = inside.any(axis=1)
+        roi = inside.argmax(axis=1)[keep]
+
+        dx, dy, dw, dh = self.dst[roi].T
+        ox, oy, ow, oh = self.src[roi].T
+        # ROI 밖으로 나간 부분은 잘라내고 원본 프레임 좌표로
+        fx1 = ox + (np.clip(x1[keep], dx, dx + dw) - dx) * (ow / dw)
+        fy1 = oy + (np.clip(y1[keep], dy, dy + dh) - dy) * (oh / dh)
+        fx2 = ox + (np.clip(x2[keep], dx, dx + dw) - dx) * (ow / dw)
+        fy2 = oy + (np.clip(y2[keep], dy, dy + dh) - dy) * (oh / dh)
+
+        # 원본 프레임 → 전체 프레임을 보냈을 때의 모델 입력 좌표
+        mapped = np.empty(int(keep.sum()), dtype=DETECTION_DTYPE)
+        mapped['x1'] = fx1 * (input_size / self.frame_w)
+        mapped['y1'] = fy1 * (input_size / self.frame_h)
+        mapped['x2'] = fx2 * (input_size / self.frame_w)
+        mapped['y2'] = fy2 * (input_size / self.frame_h)
+        mapped['conf'] = detections['conf'][keep]
+        mapped['cls'] = detections['cls'][keep]
+        return mapped
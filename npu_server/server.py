@@ -1,18 +1,64 @@
-from flask import Flask, request, jsonify
-import cv2
-import numpy as np
+from flask import Flask, Response, request, jsonify
+import atexit
+import json
+import queue
 import sys
+import time
+from concurrent.futures import TimeoutError as ResultTimeout
 from datetime import datetime
 
 from fire_detection_engine import FireDetectionEngine
+from pipeline import DetectionPipeline, FrameDecodeError
+from roi_layout import RoiLayout
 from alert_manager import AlertManager
+from tcp_server import TCPFrameServer
+import metrics
 import config
 
 
 app = Flask(__name__)
 
 engine = None
+pipeline = None
 alert_manager = None
+tcp_server = None
+
+
+def _request_metadata():
+    # /detect: multipart 'metadata' JSON
+    metadata = request.form.get('metadata')
+    if not metadata:
+        return {}
+    try:
+        metadata = json.loads(metadata)
+    except ValueError:
+        return {}
+    return metadata if isinstance(metadata, dict) else {}
+
+
+def _clean_stream_id(stream_id):
+    if stream_id is None:
+        return None
+    stream_id = str(stream_id).strip()[:64]
+    return stream_id or None
+
+
+def _request_stream_id():
+    # /detect: metadata 의 stream_id, 그 외: ?stream_id= 쿼리
+    stream_id = request.args.get('stream_id')
+    if stream_id is None:
+        stream_id = _request_metadata().get('stream_id')
+    return _clean_stream_id(stream_id)
+
+
+# 기존 통계 카운터는 /metrics 를 만들 때 읽음 (요청 경로에 추가 비용 없음)
+metrics.counter('npu_frames_total', '처리한 프레임 수', lambda: engine.total_frames)
+metrics.counter('npu_fire_detections_total', '화재가 검출된 프레임 수', lambda: engine.fire_detections)
+metrics.counter('npu_alerts_total', '발동한 알림 수', lambda: alert_manager.alert_count)
+metrics.counter('npu_alerts_dropped_total', '알림 큐가 가득 차서 버린 알림 수', lambda: alert_manager.dropped)
+metrics.gauge('npu_active_streams', '활성 stream (카메라) 수', lambda: len(engine.sessions))
+metrics.gauge('npu_queue_depth', '받았지만 아직 처리가 끝나지 않은 프레임 수', lambda: pipeline.get_load()['queue_depth'])
+metrics.gauge('npu_tcp_connections', 'TCP 프레임 전송 연결 수', lambda: tcp_server.get_stats()['active_connections'])
 
 
 @app.route('/health', methods=['GET'])
@@ -20,6 +66,7 @@ def health():
     return jsonify({
         'status': 'running',
         'model_loaded': engine is not None,
+        'load': pipeline.get_load() if pipeline is not None else None,
         'timestamp': datetime.now().isoformat()
     })
 
@@ -29,12 +76,95 @@ def stats():
     if engine is None:
         return jsonify({'error': 'Engine not initialized'}), 500
     
+    stream_id = _request_stream_id()
+    if stream_id is not None:
+        session = engine.sessions.get(stream_id, create=False)
+        if session is None:
+            return jsonify({'error': f'Unknown stream: {stream_id}'}), 404
+        return jsonify(session.get_stats())
+    
     stats = engine.get_stats()
+    if pipeline is not None:
+        stats['pipeline'] = pipeline.get_stats()
+    stats['streams'] = engine.sessions.get_stats()
     stats['alert_count'] = alert_manager.alert_count if alert_manager else 0
+    if alert_manager is not None:
+        stats['alerts'] = alert_manager.get_stats()
+    if tcp_server is not None:
+        stats['tcp'] = tcp_server.get_stats()
     
     return jsonify(stats)
 
 
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    # Prometheus text exposition (단계별 시간 histogram + 카운터)
+    if not metrics.ENABLED:
+        return jsonify({'error': 'Metrics disabled (NPU_METRICS=0)'}), 404
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+def _note_skipped(session, metadata):
+    # 클라이언트가 중복이라 건너뛴 프레임: 직전 트랙을 마지막으로 건너뛴 시각까지 연장
+    try:
+        count = int(metadata.get('skipped_frames') or 0)
+        ago = float(metadata.get('last_skipped_ago') or 0.0)
+    except (TypeError, ValueError):
+        return
+    if count > 0:
+        session.note_skipped(count, time.time() - min(max(ago, 0.0), config.TRACK_TTL))
+
+
+def parse_layout(metadata):
+    """ROI crop mosaic: 검출 좌표를 원본 프레임 기준으로 되돌릴 배치 정보 (없으면 None, 잘못되면 ValueError)"""
+    return RoiLayout.from_metadata(metadata, max_rois=config.ROI_MAX_CROPS) if metadata else None
+
+
+def submit_frame(jpeg_bytes, stream_id=None, metadata=None, layout=None):
+    """HTTP / TCP 공통: 프레임을 파이프라인에 넣고 (session, future) 반환"""
+    # metadata 검증을 session 생성보다 먼저 (잘못된 요청이 session 을 만들거나 갱신하지 않도록)
+    if layout is None:
+        layout = parse_layout(metadata)
+    session = engine.get_session(stream_id)
+    if metadata:
+        _note_skipped(session, metadata)
+    return session, pipeline.submit(jpeg_bytes, session, layout)
+
+
+def build_detect_response(result, session):
+    """HTTP / TCP 공통: 알림 처리 후 /detect 응답 dict 생성"""
+    if result['fire_detected'] and result['temporal_analysis']:
+        temporal = result['temporal_analysis']
+        
+        if temporal['is_dangerous']:
+            alert_manager.trigger(
+                severity=temporal['severity'],
+                detections_info=temporal['statistics'],
+                session=session
+            )
+    
+    return {
+        'stream_id': session.stream_id,
+        'fire_detected': result['fire_detected'],
+        'num_detections': len(result['detections']),
+        'severity': result['temporal_analysis']['severity'] if result['temporal_analysis'] else None,
+        'is_dangerous': result['temporal_analysis']['is_dangerous'] if result['temporal_analysis'] else False,
+        'statistics': result['temporal_analysis']['statistics'] if result['temporal_analysis'] else {},
+        'load': pipeline.get_load(),
+        'timestamp': datetime.now().isoformat()
+    }
+
+
+def overload_response():
+    """HTTP / TCP 공통: 큐가 가득 찼을 때 응답 (클라이언트가 전송률을 낮추도록 부하 정보 포함)"""
+    return {'error': 'Inference queue full', 'status': 503, 'load': pipeline.get_load()}
+
+
+def timeout_response():
+    """HTTP / TCP 공통: BATCH_RESULT_TIMEOUT 안에 결과가 없을 때 응답 (부하 정보 포함 → 클라이언트 backoff)"""
+    return {'error': 'Inference timeout', 'status': 504, 'load': pipeline.get_load()}
+
+
 @app.route('/detect', methods=['POST'])
 def detect():
     if engine is None:
@@ -45,31 +175,27 @@ def detect():
             return jsonify({'error': 'No frame provided'}), 400
         
         file = request.files['frame']
-        npimg = np.frombuffer(file.read(), np.uint8)
-        frame = cv2.imdecode(npimg, cv2.IMREAD_COLOR)
+        metadata = _request_metadata()
+        try:
+            layout = parse_layout(metadata)
+        except ValueError as e:
+            return jsonify({'error': f'Invalid metadata: {e}'}), 400
         
-        if frame is None:
+        try:
+            session, future = submit_frame(file.read(), _request_stream_id(), metadata, layout)
+            result = future.result(timeout=config.BATCH_RESULT_TIMEOUT)
+        except queue.Full:
+            response = jsonify(overload_response())
+            response.headers['Retry-After'] = '1'
+            return response, 503
+        except ResultTimeout:
+            response = jsonify(timeout_response())
+            response.headers['Retry-After'] = '1'
+            return response, 504
+        except FrameDecodeError:
             return jsonify({'error': 'Invalid frame'}), 400
         
-        result = engine.detect(frame)
-        
-        if result['fire_detected'] and result['temporal_analysis']:
-            temporal = result['temporal_analysis']
-            
-            if temporal['is_dangerous']:
-                alert_manager.trigger(
-                    severity=temporal['severity'],
-                    detections_info=temporal['statistics']
-                )
-        
-        return jsonify({
-            'fire_detected': result['fire_detected'],
-            'num_detections': len(result['detections']),
-            'severity': result['temporal_analysis']['severity'] if result['temporal_analysis'] else None,
-            'is_dangerous': result['temporal_analysis']['is_dangerous'] if result['temporal_analysis'] else False,
-            'statistics': result['temporal_analysis']['statistics'] if result['temporal_analysis'] else {},
-            'timestamp': datetime.now().isoformat()
-        })
+        return jsonify(build_detect_response(result, session))
     
     except Exception as e:
         print(f"감지 오류: {e}")
@@ -81,6 +207,18 @@ def get_alert():
     if alert_manager is None:
         return jsonify({'error': 'Alert manager not initialized'}), 500
     
+    stream_id = _request_stream_id()
+    if stream_id is not None:
+        session = engine.sessions.get(stream_id, create=False) if engine else None
+        if session is None:
+            return jsonify({'error': f'Unknown stream: {stream_id}'}), 404
+        return jsonify({
+            'stream_id': stream_id,
+            'active': session.active,
+            'alert_count': session.alert_count,
+            'last_alert': session.last_alert_time
+        })
+    
     return jsonify({
         'active': alert_manager.active,
         'alert_count': alert_manager.alert_count,
@@ -90,33 +228,69 @@ def get_alert():
 
 @app.route('/reset', methods=['POST'])
 def reset():
+    # ?stream_id= 가 있으면 그 stream 만 초기화
+    stream_id = _request_stream_id()
+    
+    reset_streams = 0
     if engine:
-        engine.reset()
-    if alert_manager:
+        reset_streams = engine.reset(stream_id)
+    if alert_manager and stream_id is None:
         alert_manager.reset()
     
-    return jsonify({'status': 'reset complete'})
+    return jsonify({
+        'status': 'reset complete',
+        'stream_id': stream_id,
+        'reset_streams': reset_streams
+    })
+
+
+def _shutdown():
+    # 남은 알림 처리 / 로그 flush, 파이프라인 / NPU 스케줄러 스레드 정리
+    if tcp_server is not None:
+        tcp_server.stop()
+    if alert_manager is not None:
+        alert_manager.close()
+    if pipeline is not None:
+        pipeline.stop()
+    if engine is not None:
+        engine.close()
 
 
 def main():
-    global engine, alert_manager
+    global engine, pipeline, alert_manager, tcp_server
     
     print("="*60)
     print("Orange Pi NPU 화재 감지 서버")
     print("="*60)
     print(f"버전: v2.0 (모듈화)")
     print(f"모델: {config.MODEL_PATH}")
-    print(f"포트: {config.PORT}")
-    print(f"알림 스크립트: {config.ALERT_SCRIPT}")
+    print(f"포트: {config.PORT}" + (f" (TCP 프레임 전송: {config.TCP_PORT})" if config.TCP_ENABLED else ""))
+    print(f"알림 로그: {config.ALERT_LOG_FILE}")
+    print(f"배치: 최대 {config.BATCH_MAX_SIZE}장 / {config.BATCH_MAX_WAIT_MS}ms 대기 / 큐 {config.BATCH_QUEUE_DEPTH}")
+    print(f"스트림: 최대 {config.STREAM_MAX}개, idle {config.STREAM_IDLE_TIMEOUT:.0f}초 후 제거")
+    print(f"파이프라인: decode {config.PIPELINE_DECODE_WORKERS} / preprocess {config.PIPELINE_PREPROCESS_WORKERS} / postprocess {config.PIPELINE_POSTPROCESS_WORKERS} 스레드, 큐 {config.PIPELINE_QUEUE_DEPTH}")
+    if config.USE_MOCK_ENGINE:
+        print(f"엔진: Mock (NPU 미사용)")
     print("="*60)
     
     try:
         engine = FireDetectionEngine(config.MODEL_PATH)
+        pipeline = DetectionPipeline(engine)
         
         alert_manager = AlertManager(
-            script_path=config.ALERT_SCRIPT,
-            cooldown=config.ALERT_COOLDOWN
+            log_path=config.ALERT_LOG_FILE,
+            cooldown=config.ALERT_COOLDOWN,
+            queue_size=config.ALERT_QUEUE_SIZE
         )
+        atexit.register(_shutdown)
+        
+        if config.TCP_ENABLED:
+            tcp_server = TCPFrameServer(
+                submit_frame,
+                build_detect_response,
+                port=config.TCP_PORT,
+                overload_fn=overload_response
+            ).start()
         
         print(f"\n서버 초기화 완료")
         print(f"서버 시작: http://0.0.0.0:{config.PORT}")
@@ -124,8 +298,12 @@ def main():
         print(f"  POST /detect  - 화재 감지")
         print(f"  GET  /health  - 서버 상태")
         print(f"  GET  /stats   - 통계 정보")
+        if metrics.ENABLED:
+            print(f"  GET  /metrics - Prometheus 메트릭 (단계별 시간)")
         print(f"  GET  /alert   - 알림 상태")
         print(f"  POST /reset   - 초기화")
+        if config.TCP_ENABLED:
+            print(f"  TCP  :{config.TCP_PORT}    - 바이너리 프레임 전송 (pipelined)")
         print("="*60)
         
         app.run(
@@ -0,0 +1,133 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class StreamSession:
+    """
+    카메라(stream) 하나의 상태: temporal analyzer, 카운터, 알림 cooldown
+    """
+
+    def __init__(self, stream_id, temporal_analyzer):
+        self.stream_id = stream_id
+        self.temporal_analyzer = temporal_analyzer
+        self.lock = threading.Lock()
+
+        self.total_frames = 0
+        self.fire_detections = 0
+        self.skipped_frames = 0     # 클라이언트가 중복이라 보내지 않은 프레임 수
+
+        self.last_alert_time = 0
+        self.alert_count = 0
+        self.active = False
+
+        self.created = time.time()
+        self.last_seen = self.created
+
+    def note_skipped(self, count, until):
+        """
+        클라이언트가 직전 프레임과 거의 같은 프레임 count 장을 건너뜀 (마지막 건너뛴 시각: until)
+        """
+        with self.lock:
+            self.skipped_frames += count
+            self.temporal_analyzer.extend(until)
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                'stream_id': self.stream_id,
+                'total_frames': self.total_frames,
+                'skipped_frames': self.skipped_frames,
+                'fire_detections': self.fire_detections,
+                'detection_rate': self.fire_detections / max(self.total_frames, 1),
+                'tracked_fires': len(self.temporal_analyzer.tracks),
+                'alert_count': self.alert_count,
+                'alert_active': self.active,
+                'last_alert': self.last_alert_time,
+                'last_seen': self.last_seen,
+            }
+
+    def reset(self):
+        with self.lock:
+            self.temporal_analyzer.reset()
+            self.total_frames = 0
+            self.fire_detections = 0
+            self.skipped_frames = 0
+            self.active = False
+
+
+class StreamRegistry:
+    """
+    stream_id → StreamSession (LRU)
+
+    - idle_timeout 초 동안 프레임이 없던 stream 은 제거
+    - stream 수가 max_streams 를 넘으면 가장 오래 조용했던 stream 부터 제거
+    """
+
+    def __init__(self, analyzer_factory, max_streams=64, idle_timeout=600.0):
+        """
+        Args:
+            analyzer_factory: 새 stream 용 TemporalAnalyzerNPU 를 만드는 함수
+            max_streams (int): 최대 stream 수
+            idle_timeout (float): idle stream 제거 시간 (초)
+        """
+        self.analyzer_factory = analyzer_factory
+        self.max_streams = max_streams
+        self.idle_timeout = idle_timeout
+
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get(self, stream_id, create=True):
+        now = time.time()
+        with self._lock:
+            self._evict_idle(now)
+
+            session = self._sessions.get(stream_id)
+            if session is None:
+                if not create:
+                    return None
+                while len(self._sessions) >= self.max_streams:
+                    self._sessions.popitem(last=False)
+                    self.evicted += 1
+                session = StreamSession(stream_id, self.analyzer_factory())
+                self._sessions[stream_id] = session
+                print(f"새 stream 등록: {stream_id} ({len(self._sessions)}/{self.max_streams})")
+            elif create:
+                self._sessions.move_to_end(stream_id)
+
+            # 조회만 할 때(create=False)는 idle 시간을 갱신하지 않는다
+            if create:
+                session.last_seen = now
+            return session
+
+    def _evict_idle(self, now):
+        while self._sessions:
+            stream_id, session = next(iter(self._sessions.items()))
+            if now - session.last_seen <= self.idle_timeout:
+                break
+            del self._sessions[stream_id]
+            self.evicted += 1
+            print(f"idle stream 제거: {stream_id}")
+
+    def sessions(self):
+        with self._lock:
+            return list(self._sessions.values())
+
+    def get_stats(self):
+        return {s.stream_id: s.get_stats() for s in self.sessions()}
+
+    def reset(self, stream_id=None):
+        """stream_id 가 None 이면 전체 초기화. 반환: 초기화한 stream 수"""
+        if stream_id is None:
+            targets = self.sessions()
+        else:
+            session = self.get(stream_id, create=False)
+            targets = [session] if session is not None else []
+        for session in targets:
+            session.reset()
+        return len(targets)
@@ -0,0 +1,228 @@
+import json
+import queue
+import socket
+import struct
+import threading
+
+from pipeline import FrameDecodeError
+
+
+# 메시지 = 헤더(20 bytes) + metadata JSON + body
+#   magic(4) | type(1) | flags(1) | reserved(2) | seq(4) | meta_len(4) | body_len(4)   (network byte order)
+# 클라이언트 → 서버: MSG_FRAME  (metadata: stream_id 등, body: JPEG)
+# 서버 → 클라이언트: MSG_RESULT (body: /detect 응답 JSON) / MSG_ERROR (body: {'error', 'status'}, 503 이면 'load' 포함)
+# 응답은 처리가 끝나는 순서대로 보내고 seq 로 요청과 매칭한다. 클라이언트는 응답을 기다리지 않고 계속 보낼 수 있다.
+MAGIC = b'NPU1'
+HEADER = struct.Struct('!4sBBHIII')
+
+MSG_FRAME = 1
+MSG_RESULT = 2
+MSG_ERROR = 3
+
+MAX_META_SIZE = 64 * 1024
+MAX_BODY_SIZE = 16 * 1024 * 1024
+
+
+def pack_message(msg_type, seq, metadata=b'', body=b''):
+    return HEADER.pack(MAGIC, msg_type, 0, 0, seq, len(metadata), len(body)) + metadata + body
+
+
+def recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    pos = 0
+    while pos < n:
+        got = sock.recv_into(view[pos:], n - pos)
+        if got == 0:
+            raise ConnectionError("연결 종료")
+        pos += got
+    return bytes(buf)
+
+
+def recv_message(sock):
+    magic, msg_type, _, _, seq, meta_len, body_len = HEADER.unpack(recv_exact(sock, HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"잘못된 magic: {magic!r}")
+    if meta_len > MAX_META_SIZE or body_len > MAX_BODY_SIZE:
+        raise ValueError(f"메시지 크기 초과: meta={meta_len}, body={body_len}")
+    metadata = recv_exact(sock, meta_len) if meta_len else b''
+    body = recv_exact(sock, body_len) if body_len else b''
+    return msg_type, seq, metadata, body
+
+
+class _Connection:
+    """클라이언트 연결 하나: reader 스레드(요청 → 파이프라인) + writer 스레드(응답 전송)"""
+
+    def __init__(self, server, sock, addr):
+        self.server = server
+        self.sock = sock
+        self.addr = addr
+        self._out = queue.Queue()
+        self._closed = threading.Event()
+        self._close_lock = threading.Lock()
+
+        self._reader = threading.Thread(target=self._read_loop, name=f"tcp-read-{addr}", daemon=True)
+        self._writer = threading.Thread(target=self._write_loop, name=f"tcp-write-{addr}", daemon=True)
+
+    def start(self):
+        self._reader.start()
+        self._writer.start()
+
+    def _send(self, msg_type, seq, payload):
+        self._out.put(pack_message(msg_type, seq, body=json.dumps(payload).encode('utf-8')))
+
+    def _read_loop(self):
+        try:
+            while not self._closed.is_set():
+                msg_type, seq, metadata, body = recv_message(self.sock)
+                if msg_type != MSG_FRAME:
+                    self._send(MSG_ERROR, seq, {'error': f'Unknown message type {msg_type}', 'status': 400})
+                    continue
+                self._handle_frame(seq, metadata, body)
+        except (ConnectionError, OSError, ValueError, struct.error) as e:
+            if not self._closed.is_set():
+                print(f"TCP 연결 종료 {self.addr}: {e}")
+        finally:
+            self.close()
+
+    def _handle_frame(self, seq, metadata, body):
+        meta = {}
+        if metadata:
+            try:
+                meta = json.loads(metadata)
+            except ValueError:
+                meta = {}
+            if not isinstance(meta, dict):
+                meta = {}
+        stream_id = meta.get('stream_id')
+        if stream_id is not None:
+            stream_id = str(stream_id).strip()[:64] or None
+
+        try:
+            session, future = self.server.submit_fn(body, stream_id, meta)
+        except queue.Full:
+            self._send(MSG_ERROR, seq, self.server.overload_fn())
+            return
+        except ValueError as e:
+            self._send(MSG_ERROR, seq, {'error': f'Invalid metadata: {e}', 'status': 400})
+            return
+
+        future.add_done_callback(lambda f, seq=seq, session=session: self._on_result(seq, session, f))
+
+    def _on_result(self, seq, session, future):
+        error = future.exception()
+        if isinstance(error, FrameDecodeError):
+            self._send(MSG_ERROR, seq, {'error': 'Invalid frame', 'status': 400})
+            return
+        if error is not None:
+            self._send(MSG_ERROR, seq, {'error': str(error), 'status': 500})
+            return
+        try:
+            response = self.server.respond_fn(future.result(), session)
+        except Exception as e:
+            self._send(MSG_ERROR, seq, {'error': str(e), 'status': 500})
+            return
+        self._send(MSG_RESULT, seq, response)
+
+    def _write_loop(self):
+        while True:
+            data = self._out.get()
+            if data is None:
+                break
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.close()
+                break
+
+    def close(self):
+        with self._close_lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+        self._out.put(None)
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+        self.server._forget(self)
+
+
+class TCPFrameServer:
+    """
+    길이 prefix 바이너리 프레임 전송 서버 (연결 하나를 계속 유지)
+
+    - 요청마다 HTTP 헤더 / multipart 파싱을 하지 않는다
+    - 연결마다 요청을 파이프라인에 바로 넣고, 결과는 끝나는 대로 돌려준다 (pipelining)
+    """
+
+    def __init__(self, submit_fn, respond_fn, host='0.0.0.0', port=5001, overload_fn=None):
+        """
+        Args:
+            submit_fn: (jpeg_bytes, stream_id, metadata dict) → (session, future)
+            respond_fn: (result, session) → 응답 dict
+            host (str): bind 주소
+            port (int): TCP 포트
+            overload_fn: () → 큐가 가득 찼을 때 ERROR 응답 dict (기본: error / status 503 만)
+        """
+        self.submit_fn = submit_fn
+        self.respond_fn = respond_fn
+        self.overload_fn = overload_fn or (lambda: {'error': 'Inference queue full', 'status': 503})
+        self.host = host
+        self.port = port
+
+        self._sock = None
+        self._thread = None
+        self._connections = set()
+        self._lock = threading.Lock()
+        self.total_connections = 0
+
+    def start(self):
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self._sock.listen()
+        self.port = self._sock.getsockname()[1]
+
+        self._thread = threading.Thread(target=self._accept_loop, name="tcp-accept", daemon=True)
+        self._thread.start()
+        return self
+
+    def _accept_loop(self):
+        while True:
+            try:
+                sock, addr = self._sock.accept()
+            except OSError:
+                break
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            conn = _Connection(self, sock, addr)
+            with self._lock:
+                self.total_connections += 1
+                self._connections.add(conn)
+            conn.start()
+
+    def _forget(self, conn):
+        with self._lock:
+            self._connections.discard(conn)
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'port': self.port,
+                'active_connections': len(self._connections),
+                'total_connections': self.total_connections,
+            }
+
+    def stop(self):
+        if self._sock is not None:
+            # shutdown 으로 accept() 대기를 깨운 뒤 close
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self._sock.close()
+        with self._lock:
+            conns = list(self._connections)
+        for conn in conns:
+            conn.close()
@@ -1,62 +1,85 @@
-import time
+from track_store import TrackStore
+import metrics
+
+
+ANALYZE_SECONDS = metrics.histogram('npu_temporal_analyze_seconds', 'temporal 분석 (트랙 매칭 / 지속 / 확산 판단) 시간')
 
 
 class TemporalAnalyzerNPU:
     
-    def __init__(self, persistence_threshold=10.0, growth_factor=1.5):
+    def __init__(self, persistence_threshold=10.0, growth_factor=1.5,
+                 track_ttl=5.0, max_tracks=256, cell_size=64, iou_thres=0.3):
         self.persistence_threshold = persistence_threshold
         self.growth_factor = growth_factor
         
-        self.fire_history = {}
+        self.tracks = TrackStore(
+            cell_size=cell_size,
+            ttl=track_ttl,
+            max_tracks=max_tracks,
+            iou_thres=iou_thres
+        )
         self.last_detections = {}
+        self.last_track_ids = []
     
+    def extend(self, until):
+        """
+        클라이언트가 직전 프레임과 거의 같은 프레임을 건너뛴 경우 (중복 전송 생략)
+        직전 프레임에서 본 트랙을 until 시각까지 계속 본 것으로 처리 → 지속 시간 / TTL 유지
+        """
+        for track_id in self.last_track_ids:
+            track = self.tracks.get(track_id)
+            if track is not None:
+                self.tracks.touch(track, until)
+    
+    @metrics.timed(ANALYZE_SECONDS)
     def analyze(self, detections, frame_timestamp):
         current_detections = []
         persistent_fires = []
         spreading_fires = []
         
-        for det in detections:
+        self.tracks.evict(frame_timestamp)
+        
+        # 한 트랙에는 프레임당 검출 하나만 연결 (conf 높은 검출 우선)
+        matched = set()
+        for det in sorted(detections, key=lambda d: -float(d[4])):
             x1, y1, x2, y2, conf, cls = det
             
             if cls != 0:
                 continue
             
-            fire_id = self._get_fire_id(x1, y1, x2, y2)
-            bbox_area = (x2 - x1) * (y2 - y1)
+            bbox = (float(x1), float(y1), float(x2), float(y2))
+            bbox_area = (bbox[2] - bbox[0]) * (bbox[3] - bbox[1])
             
-            current_detections.append({
-                'id': fire_id,
-                'bbox': (x1, y1, x2, y2),
-                'confidence': conf,
-                'area': bbox_area,
-                'timestamp': frame_timestamp
-            })
+            track = self.tracks.match(bbox, exclude=matched)
             
-            if fire_id in self.fire_history:
-                history = self.fire_history[fire_id]
-                duration = frame_timestamp - history['first_seen']
+            if track is not None:
+                duration = frame_timestamp - track.first_seen
+                fire_id = self._fire_id(track)
                 
                 if duration >= self.persistence_threshold:
                     persistent_fires.append(fire_id)
                 
-                initial_area = history['initial_area']
-                if bbox_area > initial_area * self.growth_factor:
+                if bbox_area > track.initial_area * self.growth_factor:
                     spreading_fires.append(fire_id)
                 
-                history['last_seen'] = frame_timestamp
-                history['last_area'] = bbox_area
-                history['detection_count'] += 1
+                self.tracks.update(track, bbox, bbox_area, frame_timestamp)
             
             else:
-                self.fire_history[fire_id] = {
-                    'first_seen': frame_timestamp,
-                    'last_seen': frame_timestamp,
-                    'initial_area': bbox_area,
-                    'last_area': bbox_area,
-                    'detection_count': 1
-                }
+                track = self.tracks.create(bbox, bbox_area, frame_timestamp)
+                fire_id = self._fire_id(track)
+            
+            matched.add(track.track_id)
+            
+            current_detections.append({
+                'id': fire_id,
+                'bbox': bbox,
+                'confidence': float(conf),
+                'area': bbox_area,
+                'timestamp': frame_timestamp
+            })
         
         self.last_detections = {det['id']: det for det in current_detections}
+        self.last_track_ids = list(matched)
         
         is_dangerous = len(persistent_fires) > 0 or len(spreading_fires) > 0
         
@@ -74,17 +97,16 @@ class TemporalAnalyzerNPU:
             'spreading_fires': spreading_fires,
             'statistics': {
                 'total_detections': len(current_detections),
-                'tracked_fires': len(self.fire_history),
+                'tracked_fires': len(self.tracks),
                 'persistent_count': len(persistent_fires),
                 'spreading_count': len(spreading_fires)
             }
         }
     
-    def _get_fire_id(self, x1, y1, x2, y2):
-        cx = int((x1 + x2) / 2 / 50) * 50
-        cy = int((y1 + y2) / 2 / 50) * 50
-        return f"fire_{cx}_{cy}"
+    def _fire_id(self, track):
+        return f"fire_{track.track_id}"
     
     def reset(self):
-        self.fire_history = {}
+        self.tracks.clear()
         self.last_detections = {}
+        self.last_track_ids = []
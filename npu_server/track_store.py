@@ -0,0 +1,158 @@
+from collections import OrderedDict
+
+
+class Track:
+    __slots__ = (
+        'track_id', 'x1', 'y1', 'x2', 'y2', 'cell',
+        'first_seen', 'last_seen', 'initial_area', 'last_area', 'detection_count'
+    )
+
+    def __init__(self, track_id, bbox, area, timestamp, cell):
+        self.track_id = track_id
+        self.x1, self.y1, self.x2, self.y2 = bbox
+        self.cell = cell
+        self.first_seen = timestamp
+        self.last_seen = timestamp
+        self.initial_area = area
+        self.last_area = area
+        self.detection_count = 1
+
+
+class TrackStore:
+    """
+    화재 트랙 저장소 (공간 grid index + TTL)
+
+    - 검출은 중심점 주변 3x3 셀에 있는 트랙과만 비교 → 검출당 O(1)
+    - IoU 가 iou_thres 이상이면 같은 트랙, 아니면 중심점 거리 max_dist 이하인 가장 가까운 트랙
+    - ttl 초 동안 갱신되지 않은 트랙은 제거, 트랙 수가 max_tracks 를 넘으면 가장 오래 안 보인 트랙부터 제거
+    """
+
+    def __init__(self, cell_size=64, ttl=5.0, max_tracks=256, iou_thres=0.3, max_dist=None):
+        """
+        Args:
+            cell_size (float): grid 셀 크기 (px)
+            ttl (float): 트랙 유지 시간 (초)
+            max_tracks (int): 최대 트랙 수
+            iou_thres (float): 같은 트랙으로 볼 최소 IoU
+            max_dist (float): IoU 가 낮을 때 같은 트랙으로 볼 최대 중심점 거리 (기본: cell_size)
+        """
+        self.cell_size = float(cell_size)
+        self.ttl = ttl
+        self.max_tracks = max_tracks
+        self.iou_thres = iou_thres
+        # 3x3 셀 탐색 범위를 넘는 거리는 찾을 수 없으므로 cell_size 로 제한
+        self.max_dist = min(max_dist or self.cell_size, self.cell_size)
+
+        self._tracks = OrderedDict()    # track_id -> Track (last_seen 오래된 순)
+        self._grid = {}                 # (gx, gy) -> {track_id, ...}
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __contains__(self, track_id):
+        return track_id in self._tracks
+
+    def get(self, track_id):
+        return self._tracks.get(track_id)
+
+    def _cell_of(self, cx, cy):
+        return (int(cx // self.cell_size), int(cy // self.cell_size))
+
+    def _grid_add(self, track):
+        self._grid.setdefault(track.cell, set()).add(track.track_id)
+
+    def _grid_remove(self, track):
+        ids = self._grid.get(track.cell)
+        if ids is not None:
+            ids.discard(track.track_id)
+            if not ids:
+                del self._grid[track.cell]
+
+    def _remove(self, track_id):
+        track = self._tracks.pop(track_id)
+        self._grid_remove(track)
+
+    def evict(self, now):
+        """TTL 이 지난 트랙 제거. 반환: 제거한 트랙 수"""
+        removed = 0
+        while self._tracks:
+            track_id, track = next(iter(self._tracks.items()))
+            if now - track.last_seen <= self.ttl:
+                break
+            self._remove(track_id)
+            removed += 1
+        return removed
+
+    def match(self, bbox, exclude=()):
+        """bbox 와 가장 잘 맞는 기존 트랙 (없으면 None). exclude 의 트랙은 건너뜀"""
+        x1, y1, x2, y2 = bbox
+        cx = (x1 + x2) / 2
+        cy = (y1 + y2) / 2
+        gx, gy = self._cell_of(cx, cy)
+        area = max(x2 - x1, 0) * max(y2 - y1, 0)
+
+        best, best_iou = None, self.iou_thres
+        near, near_dist = None, self.max_dist * self.max_dist
+
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                for track_id in self._grid.get((gx + dx, gy + dy), ()):
+                    if track_id in exclude:
+                        continue
+                    t = self._tracks[track_id]
+
+                    iw = min(x2, t.x2) - max(x1, t.x1)
+                    ih = min(y2, t.y2) - max(y1, t.y1)
+                    if iw > 0 and ih > 0:
+                        inter = iw * ih
+                        t_area = (t.x2 - t.x1) * (t.y2 - t.y1)
+                        iou = inter / (area + t_area - inter + 1e-9)
+                        if iou >= best_iou:
+                            best, best_iou = t, iou
+
+                    tcx = (t.x1 + t.x2) / 2
+                    tcy = (t.y1 + t.y2) / 2
+                    dist = (cx - tcx) ** 2 + (cy - tcy) ** 2
+                    if dist <= near_dist:
+                        near, near_dist = t, dist
+
+        return best if best is not None else near
+
+    def update(self, track, bbox, area, timestamp):
+        track.x1, track.y1, track.x2, track.y2 = bbox
+        track.last_seen = timestamp
+        track.last_area = area
+        track.detection_count += 1
+
+        cell = self._cell_of((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+        if cell != track.cell:
+            self._grid_remove(track)
+            track.cell = cell
+            self._grid_add(track)
+
+        self._tracks.move_to_end(track.track_id)
+
+    def touch(self, track, timestamp):
+        """위치 / 검출 수는 그대로 두고 마지막으로 본 시각만 갱신"""
+        if timestamp <= track.last_seen:
+            return
+        track.last_seen = timestamp
+        self._tracks.move_to_end(track.track_id)
+
+    def create(self, bbox, area, timestamp):
+        while len(self._tracks) >= self.max_tracks:
+            self._remove(next(iter(self._tracks)))
+
+        track_id = self._next_id
+        self._next_id += 1
+
+        cell = self._cell_of((bbox[0] + bbox[2]) / 2, (bbox[1] + bbox[3]) / 2)
+        track = Track(track_id, bbox, area, timestamp, cell)
+        self._tracks[track_id] = track
+        self._grid_add(track)
+        return track
+
+    def clear(self):
+        self._tracks.clear()
+        self._grid.clear()
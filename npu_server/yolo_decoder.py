@@ -1,7 +1,16 @@
 import cv2
 import numpy as np
 
+import metrics
 
+
+DECODE_NPU_SECONDS = metrics.histogram('npu_yolo_decode_seconds', 'YOLO 출력 디코딩 + NMS 시간',
+                                       labels={'decoder': 'npu'})
+DECODE_SECONDS = metrics.histogram('npu_yolo_decode_seconds', 'YOLO 출력 디코딩 + NMS 시간',
+                                   labels={'decoder': 'numpy'})
+
+
+@metrics.timed(DECODE_NPU_SECONDS)
 def decode_yolo_output_npu(output, conf_thres=0.25, iou_thres=0.45, input_size=640):
     try:
         if len(output.shape) == 3:
@@ -43,3 +52,110 @@ def decode_yolo_output_npu(output, conf_thres=0.25, iou_thres=0.45, input_size=6
     except Exception as e:
         print(f"YOLO 디코딩 오류: {e}")
         return []
+
+
+DETECTION_DTYPE = np.dtype([
+    ('x1', np.float32),
+    ('y1', np.float32),
+    ('x2', np.float32),
+    ('y2', np.float32),
+    ('conf', np.float32),
+    ('cls', np.int32),
+])
+
+
+def nms_numpy(boxes, scores, iou_thres=0.45):
+    """
+    greedy NMS (x1, y1, x2, y2 코너 좌표). 남길 인덱스를 점수 내림차순으로 반환
+    """
+    order = np.argsort(-scores, kind='stable')
+    b = boxes[order]
+    x1, y1, x2, y2 = b[:, 0], b[:, 1], b[:, 2], b[:, 3]
+    areas = np.maximum(x2 - x1, 0) * np.maximum(y2 - y1, 0)
+    
+    # 남은 후보 인덱스(점수순)를 줄여가며 반복 → 비용은 (남긴 박스 수 × 후보 수)
+    remaining = np.arange(len(order))
+    keep = []
+    while remaining.size > 0:
+        i = remaining[0]
+        keep.append(i)
+        rest = remaining[1:]
+        
+        w = np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest])
+        h = np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest])
+        inter = np.maximum(w, 0) * np.maximum(h, 0)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        
+        remaining = rest[iou <= iou_thres]
+    
+    return order[np.asarray(keep, dtype=np.intp)]
+
+
+def batched_nms_numpy(boxes, scores, class_ids, iou_thres=0.45):
+    """
+    class-aware NMS: 클래스마다 좌표를 겹치지 않게 offset 해서 NMS 한 번으로 처리
+    """
+    if len(boxes) == 0:
+        return np.empty(0, dtype=np.intp)
+    offset = class_ids.astype(np.float32)[:, None] * (float(boxes.max()) + 1.0)
+    return nms_numpy(boxes + offset, scores, iou_thres)
+
+
+def _to_channels(output):
+    """(6, N) / (N, 6) / (1, 6, N) → (6, N)  (conf 필터를 연속 메모리에서 하기 위해)"""
+    if output.ndim == 3:
+        output = output[0]
+    if output.shape[0] != 6:
+        output = output.T
+    return output
+
+
+@metrics.timed(DECODE_SECONDS)
+def decode_yolo_output(output, conf_thres=0.25, iou_thres=0.45, input_size=640, max_det=300):
+    """
+    NPU 출력 1 프레임 → DETECTION_DTYPE 구조화 배열 (conf 내림차순, 좌표는 [0, input_size] 로 clip)
+    """
+    chans = _to_channels(np.asarray(output))
+    
+    idx = np.flatnonzero(chans[4] > conf_thres)
+    if idx.size == 0:
+        return np.empty(0, dtype=DETECTION_DTYPE)
+    
+    cand = chans[:, idx].astype(np.float32)
+    boxes = np.ascontiguousarray(cand[:4].T)
+    # 입력 밖으로 나간 좌표 정리 (batched NMS 의 클래스별 offset 도 input_size 기준으로 유지)
+    np.clip(boxes, 0, input_size, out=boxes)
+    scores = cand[4]
+    class_ids = cand[5].astype(np.int32) if cand.shape[0] > 5 else np.zeros(idx.size, np.int32)
+    
+    keep = batched_nms_numpy(boxes, scores, class_ids, iou_thres)[:max_det]
+    
+    dets = np.empty(len(keep), dtype=DETECTION_DTYPE)
+    dets['x1'] = boxes[keep, 0]
+    dets['y1'] = boxes[keep, 1]
+    dets['x2'] = boxes[keep, 2]
+    dets['y2'] = boxes[keep, 3]
+    dets['conf'] = scores[keep]
+    dets['cls'] = class_ids[keep]
+    return dets
+
+
+def decode_yolo_batch(outputs, conf_thres=0.25, iou_thres=0.45, input_size=640, max_det=300):
+    """
+    배치 NPU 출력 (B, 6, N) 또는 (B, N, 6) → 프레임별 구조화 배열 리스트
+    """
+    outputs = np.asarray(outputs)
+    if outputs.ndim == 2:
+        outputs = outputs[None]
+    
+    # conf 필터는 배치 전체에 한 번에 적용하고, 후보가 없는 프레임은 NMS 를 건너뛴다
+    channel_first = outputs.shape[1] == 6
+    scores = outputs[:, 4, :] if channel_first else outputs[:, :, 4]
+    has_cand = (scores > conf_thres).any(axis=1)
+    
+    empty = np.empty(0, dtype=DETECTION_DTYPE)
+    return [
+        decode_yolo_output(outputs[b], conf_thres, iou_thres, input_size, max_det)
+        if has_cand[b] else empty
+        for b in range(outputs.shape[0])
+    ]
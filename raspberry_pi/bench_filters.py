@@ -0,0 +1,112 @@
+"""
+필터 벤치마크: 원본 해상도 vs 분석 해상도 (코어 1개 기준 fps)
+
+녹화 영상을 넣으면 그 영상으로, 없으면 합성 영상(움직이는 불꽃 색 영역)으로 측정한다.
+
+    python3 bench_filters.py --clip fire01.mp4 --clip normal01.mp4 --widths 0 480 320
+"""
+import argparse
+import time
+
+import cv2
+import numpy as np
+
+from preprocessing_filters import ColorFireFilter, MotionFireFilter, HybridFireFilter, FrameAnalyzer
+
+FILTERS = {
+    'color': ColorFireFilter,
+    'motion': MotionFireFilter,
+    'hybrid': HybridFireFilter,
+}
+
+
+def load_clip(path, max_frames):
+    cap = cv2.VideoCapture(path)
+    frames = []
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    if not frames:
+        raise ValueError(f"영상을 읽을 수 없습니다: {path}")
+    return frames
+
+
+def synthetic_clip(num_frames, width, height):
+    rng = np.random.default_rng(0)
+    gy, gx = np.mgrid[0:height, 0:width]
+    background = np.stack([gx * 200 // width, gy * 200 // height, np.full_like(gx, 60)], axis=-1).astype(np.uint8)
+
+    frames = []
+    for i in range(num_frames):
+        frame = background.copy()
+        # 화면의 약 10% 크기로 흔들리며 이동하는 빨강 / 노랑 영역
+        cx = width // 4 + (i * 40) % (width // 2)
+        r = height // 5 + int(height // 20 * np.sin(i / 2))
+        cv2.circle(frame, (cx, height // 2), r, (0, 40, 255), -1)
+        cv2.circle(frame, (cx, height // 2 + r // 4), r // 2, (40, 200, 255), -1)
+        noise = rng.integers(-6, 7, frame.shape)
+        frames.append(np.clip(frame + noise, 0, 255).astype(np.uint8))
+    return frames
+
+
+def run(frames, filter_name, analysis_width, repeat):
+    filt = FILTERS[filter_name]()
+    analyzer = FrameAnalyzer(analysis_width=analysis_width)
+
+    for frame in frames[:10]:
+        filt.detect(analyzer(frame))
+    filt = FILTERS[filter_name]()
+
+    suspected = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            is_suspected = filt.detect(analyzer(frame))[0]
+            suspected += bool(is_suspected)
+    elapsed = time.perf_counter() - t0
+
+    total = len(frames) * repeat
+    return {
+        'filter': filter_name,
+        'width': analysis_width or frames[0].shape[1],
+        'fps': total / elapsed,
+        'ms_per_frame': elapsed / total * 1000.0,
+        'suspected_rate': suspected / total,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="필터 벤치마크 (원본 vs 분석 해상도)")
+    parser.add_argument('--clip', action='append', default=[], help='녹화 영상 (여러 번 지정 가능)')
+    parser.add_argument('--frames', type=int, default=300, help='영상당 최대 프레임 수')
+    parser.add_argument('--width', type=int, default=1280, help='합성 영상 가로')
+    parser.add_argument('--height', type=int, default=720, help='합성 영상 세로')
+    parser.add_argument('--widths', type=int, nargs='+', default=[0, 480, 320], help='분석 해상도 가로 (0 = 원본)')
+    parser.add_argument('--filters', nargs='+', default=list(FILTERS), choices=list(FILTERS))
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    # 코어 1개 기준
+    cv2.setNumThreads(1)
+
+    if args.clip:
+        clips = [(path, load_clip(path, args.frames)) for path in args.clip]
+    else:
+        clips = [('synthetic', synthetic_clip(args.frames, args.width, args.height))]
+
+    for name, frames in clips:
+        h, w = frames[0].shape[:2]
+        print(f"\n{name}: {len(frames)} 프레임 {w}x{h}")
+        print(f"{'filter':<8}{'width':>8}{'fps':>10}{'ms/frame':>10}{'suspected':>11}")
+        for filter_name in args.filters:
+            for width in args.widths:
+                r = run(frames, filter_name, width, args.repeat)
+                print(f"{r['filter']:<8}{r['width']:>8}{r['fps']:>10.1f}{r['ms_per_frame']:>10.2f}"
+                      f"{r['suspected_rate']:>10.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+JPEG 인코딩 벤치마크: backend / 품질별 ms/frame, bytes/frame (코어 1개 기준)
+
+설치된 backend (simplejpeg, turbojpeg, opencv) 를 모두 측정한다.
+녹화 영상을 넣으면 그 영상으로, 없으면 bench_filters 의 합성 영상으로 측정한다.
+
+    python3 bench_jpeg.py --clip fire01.mp4 --qualities 60 75 85 95
+"""
+import argparse
+import time
+
+import cv2
+
+from bench_filters import load_clip, synthetic_clip
+from jpeg_encoder import JpegEncoder, available_backends
+import config
+
+
+def run(frames, backend, quality, size, repeat):
+    encoder = JpegEncoder(quality=quality, size=size, backend=backend)
+    # 리사이즈는 인코딩 시간에서 빼기 위해 미리
+    frames = [encoder.resize(f) for f in frames]
+    encoder.size = None
+
+    for frame in frames[:5]:
+        encoder.encode(frame)
+
+    total_bytes = 0
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            total_bytes += len(encoder.encode(frame))
+    elapsed = time.perf_counter() - t0
+
+    n = len(frames) * repeat
+    return {
+        'backend': backend,
+        'quality': quality,
+        'ms_per_frame': elapsed / n * 1000.0,
+        'bytes_per_frame': total_bytes // n,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JPEG 인코딩 벤치마크")
+    parser.add_argument('--clip', type=str, default=None, help='녹화 영상 (없으면 합성 영상)')
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--size', type=int, nargs=2, default=list(config.MAX_FRAME_SIZE), help='전송 프레임 크기 W H')
+    parser.add_argument('--qualities', type=int, nargs='+', default=[60, 75, 85, 95])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    cv2.setNumThreads(1)
+
+    if args.clip:
+        frames = load_clip(args.clip, args.frames)
+    else:
+        frames = synthetic_clip(args.frames, 1280, 720)
+
+    size = tuple(args.size)
+    print(f"\n{args.clip or 'synthetic'}: {len(frames)} 프레임 → {size[0]}x{size[1]}")
+    print(f"{'backend':<12}{'quality':>8}{'ms/frame':>10}{'KB/frame':>10}")
+    for backend in available_backends():
+        for quality in args.qualities:
+            r = run(frames, backend, quality, size, args.repeat)
+            print(f"{r['backend']:<12}{r['quality']:>8}{r['ms_per_frame']:>10.2f}{r['bytes_per_frame'] / 1024:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
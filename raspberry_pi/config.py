@@ -3,11 +3,19 @@
 # RTSP 스트림 설정
 # ==================================================
 RTSP_URL = "rtsp://192.168.1.100:8554/stream"
+RECONNECT_MIN_DELAY = 0.5        # 연결 실패 시 첫 재연결 대기 (초)
+RECONNECT_MAX_DELAY = 10.0       # 재연결 대기 최대값 (초, 실패할 때마다 2배)
 
 # ==================================================
 # NPU 서버 설정
 # ==================================================
 NPU_SERVER_URL = "http://192.168.1.200:5000"
+STREAM_ID = ""                   # NPU 서버에서 카메라 구분용 id (비어 있으면 hostname)
+TRANSPORT = "http"               # 프레임 전송 방식: "http" (POST /detect) / "tcp" (연결 유지 + pipelined)
+NPU_TCP_PORT = 5001              # NPU 서버 TCP 프레임 포트
+TCP_MAX_INFLIGHT = 4             # TCP 전송 시 응답 대기 중 최대 프레임 수 (넘으면 버림)
+TCP_RESULT_TIMEOUT = 5.0         # TCP 응답 대기 최대 시간 (초, 넘으면 타임아웃 처리 후 재연결)
+TCP_SEND_TIMEOUT = 1.0           # TCP 전송이 막힐 때 최대 대기 시간 (초, 넘으면 전송 오류 처리 후 재연결)
 
 # ==================================================
 # 필터 설정
@@ -21,11 +29,34 @@ MOTION_THRESHOLD = 8.0           # 움직임 비율 (%)
 MOTION_DIFF_THRESHOLD = 40       # 프레임 차이 임계값
 TEMPORAL_FRAMES = 5              # 시간적 필터링 프레임 개수
 TEMPORAL_MIN_DETECTIONS = 3      # 최소 감지 횟수 )
+# 분석 해상도 / ROI
+ANALYSIS_WIDTH = 320             # 필터 분석 해상도 가로 (px, 0 이면 원본 해상도)
+ROI_POLYGON = []                 # 분석 영역 다각형 [(x, y), ...] (0~1 정규화 좌표, 비어 있으면 전체)
+ROI_MASK_PATH = ""               # 분석 영역 마스크 이미지 (흰색 = 분석, 비어 있으면 사용 안 함)
 # ==================================================
 # 전송 제어
 # ==================================================
-SEND_INTERVAL = 0.5              # NPU 서버 전송 간격 (초)
+SEND_INTERVAL = 0.5              # 시작 전송 간격 (초), 이후 RateController 가 조절
+RATE_MIN = 0.5                   # 최소 전송률 (fps, 간격이 NPU 서버 TRACK_TTL 보다 충분히 짧게)
+RATE_MAX = 5.0                   # 최대 전송률 (fps)
+RATE_INCREASE = 0.1              # 정상 응답마다 올리는 전송률 (fps)
+RATE_DECREASE = 0.5              # 혼잡 시 전송률 배율
+RATE_TARGET_RTT = 1.0            # 이보다 응답이 늦으면 혼잡으로 판단 (초)
+RATE_LOAD_HIGH = 0.8             # 서버 load (queue_depth / queue_limit) 가 이 이상이면 혼잡
+RATE_PRIORITY_SCORE = 2.0        # 필터 점수 (임계값 대비 비율) 가 이 이상이면 절반 간격으로 전송
+RATE_CANDIDATE_MAX_AGE = 1.0     # 대기 중인 전송 후보가 이보다 오래되면 점수와 상관없이 교체 (초)
+DEDUP_THRESHOLD = 3.0            # 마지막 전송 프레임과 32x32 gray 평균 차이가 이 미만이면 전송 생략 (0 = 사용 안 함)
+DEDUP_KEEPALIVE = 2.0            # 중복이어도 이 간격마다 한 장 전송 (초, NPU 서버 TRACK_TTL 보다 짧게)
 MAX_FRAME_SIZE = (640, 640)      # 전송 프레임 크기 (W, H)
+JPEG_QUALITY = 85                # 전송 JPEG 품질 (카메라마다 조절, --jpeg-quality)
+JPEG_BACKEND = "auto"            # "auto" (simplejpeg → turbojpeg → opencv) / "simplejpeg" / "turbojpeg" / "opencv"
+CROP_SEND = True                 # 필터 마스크 영역만 잘라 mosaic 으로 전송 (False 면 항상 전체 프레임)
+CROP_MAX = 4                     # mosaic 최대 crop 수
+CROP_MIN_AREA = 16               # 이보다 작은 마스크 영역은 무시 (분석 해상도 px)
+CROP_PAD = 0.25                  # crop 각 변 여백 (박스 크기 대비 비율)
+CROP_MIN_SIZE = 96               # crop 최소 가로 / 세로 (원본 px)
+CROP_MAX_COVERAGE = 0.5          # crop 면적 합이 프레임의 이 비율을 넘으면 전체 프레임 전송
+CROP_MAX_UPSCALE = 4.0           # 작은 crop 최대 확대 배율
 # ==================================================
 # 로깅 설정
 # ==================================================
@@ -0,0 +1,138 @@
+import math
+
+import cv2
+import numpy as np
+
+
+def _merge(a, b):
+    x1, y1 = min(a[0], b[0]), min(a[1], b[1])
+    x2, y2 = max(a[0] + a[2], b[0] + b[2]), max(a[1] + a[3], b[1] + b[3])
+    return (x1, y1, x2 - x1, y2 - y1)
+
+
+def _overlaps(a, b):
+    return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+            a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+
+class CropMosaic:
+    """
+    필터 마스크 영역만 잘라 한 장의 mosaic 으로 전송
+
+    - 마스크 (분석 해상도) 의 연결 요소 bounding box → 원본 프레임 좌표로 변환 + 여백 추가
+    - 겹치는 박스는 합치고, max_crops 개를 넘으면 합쳤을 때 가장 작은 쌍부터 합침
+    - crop 들을 격자로 배치 (작은 crop 은 max_upscale 배까지 확대 → 멀리 있는 작은 불꽃도 NPU 입력에서 커짐)
+    - 박스 면적 합이 프레임의 max_coverage 를 넘거나 박스가 없으면 None (전체 프레임 전송이 나음)
+    """
+
+    def __init__(self, size=(640, 640), max_crops=4, min_area=16, pad=0.25, min_size=96,
+                 max_coverage=0.5, max_upscale=4.0):
+        """
+        Args:
+            size (tuple): mosaic 크기 (W, H), 전송 프레임 크기와 같게
+            max_crops (int): 최대 crop 수
+            min_area (int): 이보다 작은 연결 요소는 무시 (분석 해상도 px)
+            pad (float): 박스 각 변에 더하는 여백 (박스 크기 대비 비율)
+            min_size (int): crop 최소 가로 / 세로 (원본 px, 주변 맥락 포함)
+            max_coverage (float): crop 면적 합이 프레임 대비 이 비율을 넘으면 전체 프레임 전송
+            max_upscale (float): crop 최대 확대 배율
+        """
+        self.size = tuple(size)
+        self.max_crops = max_crops
+        self.min_area = min_area
+        self.pad = pad
+        self.min_size = min_size
+        self.max_coverage = max_coverage
+        self.max_upscale = max_upscale
+
+        self.mosaics = 0
+        self.full_frames = 0
+        self.total_crops = 0
+
+    def find_boxes(self, mask, scale, frame_shape):
+        """마스크 → 원본 프레임 좌표 crop 박스 [(x, y, w, h), ...]"""
+        n, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        stats = stats[1:]
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area]
+        if len(stats) == 0:
+            return []
+        # 노이즈가 많아도 합치기 비용이 커지지 않게 큰 것부터 일부만
+        stats = stats[np.argsort(stats[:, cv2.CC_STAT_AREA])[::-1][:self.max_crops * 8]]
+
+        frame_h, frame_w = frame_shape[:2]
+        boxes = []
+        for x, y, w, h, _ in stats:
+            x, y, w, h = x / scale, y / scale, w / scale, h / scale
+            pad_w = max(w * (1 + 2 * self.pad), self.min_size)
+            pad_h = max(h * (1 + 2 * self.pad), self.min_size)
+            x1 = max(0, int(x + w / 2 - pad_w / 2))
+            y1 = max(0, int(y + h / 2 - pad_h / 2))
+            x2 = min(frame_w, int(math.ceil(x + w / 2 + pad_w / 2)))
+            y2 = min(frame_h, int(math.ceil(y + h / 2 + pad_h / 2)))
+            boxes.append((x1, y1, x2 - x1, y2 - y1))
+
+        # 겹치는 박스 합치기 (합친 결과가 다른 박스와 겹칠 수 있으므로 변화가 없을 때까지)
+        merged = True
+        while merged:
+            merged = False
+            for i in range(len(boxes)):
+                for j in range(i + 1, len(boxes)):
+                    if _overlaps(boxes[i], boxes[j]):
+                        boxes[i] = _merge(boxes[i], boxes.pop(j))
+                        merged = True
+                        break
+                if merged:
+                    break
+
+        while len(boxes) > self.max_crops:
+            best = None
+            for i in range(len(boxes)):
+                for j in range(i + 1, len(boxes)):
+                    union = _merge(boxes[i], boxes[j])
+                    if best is None or union[2] * union[3] < best[0]:
+                        best = (union[2] * union[3], i, j)
+            _, i, j = best
+            boxes[i] = _merge(boxes[i], boxes.pop(j))
+
+        return boxes
+
+    def build(self, frame, mask, scale):
+        """
+        반환: (mosaic, metadata) 또는 전체 프레임을 보내야 하면 (None, None)
+        metadata: {'frame_size': [W, H], 'mosaic_size': [W, H], 'rois': [{'src': [x, y, w, h], 'dst': [x, y, w, h]}, ...]}
+        """
+        boxes = self.find_boxes(mask, scale, frame.shape) if mask is not None else []
+        frame_h, frame_w = frame.shape[:2]
+        if not boxes or sum(w * h for _, _, w, h in boxes) > self.max_coverage * frame_w * frame_h:
+            self.full_frames += 1
+            return None, None
+
+        mosaic_w, mosaic_h = self.size
+        cols = int(math.ceil(math.sqrt(len(boxes))))
+        rows = int(math.ceil(len(boxes) / cols))
+        cell_w, cell_h = mosaic_w // cols, mosaic_h // rows
+
+        mosaic = np.zeros((mosaic_h, mosaic_w, 3), dtype=frame.dtype)
+        rois = []
+        for i, (x, y, w, h) in enumerate(boxes):
+            s = min(cell_w / w, cell_h / h, self.max_upscale)
+            dst_w, dst_h = max(1, int(w * s)), max(1, int(h * s))
+            dst_x, dst_y = (i % cols) * cell_w, (i // cols) * cell_h
+            mosaic[dst_y:dst_y + dst_h, dst_x:dst_x + dst_w] = cv2.resize(
+                frame[y:y + h, x:x + w], (dst_w, dst_h), interpolation=cv2.INTER_LINEAR)
+            rois.append({'src': [x, y, w, h], 'dst': [dst_x, dst_y, dst_w, dst_h]})
+
+        self.mosaics += 1
+        self.total_crops += len(rois)
+        return mosaic, {
+            'frame_size': [frame_w, frame_h],
+            'mosaic_size': [mosaic_w, mosaic_h],
+            'rois': rois,
+        }
+
+    def get_stats(self):
+        return {
+            'mosaics': self.mosaics,
+            'full_frames': self.full_frames,
+            'avg_crops': round(self.total_crops / self.mosaics, 2) if self.mosaics else None,
+        }
@@ -0,0 +1,79 @@
+import time
+
+import cv2
+
+
+class DuplicateGate:
+    """
+    마지막으로 보낸 프레임과 거의 같은 프레임은 보내지 않음
+
+    - 작은 gray 썸네일(기본 32x32)의 평균 밝기 차이가 threshold 미만이면 중복
+    - 중복이어도 keepalive 초마다 한 장은 보냄 (NPU 서버의 트랙 TTL / 지속 시간 판단 유지)
+    - 건너뛴 프레임 수는 다음 전송 프레임의 metadata 로 서버에 알림
+    """
+
+    def __init__(self, threshold=3.0, keepalive=2.0, size=(32, 32)):
+        """
+        Args:
+            threshold (float): 중복으로 볼 최대 평균 차이 (0~255, 0 이면 사용 안 함)
+            keepalive (float): 중복이어도 이 시간이 지나면 전송 (초, NPU 서버 TRACK_TTL 보다 짧게)
+            size (tuple): 비교용 썸네일 크기 (W, H)
+        """
+        self.threshold = threshold
+        self.keepalive = keepalive
+        self.size = size
+
+        self._last_thumb = None
+        self._last_sent = 0.0
+        self._skipped = 0
+        self._last_skipped = 0.0
+
+        self.total_skipped = 0
+        self.keepalives = 0
+        self.last_diff = None
+
+    def thumbnail(self, gray):
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+
+    def check(self, thumb, now=None):
+        """
+        반환: (보낼지 여부, keepalive 여부)
+        보내지 않으면 건너뛴 프레임으로 기록
+        """
+        now = time.time() if now is None else now
+        if self.threshold <= 0 or self._last_thumb is None:
+            return True, False
+
+        self.last_diff = float(cv2.absdiff(thumb, self._last_thumb).mean())
+        if self.last_diff >= self.threshold:
+            return True, False
+        if now - self._last_sent >= self.keepalive:
+            self.keepalives += 1
+            return True, True
+
+        self._skipped += 1
+        self._last_skipped = now
+        self.total_skipped += 1
+        return False, False
+
+    def skip_info(self, now=None):
+        """다음 전송 프레임 metadata 에 넣을 건너뛴 프레임 정보 (없으면 빈 dict)"""
+        if not self._skipped:
+            return {}
+        now = time.time() if now is None else now
+        return {
+            'skipped_frames': self._skipped,
+            'last_skipped_ago': round(now - self._last_skipped, 3),
+        }
+
+    def on_sent(self, thumb, now=None):
+        self._last_thumb = thumb
+        self._last_sent = time.time() if now is None else now
+        self._skipped = 0
+
+    def get_stats(self):
+        return {
+            'skipped': self.total_skipped,
+            'keepalives': self.keepalives,
+            'last_diff': round(self.last_diff, 2) if self.last_diff is not None else None,
+        }
@@ -0,0 +1,155 @@
+import threading
+import time
+
+import cv2
+
+
+class LatestSlot:
+    """값 하나만 보관하는 슬롯 (새 값이 오면 아직 안 가져간 값은 버림)"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._seq = 0
+        self._taken = 0
+
+        self.overwritten = 0
+
+    def put(self, item):
+        """
+        값 저장
+        반환: 아직 안 가져간 값을 덮어썼으면 True
+        """
+        with self._cond:
+            overwritten = self._item is not None and self._seq != self._taken
+            if overwritten:
+                self.overwritten += 1
+            self._seq += 1
+            self._item = item
+            self._cond.notify_all()
+            return overwritten
+
+    def get(self, timeout=None):
+        """새 값이 올 때까지 대기 후 반환 (timeout 이면 None)"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq != self._taken, timeout):
+                return None
+            self._taken = self._seq
+            return self._item
+
+    def clear(self):
+        with self._cond:
+            self._item = None
+            self._taken = self._seq
+
+
+class FrameGrabber:
+    """
+    RTSP 캡처 스레드 (latest-frame-wins)
+
+    - 처리 속도와 상관없이 계속 디코딩해서 OpenCV / FFmpeg 버퍼에 오래된 프레임이 쌓이지 않게 한다
+    - 가장 최근 프레임 하나만 보관하고, 가져가기 전에 새 프레임이 오면 이전 프레임은 버림 (dropped)
+    - 연결이 끊기면 backoff (reconnect_min ~ reconnect_max 초) 로 재연결
+    """
+
+    def __init__(self, source, reconnect_min=0.5, reconnect_max=10.0):
+        """
+        Args:
+            source (str): RTSP URL (cv2.VideoCapture 에 넘길 값)
+            reconnect_min (float): 첫 재연결 대기 시간 (초)
+            reconnect_max (float): 최대 재연결 대기 시간 (초)
+        """
+        self.source = source
+        self.reconnect_min = reconnect_min
+        self.reconnect_max = reconnect_max
+
+        self._slot = LatestSlot()
+        self._stop = threading.Event()
+        self._thread = None
+        self._connected = threading.Event()
+
+        self.captured = 0
+        self.consumed = 0
+        self.reconnects = 0
+        self.read_failures = 0
+        self.last_age = 0.0
+        self.max_age = 0.0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._capture_loop, name="rtsp-capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait_connected(self, timeout=None):
+        return self._connected.wait(timeout)
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    @property
+    def dropped(self):
+        return self._slot.overwritten
+
+    def _capture_loop(self):
+        backoff = self.reconnect_min
+        while not self._stop.is_set():
+            cap = cv2.VideoCapture(self.source)
+            got_frame = False
+
+            if not cap.isOpened():
+                print(f"RTSP 스트림을 열 수 없습니다: {self.source} ({backoff:.1f}초 후 재시도)")
+            else:
+                self._connected.set()
+                while not self._stop.is_set():
+                    ret, frame = cap.read()
+                    if not ret:
+                        self.read_failures += 1
+                        print("프레임 읽기 실패. 재연결 시도...")
+                        break
+                    got_frame = True
+                    self.captured += 1
+                    self._slot.put((self.captured, frame, time.time()))
+                self._connected.clear()
+            cap.release()
+
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            # 끊긴 스트림의 마지막 프레임을 다시 처리하지 않도록 비움
+            self._slot.clear()
+            # 프레임을 받았던 연결이면 backoff 초기화 (열리자마자 끊기는 경우는 계속 늘림)
+            if got_frame:
+                backoff = self.reconnect_min
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, self.reconnect_max)
+
+    def read(self, timeout=1.0):
+        """
+        가장 최근 프레임 (이미 가져간 프레임은 다시 주지 않음)
+        반환: (캡처 번호, frame, 캡처 시각) 또는 timeout 이면 None
+        """
+        item = self._slot.get(timeout)
+        if item is None:
+            return None
+
+        self.consumed += 1
+        self.last_age = time.time() - item[2]
+        self.max_age = max(self.max_age, self.last_age)
+        return item
+
+    def get_stats(self):
+        return {
+            'connected': self.connected,
+            'captured': self.captured,
+            'consumed': self.consumed,
+            'dropped': self.dropped,
+            'reconnects': self.reconnects,
+            'frame_age_ms': self.last_age * 1000.0,
+            'max_frame_age_ms': self.max_age * 1000.0,
+        }
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
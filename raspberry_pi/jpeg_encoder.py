@@ -0,0 +1,75 @@
+import cv2
+
+# libjpeg-turbo 바인딩 (있으면 사용, 없으면 cv2.imencode)
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+try:
+    from turbojpeg import TurboJPEG, TJSAMP_420
+except ImportError:
+    TurboJPEG = None
+
+
+def available_backends():
+    backends = []
+    if simplejpeg is not None:
+        backends.append('simplejpeg')
+    if TurboJPEG is not None:
+        backends.append('turbojpeg')
+    backends.append('opencv')
+    return backends
+
+
+class JpegEncoder:
+    """
+    전송용 JPEG 인코더 (리사이즈 + 인코딩)
+
+    - backend "auto": simplejpeg → turbojpeg (PyTurboJPEG) → opencv 순으로 설치된 것 사용
+    - 반환값은 bytes 또는 memoryview (cv2 결과 버퍼를 tobytes() 로 복사하지 않음)
+    """
+
+    def __init__(self, quality=85, size=None, backend="auto"):
+        """
+        Args:
+            quality (int): JPEG 품질 (1~100)
+            size (tuple): 전송 프레임 크기 (W, H), None 이면 리사이즈 안 함
+            backend (str): "auto" / "simplejpeg" / "turbojpeg" / "opencv"
+        """
+        self.quality = int(quality)
+        self.size = tuple(size) if size else None
+
+        if backend == "auto":
+            backend = available_backends()[0]
+        elif backend not in available_backends():
+            print(f"JPEG backend '{backend}' 를 사용할 수 없습니다. opencv 사용")
+            backend = "opencv"
+        self.backend = backend
+
+        self._turbo = TurboJPEG() if backend == "turbojpeg" else None
+        self._params = [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+
+    def resize(self, frame):
+        if self.size is None or (frame.shape[1], frame.shape[0]) == self.size:
+            return frame
+        return cv2.resize(frame, self.size)
+
+    def encode(self, frame):
+        """BGR 프레임 → JPEG (bytes-like)"""
+        frame = self.resize(frame)
+
+        if self.backend == "simplejpeg":
+            if not frame.flags['C_CONTIGUOUS']:
+                frame = frame.copy()
+            # cv2 기본값과 같은 4:2:0 (simplejpeg 기본 4:4:4 는 크기 / 시간 모두 큼)
+            return simplejpeg.encode_jpeg(frame, quality=self.quality, colorspace='BGR',
+                                          colorsubsampling='420', fastdct=True)
+
+        if self.backend == "turbojpeg":
+            return self._turbo.encode(frame, quality=self.quality, jpeg_subsample=TJSAMP_420)
+
+        ok, buffer = cv2.imencode('.jpg', frame, self._params)
+        if not ok:
+            raise ValueError("JPEG 인코딩 실패")
+        return memoryview(buffer).cast('B')
@@ -1,25 +1,69 @@
-import cv2
 import time
+import socket
 import argparse
-from preprocessing_filters import ColorFireFilter, MotionFireFilter, HybridFireFilter
+import threading
+from preprocessing_filters import ColorFireFilter, MotionFireFilter, HybridFireFilter, FrameAnalyzer
 from npu_client import NPUClient
+from npu_tcp_client import NPUTCPClient
+from frame_grabber import FrameGrabber
+from rate_controller import RateController, CandidateSlot
+from duplicate_gate import DuplicateGate
+from jpeg_encoder import JpegEncoder
+from crop_mosaic import CropMosaic
 import config
 
 
 class FirePreprocessor:
     """화재 감지 전처리"""
     
-    def __init__(self, rtsp_url, npu_server_url, filter_type="motion"):
+    def __init__(self, rtsp_url, npu_server_url, filter_type="motion", stream_id=None, transport="http",
+                 jpeg_quality=85):
         """
         Args:
             rtsp_url (str): RTSP 스트림 URL
             npu_server_url (str): NPU 서버 URL
             filter_type (str): 필터 타입 (motion/color/hybrid)
+            stream_id (str): NPU 서버에서 이 카메라를 구분하는 id (기본: hostname)
+            transport (str): 프레임 전송 방식 (http/tcp)
+            jpeg_quality (int): 전송 JPEG 품질
         """
         self.rtsp_url = rtsp_url
-        self.npu_client = NPUClient(npu_server_url)
+        self.stream_id = stream_id or socket.gethostname()
+        self.transport = transport
+        
+        # 리사이즈 + JPEG 인코딩은 전송 스레드에서 (필터 루프는 원본 프레임만 넘김)
+        self.encoder = JpegEncoder(
+            quality=jpeg_quality,
+            size=config.MAX_FRAME_SIZE,
+            backend=config.JPEG_BACKEND
+        )
+        self.encode_count = 0
+        self.encode_time = 0.0
+        self.encoded_bytes = 0
+        
+        if transport == "tcp":
+            # 응답을 기다리지 않고 보내고, 응답은 수신 스레드에서 출력
+            self.npu_client = NPUTCPClient(
+                npu_server_url,
+                tcp_port=config.NPU_TCP_PORT,
+                max_inflight=config.TCP_MAX_INFLIGHT,
+                result_timeout=config.TCP_RESULT_TIMEOUT,
+                send_timeout=config.TCP_SEND_TIMEOUT,
+                on_result=self._on_tcp_result,
+                on_error=self._on_tcp_error,
+                encoder=self.encoder
+            )
+        else:
+            self.npu_client = NPUClient(npu_server_url, encoder=self.encoder)
         self.filter_type = filter_type
         
+        # 필터는 분석 해상도로 줄인 프레임(ROI 적용)에서 실행, 전송은 원본 프레임 사용
+        self.analyzer = FrameAnalyzer(
+            analysis_width=config.ANALYSIS_WIDTH,
+            roi_polygon=config.ROI_POLYGON,
+            roi_mask_path=config.ROI_MASK_PATH
+        )
+        
         # 필터 초기화
         if filter_type == "color":
             self.filter = ColorFireFilter(threshold=config.COLOR_THRESHOLD)
@@ -39,22 +83,180 @@ class FirePreprocessor:
                 temporal_min=config.TEMPORAL_MIN_DETECTIONS
             )
         
-        self.last_send_time = 0
         self.frame_count = 0
         self.detection_count = 0
+        
+        # 캡처 / 필터 / 전송을 각각 다른 스레드에서 실행 (전송이 느려도 캡처와 필터는 멈추지 않음)
+        self.grabber = FrameGrabber(
+            rtsp_url,
+            reconnect_min=config.RECONNECT_MIN_DELAY,
+            reconnect_max=config.RECONNECT_MAX_DELAY
+        )
+        # 전송 대기 후보 (점수 높은 프레임 우선) + 서버 응답 시간 / 부하로 전송률 조절
+        self.send_slot = CandidateSlot(max_age=config.RATE_CANDIDATE_MAX_AGE)
+        self.rate = RateController(
+            initial_rate=1.0 / config.SEND_INTERVAL,
+            min_rate=config.RATE_MIN,
+            max_rate=config.RATE_MAX,
+            increase=config.RATE_INCREASE,
+            decrease=config.RATE_DECREASE,
+            target_rtt=config.RATE_TARGET_RTT,
+            load_high=config.RATE_LOAD_HIGH,
+            priority_score=config.RATE_PRIORITY_SCORE
+        )
+        # 마지막으로 보낸 프레임과 거의 같은 프레임은 건너뜀 (keepalive 마다 한 장은 전송)
+        self.dedup = DuplicateGate(
+            threshold=config.DEDUP_THRESHOLD,
+            keepalive=config.DEDUP_KEEPALIVE
+        )
+        # 필터 마스크 영역만 잘라 mosaic 으로 전송 (NPU 서버가 원본 프레임 좌표로 되돌림)
+        self.crop = None
+        if config.CROP_SEND:
+            self.crop = CropMosaic(
+                size=config.MAX_FRAME_SIZE,
+                max_crops=config.CROP_MAX,
+                min_area=config.CROP_MIN_AREA,
+                pad=config.CROP_PAD,
+                min_size=config.CROP_MIN_SIZE,
+                max_coverage=config.CROP_MAX_COVERAGE,
+                max_upscale=config.CROP_MAX_UPSCALE
+            )
+        self.alert_due = threading.Event()
+        self.stop_event = threading.Event()
+        self.sent_count = 0
     
-    def run(self):
-        """메인 처리"""
-        print(f"RTSP 스트림 연결 중: {self.rtsp_url}")
-        cap = cv2.VideoCapture(self.rtsp_url)
+    def _on_tcp_result(self, result, latency):
+        print(f"NPU 응답: {result}")
+        if latency is not None:
+            self.rate.on_response(latency, result.get('load'))
+    
+    def _on_tcp_error(self, error):
+        self.rate.on_failure(error.get('load'))
+    
+    def _send(self, frame, metadata, score, thumb, mask, scale):
+        """
+        프레임 하나 전송 (직전 전송 프레임과 거의 같으면 건너뜀) + 전송률 갱신
+        mask / scale 은 필터 마스크와 분석 해상도 배율 (crop mosaic 용)
+        """
+        self.rate.on_sent()
+        
+        # JPEG 인코딩 / 전송 전에 중복 확인
+        send, keepalive = self.dedup.check(thumb)
+        if not send:
+            return
+        metadata.update(self.dedup.skip_info())
+        if keepalive:
+            metadata['keepalive'] = True
         
-        if not cap.isOpened():
-            print(f"RTSP 스트림을 열 수 없습니다: {self.rtsp_url}")
+        print(f"화재 의심 프레임 전송 (#{metadata['frame_number']}, 점수 {score:.2f}, "
+              f"전송률 {self.rate.rate:.2f}fps{', keepalive' if keepalive else ''})")
+        print(f"필터 정보: {metadata['filter_info']}")
+        
+        self.sent_count += 1
+        
+        t0 = time.perf_counter()
+        if self.crop is not None:
+            mosaic, layout = self.crop.build(frame, mask, scale)
+            if mosaic is not None:
+                frame = mosaic
+                metadata.update(layout)
+        jpeg = self.encoder.encode(frame)
+        self.encode_time += time.perf_counter() - t0
+        self.encode_count += 1
+        self.encoded_bytes += len(jpeg)
+        
+        if self.transport == "tcp":
+            # 응답은 수신 스레드에서 on_result / on_error 로 처리
+            if self.npu_client.send_jpeg(jpeg, metadata) is None:
+                self.rate.on_failure()
+            else:
+                self.dedup.on_sent(thumb)
             return
         
+        t0 = time.time()
+        result = self.npu_client.send_jpeg(jpeg, metadata)
+        if result:
+            self.dedup.on_sent(thumb)
+            self.rate.on_response(time.time() - t0, result.get('load'))
+            print(f"NPU 응답: {result}")
+        else:
+            self.rate.on_failure(self.npu_client.last_error.get('load'))
+    
+    def _send_loop(self):
+        """전송 스레드: 전송률이 허락할 때 가장 점수 높은 후보를 NPU 서버로 전송 + 알림 체크"""
+        while not self.stop_event.is_set():
+            if self.send_slot.wait(timeout=0.5):
+                # 기다리는 동안 더 높은 점수 (우선 전송) 후보가 올 수 있으므로 짧게 나눠서 대기
+                delay = self.rate.wait_time(self.send_slot.peek_score() or 0.0)
+                if delay > 0:
+                    self.stop_event.wait(min(delay, 0.05))
+                else:
+                    item, score = self.send_slot.take()
+                    if item is not None:
+                        frame, metadata, thumb, mask, scale = item
+                        self._send(frame, metadata, score, thumb, mask, scale)
+            
+            # 알림 체크
+            if self.alert_due.is_set():
+                self.alert_due.clear()
+                alert = self.npu_client.check_alert(self.stream_id)
+                if alert and alert.get('active'):
+                    print(f"NPU 알림: {alert}")
+    
+    def _apply_filter(self, analysis):
+        """
+        전처리 필터 적용
+        반환: (의심 여부, 필터 정보, 점수, 마스크) - 점수는 임계값 대비 비율 (1.0 = 임계값)
+        마스크는 분석 해상도 (없으면 None)
+        """
+        if isinstance(self.filter, HybridFireFilter):
+            is_suspected, info, mask = self.filter.detect(analysis)
+            # 색 / 움직임이 둘 다 강할수록 우선
+            score = (info['color_percentage'] / config.COLOR_THRESHOLD
+                     + info['motion_percentage'] / config.MOTION_THRESHOLD)
+        elif isinstance(self.filter, MotionFireFilter):
+            is_suspected, percentage, mask = self.filter.detect(analysis)
+            info = {'motion_percentage': f'{percentage:.2f}%'}
+            score = percentage / config.MOTION_THRESHOLD
+        else:  # ColorFireFilter
+            is_suspected, percentage, mask = self.filter.detect(analysis)
+            info = {'color_percentage': f'{percentage:.2f}%'}
+            score = percentage / config.COLOR_THRESHOLD
+        return is_suspected, info, score, mask
+    
+    def get_stats(self):
+        stats = self.grabber.get_stats()
+        stats.update({
+            'processed': self.frame_count,
+            'suspected': self.detection_count,
+            'sent': self.sent_count,
+            'send_replaced': self.send_slot.replaced,
+            'send_rate': self.rate.get_stats(),
+            'dedup': self.dedup.get_stats(),
+            'crop': self.crop.get_stats() if self.crop is not None else None,
+            'jpeg': {
+                'backend': self.encoder.backend,
+                'quality': self.encoder.quality,
+                'avg_encode_ms': self.encode_time / max(self.encode_count, 1) * 1000.0,
+                'avg_bytes': self.encoded_bytes // max(self.encode_count, 1),
+            },
+        })
+        return stats
+    
+    def run(self):
+        """메인 처리 (이 스레드에서는 필터만 실행)"""
+        print(f"RTSP 스트림 연결 중: {self.rtsp_url}")
+        self.grabber.start()
+        self.grabber.wait_connected()
+        
         print(f"RTSP 스트림 연결 성공")
-        print(f"필터 타입: {self.filter_type}")
-        print(f"NPU 서버: {self.npu_client.server_url}")
+        analysis_size = f"{config.ANALYSIS_WIDTH}px" if config.ANALYSIS_WIDTH else "원본"
+        roi = ", ROI 사용" if config.ROI_POLYGON or config.ROI_MASK_PATH else ""
+        print(f"필터 타입: {self.filter_type} (분석 해상도 가로 {analysis_size}{roi})")
+        print(f"스트림 ID: {self.stream_id}")
+        print(f"전송 JPEG: {self.encoder.size[0]}x{self.encoder.size[1]}, 품질 {self.encoder.quality} ({self.encoder.backend})")
+        print(f"ROI crop 전송: {'사용 (최대 ' + str(config.CROP_MAX) + '개)' if self.crop is not None else '사용 안 함'}")
+        print(f"NPU 서버: {self.npu_client.server_url} ({self.transport})")
         
         health = self.npu_client.check_health()
         if health:
@@ -64,70 +266,65 @@ class FirePreprocessor:
         
         print(f"{'='*60}\n")
         
+        sender = threading.Thread(target=self._send_loop, name="npu-send", daemon=True)
+        sender.start()
+        
         try:
             while True:
-                ret, frame = cap.read()
-                if not ret:
-                    print("프레임 읽기 실패. 재연결 시도...")
-                    time.sleep(1)
-                    cap.release()
-                    cap = cv2.VideoCapture(self.rtsp_url)
+                item = self.grabber.read(timeout=1.0)
+                if item is None:
                     continue
+                capture_number, frame, capture_time = item
                 
                 self.frame_count += 1
-                current_time = time.time()
                 
-                # 전처리 필터 적용
-                if isinstance(self.filter, HybridFireFilter):
-                    is_suspected, info, mask = self.filter.detect(frame)
-                elif isinstance(self.filter, MotionFireFilter):
-                    is_suspected, percentage, mask = self.filter.detect(frame)
-                    info = {'motion_percentage': f'{percentage:.2f}%'}
-                else:  # ColorFireFilter
-                    is_suspected, percentage, mask = self.filter.detect(frame)
-                    info = {'color_percentage': f'{percentage:.2f}%'}
+                analysis = self.analyzer(frame)
+                is_suspected, info, score, mask = self._apply_filter(analysis)
                 
-                # 화재 의심 프레임 감지 시
+                # 화재 의심 프레임은 전송 후보로 넘기고 바로 다음 프레임 처리
+                # (언제 보낼지는 전송 스레드의 RateController 가 결정)
                 if is_suspected:
                     self.detection_count += 1
                     
-                    # 전송 간격 체크
-                    if current_time - self.last_send_time >= config.SEND_INTERVAL:
-                        # 프레임 리사이즈
-                        resized_frame = cv2.resize(frame, config.MAX_FRAME_SIZE)
-                        
-                        # 메타데이터 구성
-                        metadata = {
-                            'frame_number': self.frame_count,
-                            'timestamp': current_time,
-                            'filter_type': self.filter_type,
-                            'filter_info': info
-                        }
-                        
-                        print(f"화재 의심 프레임 감지 (#{self.frame_count})")
-                        print(f"필터 정보: {info}")
-                        print(f"NPU 서버로 전송 중...")
-                        
-                        # NPU 서버로 전송
-                        result = self.npu_client.send_frame(resized_frame, metadata)
-                        
-                        if result:
-                            print(f"NPU 응답: {result}")
-                        
-                        self.last_send_time = current_time
+                    # 메타데이터 구성
+                    metadata = {
+                        'stream_id': self.stream_id,
+                        'frame_number': capture_number,
+                        'timestamp': capture_time,
+                        'filter_type': self.filter_type,
+                        'filter_info': info,
+                        'filter_score': round(score, 3)
+                    }
+                    
+                    # 대기 중인 후보보다 점수가 낮으면 리사이즈도 하지 않음
+                    # crop / 리사이즈 / 인코딩은 실제로 보낼 때 전송 스레드에서 (캡처 프레임 / 마스크는 매번 새 배열이라 그대로 넘김)
+                    if self.send_slot.accepts(score):
+                        thumb = self.dedup.thumbnail(analysis.gray)
+                        self.send_slot.put((frame, metadata, thumb, mask, analysis.scale), score)
                 
+                # 진행 상황 (버린 프레임 수 / 처리 시점의 프레임 나이)
+                if self.frame_count % config.LOG_INTERVAL_FRAMES == 0:
+                    stats = self.get_stats()
+                    print(f"[{self.frame_count}] 캡처 {stats['captured']} / 버림 {stats['dropped']} / "
+                          f"프레임 나이 {stats['frame_age_ms']:.0f}ms (최대 {stats['max_frame_age_ms']:.0f}ms) / "
+                          f"의심 {stats['suspected']} / 전송 {stats['sent']} (중복 생략 {stats['dedup']['skipped']}) / "
+                          f"재연결 {stats['reconnects']} / "
+                          f"전송률 {stats['send_rate']['rate']}fps (RTT {stats['send_rate']['srtt_ms']}ms, "
+                          f"서버 부하 {stats['send_rate']['server_load']})")
                 
-                # 알림 체크
+                # 알림 체크 (전송 스레드에서 실행)
                 if self.frame_count % config.ALERT_CHECK_INTERVAL == 0:
-                    alert = self.npu_client.check_alert()
-                    if alert and alert.get('active'):
-                        print(f"NPU 알림: {alert}")
+                    self.alert_due.set()
         
         except KeyboardInterrupt:
             print("\n\n사용자 중단")
         
         finally:
-            cap.release()
+            self.stop_event.set()
+            self.grabber.stop()
+            sender.join(timeout=5.0)
+            if self.transport == "tcp":
+                self.npu_client.close()
 
 
 def main():
@@ -142,12 +339,22 @@ def main():
     parser.add_argument('--filter', type=str, default=config.FILTER_TYPE,
                        choices=['color', 'motion', 'hybrid'],
                        help='필터 타입')
+    parser.add_argument('--stream-id', type=str, default=config.STREAM_ID,
+                       help='NPU 서버 스트림 ID (기본: hostname)')
+    parser.add_argument('--transport', type=str, default=config.TRANSPORT,
+                       choices=['http', 'tcp'],
+                       help='프레임 전송 방식')
+    parser.add_argument('--jpeg-quality', type=int, default=config.JPEG_QUALITY,
+                       help='전송 JPEG 품질 (1~100)')
     
     args = parser.parse_args()   
     preprocessor = FirePreprocessor(
         rtsp_url=args.rtsp,
         npu_server_url=args.npu,
-        filter_type=args.filter
+        filter_type=args.filter,
+        stream_id=args.stream_id,
+        transport=args.transport,
+        jpeg_quality=args.jpeg_quality
     )
     
     preprocessor.run()
@@ -1,33 +1,40 @@
 import requests
-import cv2
 import json
 
+from jpeg_encoder import JpegEncoder
+
 
 class NPUClient:
     """NPU 서버와의 HTTP 통신 담당"""
     
-    def __init__(self, server_url):
+    def __init__(self, server_url, encoder=None):
         """
         Args:
             server_url (str): NPU 서버 URL
+            encoder (JpegEncoder): send_frame 에서 쓸 인코더 (기본: 품질 85, 리사이즈 안 함)
         """
         self.server_url = server_url
+        self.encoder = encoder or JpegEncoder(quality=85)
         self.detect_url = f"{server_url}/detect"
         self.alert_url = f"{server_url}/alert"
         self.health_url = f"{server_url}/health"
         self.stats_url = f"{server_url}/stats"
         
         self.session = requests.Session()
+        self.last_error = {}      # 마지막 /detect 실패 응답 (503 이면 서버 'load' 포함)
     
     def send_frame(self, frame, metadata=None):
         """
-        화재 의심 프레임을 NPU 서버로 전송
+        화재 의심 프레임을 JPEG 로 인코딩해서 NPU 서버로 전송
+        """
+        return self.send_jpeg(self.encoder.encode(frame), metadata)
+    
+    def send_jpeg(self, jpeg, metadata=None):
+        """
+        인코딩된 JPEG (bytes / memoryview) 을 NPU 서버로 전송
         """
         try:
-
-            _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, 85])
-            
-            files = {'frame': ('frame.jpg', buffer.tobytes(), 'image/jpeg')}
+            files = {'frame': ('frame.jpg', jpeg, 'image/jpeg')}
             data = {'metadata': json.dumps(metadata)} if metadata else {}
             
             response = self.session.post(
@@ -38,21 +45,28 @@ class NPUClient:
             )
             
             if response.status_code == 200:
+                self.last_error = {}
                 return response.json()
             else:
                 print(f"NPU 서버 응답 오류: {response.status_code}")
+                try:
+                    self.last_error = response.json()
+                except ValueError:
+                    self.last_error = {'status': response.status_code}
                 return None
         
         except requests.exceptions.RequestException as e:
             print(f"NPU 서버 통신 오류: {e}")
+            self.last_error = {'error': str(e)}
             return None
     
-    def check_alert(self):
+    def check_alert(self, stream_id=None):
         """
-        NPU 서버의 알림 상태 확인
+        NPU 서버의 알림 상태 확인 (stream_id 가 있으면 해당 스트림 기준)
         """
         try:
-            response = self.session.get(self.alert_url, timeout=2)
+            params = {'stream_id': stream_id} if stream_id else None
+            response = self.session.get(self.alert_url, params=params, timeout=2)
             return response.json() if response.status_code == 200 else None
         except:
             return None
@@ -0,0 +1,262 @@
+import json
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+from npu_client import NPUClient
+
+
+# npu_server/tcp_server.py 와 같은 메시지 형식
+#   magic(4) | type(1) | flags(1) | reserved(2) | seq(4) | meta_len(4) | body_len(4) + metadata JSON + body
+MAGIC = b'NPU1'
+HEADER = struct.Struct('!4sBBHIII')
+
+MSG_FRAME = 1
+MSG_RESULT = 2
+MSG_ERROR = 3
+
+
+def _sendall_parts(sock, parts):
+    """여러 버퍼를 이어 붙이지 않고 전송 (sendmsg scatter-gather)"""
+    parts = [memoryview(p).cast('B') for p in parts if len(p)]
+    while parts:
+        sent = sock.sendmsg(parts)
+        while parts and sent >= len(parts[0]):
+            sent -= len(parts[0])
+            parts.pop(0)
+        if parts and sent:
+            parts[0] = parts[0][sent:]
+
+
+def _recv_exact(sock, n):
+    buf = bytearray(n)
+    view = memoryview(buf)
+    pos = 0
+    while pos < n:
+        try:
+            got = sock.recv_into(view[pos:], n - pos)
+        except socket.timeout:
+            # socket timeout 은 전송 제한용 - 수신은 응답이 올 때까지 계속 대기
+            continue
+        if got == 0:
+            raise ConnectionError("연결 종료")
+        pos += got
+    return bytes(buf)
+
+
+class NPUTCPClient(NPUClient):
+    """NPU 서버와 TCP 연결 하나로 프레임 전송 (응답을 기다리지 않는 pipelined 전송)"""
+
+    def __init__(self, server_url, tcp_port=5001, max_inflight=4, on_result=None, on_error=None, encoder=None,
+                 result_timeout=5.0, send_timeout=1.0):
+        """
+        Args:
+            server_url (str): NPU 서버 URL (health / alert / stats 는 HTTP 사용)
+            tcp_port (int): NPU 서버 TCP 프레임 포트
+            max_inflight (int): 응답을 기다리는 최대 프레임 수 (넘으면 새 프레임은 버림)
+            on_result (callable): (응답 dict, 왕복 시간 초) - 응답을 받을 때마다 호출 (수신 스레드에서 실행)
+            on_error (callable): (오류 dict) - ERROR 응답 / 응답 타임아웃 / 연결 끊김으로 잃은 프레임마다 호출 (503 이면 'load' 포함)
+            encoder (JpegEncoder): send_frame 에서 쓸 인코더
+            result_timeout (float): 이 시간 안에 응답이 없으면 타임아웃으로 처리하고 재연결 (초)
+            send_timeout (float): 서버가 받지 않아 전송이 이 시간 넘게 막히면 전송 오류로 처리하고 재연결 (초)
+        """
+        super().__init__(server_url, encoder=encoder)
+        self.host = urlparse(server_url).hostname
+        self.tcp_port = tcp_port
+        self.max_inflight = max_inflight
+        self.on_result = on_result
+        self.on_error = on_error
+        self.result_timeout = result_timeout
+        self.send_timeout = send_timeout
+
+        self._sock = None
+        self._lock = threading.Lock()          # 연결 / seq / inflight
+        self._send_lock = threading.Lock()     # sendall 직렬화 (수신 스레드를 막지 않도록 분리)
+        self._seq = 0
+        self._inflight = {}             # seq -> (전송 시각, 응답 기한) - perf_counter 기준
+
+        self._retry_at = 0.0
+        self._backoff = 0.5
+
+        self.sent = 0
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.latencies = deque(maxlen=1000)
+
+    def _connect(self):
+        """연결이 없으면 연결 (실패 시 backoff 동안 재시도하지 않음)"""
+        if self._sock is not None:
+            return True
+
+        now = time.time()
+        if now < self._retry_at:
+            return False
+
+        try:
+            sock = socket.create_connection((self.host, self.tcp_port), timeout=1)
+            # 서버가 멈춰도 전송 스레드가 sendmsg 에서 무한히 막히지 않도록
+            sock.settimeout(self.send_timeout)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except OSError as e:
+            print(f"NPU 서버 TCP 연결 실패: {e} ({self._backoff:.1f}초 후 재시도)")
+            self._retry_at = now + self._backoff
+            self._backoff = min(self._backoff * 2, 10.0)
+            return False
+
+        self._sock = sock
+        self._backoff = 0.5
+        self._inflight.clear()
+        threading.Thread(target=self._read_loop, args=(sock,), name="npu-tcp-read", daemon=True).start()
+        print(f"NPU 서버 TCP 연결: {self.host}:{self.tcp_port}")
+        return True
+
+    def _disconnect(self, sock):
+        lost = []
+        with self._lock:
+            if self._sock is sock:
+                self._sock = None
+                lost = list(self._inflight)
+                self._inflight.clear()
+        try:
+            sock.close()
+        except OSError:
+            pass
+        # 응답을 받지 못한 프레임도 실패로 알려서 전송률을 낮추게 함
+        if self.on_error is not None:
+            for seq in lost:
+                self.on_error({'error': 'Connection lost', 'status': 502, 'seq': seq})
+
+    def _expire_locked(self, now):
+        """
+        응답 기한이 지난 프레임을 inflight 에서 빼고 seq 목록 반환 (self._lock 안에서 호출)
+        기한이 지난 프레임이 있으면 연결이 멈춘 것으로 보고 끊음 → 다음 전송에서 재연결
+        반환: (타임아웃 seq 목록, 닫아야 할 socket 또는 None)
+        """
+        expired = [seq for seq, (_, deadline) in self._inflight.items() if deadline <= now]
+        if not expired:
+            return expired, None
+        # 같은 연결로 보낸 나머지 프레임도 응답을 받을 수 없으므로 함께 버림 (재연결 시 inflight 초기화)
+        self.timeouts += len(expired)
+        sock, self._sock = self._sock, None
+        self._inflight.clear()
+        return expired, sock
+
+    def _report_timeouts(self, expired, sock):
+        if sock is not None:
+            print(f"NPU 서버 응답 없음 ({len(expired)}개 프레임, {self.result_timeout:.1f}초 초과) - 재연결")
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        if self.on_error is not None:
+            for seq in expired:
+                self.on_error({'error': 'Result timeout', 'status': 504, 'seq': seq})
+
+    def send_jpeg(self, jpeg_bytes, metadata=None):
+        """
+        JPEG (bytes / memoryview) 을 TCP 로 전송하고 바로 반환 (응답은 on_result 로 전달)
+        반환: 전송했으면 seq, 버렸으면 None
+        """
+        meta = json.dumps(metadata).encode('utf-8') if metadata else b''
+
+        with self._lock:
+            # 응답이 오지 않는 프레임이 inflight 를 계속 차지하지 않도록 먼저 만료 처리
+            now = time.perf_counter()
+            expired, stalled = self._expire_locked(now)
+        if expired:
+            self._report_timeouts(expired, stalled)
+
+        with self._lock:
+            if len(self._inflight) >= self.max_inflight:
+                self.dropped += 1
+                return None
+            if not self._connect():
+                self.dropped += 1
+                return None
+
+            self._seq = (self._seq + 1) & 0xFFFFFFFF
+            seq = self._seq
+            sock = self._sock
+            now = time.perf_counter()
+            self._inflight[seq] = (now, now + self.result_timeout)
+
+        header = HEADER.pack(MAGIC, MSG_FRAME, 0, 0, seq, len(meta), len(jpeg_bytes))
+        try:
+            with self._send_lock:
+                _sendall_parts(sock, (header, meta, jpeg_bytes))
+        except OSError as e:
+            # socket.timeout (send_timeout 초과) 포함. 이 프레임은 반환값 None 으로 알리므로 inflight 에서 먼저 뺌
+            print(f"NPU 서버 TCP 전송 오류: {e}")
+            with self._lock:
+                self._inflight.pop(seq, None)
+            self.errors += 1
+            self._disconnect(sock)
+            return None
+
+        self.sent += 1
+        return seq
+
+    def _read_loop(self, sock):
+        try:
+            while True:
+                magic, msg_type, _, _, seq, meta_len, body_len = HEADER.unpack(_recv_exact(sock, HEADER.size))
+                if magic != MAGIC:
+                    raise ConnectionError(f"잘못된 magic: {magic!r}")
+                if meta_len:
+                    _recv_exact(sock, meta_len)
+                body = json.loads(_recv_exact(sock, body_len)) if body_len else {}
+
+                with self._lock:
+                    entry = self._inflight.pop(seq, None)
+                latency = None
+                if entry is not None:
+                    latency = time.perf_counter() - entry[0]
+                    self.latencies.append(latency)
+
+                if msg_type == MSG_RESULT:
+                    self.received += 1
+                    if self.on_result is not None:
+                        self.on_result(body, latency)
+                else:
+                    self.errors += 1
+                    print(f"NPU 서버 응답 오류: {body.get('status')} {body.get('error')}")
+                    if self.on_error is not None:
+                        self.on_error(body)
+        except (ConnectionError, OSError, ValueError, struct.error) as e:
+            print(f"NPU 서버 TCP 연결 끊김: {e}")
+        finally:
+            self._disconnect(sock)
+
+    def wait_idle(self, timeout=5.0):
+        """보낸 프레임의 응답이 모두 올 때까지 대기"""
+        deadline = time.time() + timeout
+        while self._inflight and time.time() < deadline:
+            time.sleep(0.001)
+        return not self._inflight
+
+    def get_transport_stats(self):
+        return {
+            'connected': self._sock is not None,
+            'sent': self.sent,
+            'received': self.received,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'inflight': len(self._inflight),
+        }
+
+    def close(self):
+        with self._lock:
+            sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
@@ -3,6 +3,115 @@ import numpy as np
 from collections import deque
 
 
+def _scaled_kernel(size, scale):
+    """원본 해상도 기준 커널 크기를 분석 해상도에 맞게 줄임 (홀수, 최소 1)"""
+    k = max(1, int(round(size * scale)))
+    return k if k % 2 == 1 else k + 1
+
+
+class AnalysisFrame:
+    """
+    필터 분석용 프레임 (프레임당 한 번 생성, 필터들이 공유)
+
+    - small: 분석 해상도로 줄인 BGR
+    - gray / hsv: 처음 요청할 때 한 번만 변환
+    - roi: 분석 해상도 ROI 마스크 (None 이면 전체)
+    """
+
+    def __init__(self, frame, small, roi=None):
+        self.frame = frame
+        self.small = small
+        self.roi = roi
+        self.scale = small.shape[1] / frame.shape[1]
+        self.total_pixels = cv2.countNonZero(roi) if roi is not None else small.shape[0] * small.shape[1]
+
+        self._gray = None
+        self._hsv = None
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    @property
+    def hsv(self):
+        if self._hsv is None:
+            self._hsv = cv2.cvtColor(self.small, cv2.COLOR_BGR2HSV)
+        return self._hsv
+
+    def kernel(self, size):
+        return _scaled_kernel(size, self.scale)
+
+    def apply_roi(self, mask):
+        if self.roi is not None:
+            cv2.bitwise_and(mask, self.roi, dst=mask)
+        return mask
+
+
+class FrameAnalyzer:
+    """
+    캡처 프레임 → AnalysisFrame (분석 해상도 축소 + ROI 마스크)
+    """
+
+    def __init__(self, analysis_width=320, roi_polygon=None, roi_mask_path=None):
+        """
+        Args:
+            analysis_width (int): 필터 분석 해상도 가로 (0 이면 원본 해상도)
+            roi_polygon (list): 분석 영역 다각형 [(x, y), ...] (0~1 정규화 좌표)
+            roi_mask_path (str): 분석 영역 마스크 이미지 (흰색 = 분석, 검정 = 제외)
+        """
+        self.analysis_width = analysis_width
+        self.roi_polygon = roi_polygon or None
+        self.roi_mask = None
+        if roi_mask_path:
+            self.roi_mask = cv2.imread(roi_mask_path, cv2.IMREAD_GRAYSCALE)
+            if self.roi_mask is None:
+                raise ValueError(f"ROI 마스크를 읽을 수 없습니다: {roi_mask_path}")
+
+        self._roi_cache = {}    # (h, w) -> 분석 해상도 ROI 마스크
+
+    def _analysis_size(self, frame):
+        h, w = frame.shape[:2]
+        if not self.analysis_width or self.analysis_width >= w:
+            return w, h
+        return self.analysis_width, max(1, int(round(h * self.analysis_width / w)))
+
+    def _roi_for(self, width, height):
+        if self.roi_polygon is None and self.roi_mask is None:
+            return None
+
+        roi = self._roi_cache.get((height, width))
+        if roi is None:
+            roi = np.full((height, width), 255, np.uint8)
+            if self.roi_mask is not None:
+                resized = cv2.resize(self.roi_mask, (width, height), interpolation=cv2.INTER_NEAREST)
+                roi[resized == 0] = 0
+            if self.roi_polygon is not None:
+                poly = np.zeros_like(roi)
+                pts = np.array([[x * width, y * height] for x, y in self.roi_polygon], np.int32)
+                cv2.fillPoly(poly, [pts], 255)
+                cv2.bitwise_and(roi, poly, dst=roi)
+            self._roi_cache[(height, width)] = roi
+        return roi
+
+    def __call__(self, frame):
+        width, height = self._analysis_size(frame)
+        if (width, height) == (frame.shape[1], frame.shape[0]):
+            small = frame
+        else:
+            # INTER_AREA 는 INTER_LINEAR 보다 5~10배 느림. aliasing 은 뒤의 blur / morphology 가 흡수
+            small = cv2.resize(frame, (width, height), interpolation=cv2.INTER_LINEAR)
+        return AnalysisFrame(frame, small, self._roi_for(width, height))
+
+
+def _as_analysis(frame):
+    """ndarray 를 넘기면 원본 해상도 그대로 분석 (기존 호출 호환)"""
+    if isinstance(frame, AnalysisFrame):
+        return frame
+    return AnalysisFrame(frame, frame)
+
+
 class ColorFireFilter:
     """
     HSV 색상 기반 화재 감지 필터
@@ -21,7 +130,12 @@ class ColorFireFilter:
         self.upper_yellow = np.array([35, 255, 255])
     
     def detect(self, frame):
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        """
+        Args:
+            frame: BGR 프레임 또는 AnalysisFrame
+        """
+        analysis = _as_analysis(frame)
+        hsv = analysis.hsv
         
         mask_red1 = cv2.inRange(hsv, self.lower_red1, self.upper_red1)
         mask_red2 = cv2.inRange(hsv, self.lower_red2, self.upper_red2)
@@ -29,12 +143,15 @@ class ColorFireFilter:
         
         mask = mask_red1 | mask_red2 | mask_yellow
         
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (7, 7))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        k = analysis.kernel(7)
+        if k > 1:
+            kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (k, k))
+            mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+            mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+        mask = analysis.apply_roi(mask)
         
         fire_pixels = cv2.countNonZero(mask)
-        total_pixels = frame.shape[0] * frame.shape[1]
+        total_pixels = max(analysis.total_pixels, 1)
         fire_percentage = (fire_pixels / total_pixels) * 100
         
         is_detected = fire_percentage >= self.threshold
@@ -59,10 +176,16 @@ class MotionFireFilter:
         self.prev_gray = None
     
     def detect(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray = cv2.GaussianBlur(gray, (21, 21), 0)
+        """
+        Args:
+            frame: BGR 프레임 또는 AnalysisFrame
+        """
+        analysis = _as_analysis(frame)
+        k = analysis.kernel(21)
+        gray = cv2.GaussianBlur(analysis.gray, (k, k), 0) if k > 1 else analysis.gray
         
-        if self.prev_gray is None:
+        # 첫 프레임이거나 해상도가 바뀌었으면 (재연결 등) 기준 프레임만 저장
+        if self.prev_gray is None or self.prev_gray.shape != gray.shape:
             self.prev_gray = gray
             return False, 0, None
         
@@ -70,12 +193,15 @@ class MotionFireFilter:
         
         thresh = cv2.threshold(frame_diff, self.diff_threshold, 255, cv2.THRESH_BINARY)[1]
         
-        kernel = np.ones((7, 7), np.uint8)
-        thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
-        thresh = cv2.dilate(thresh, kernel, iterations=2)
+        k = analysis.kernel(7)
+        if k > 1:
+            kernel = np.ones((k, k), np.uint8)
+            thresh = cv2.morphologyEx(thresh, cv2.MORPH_OPEN, kernel)
+            thresh = cv2.dilate(thresh, kernel, iterations=2)
+        thresh = analysis.apply_roi(thresh)
         
         motion_pixels = cv2.countNonZero(thresh)
-        total_pixels = frame.shape[0] * frame.shape[1]
+        total_pixels = max(analysis.total_pixels, 1)
         motion_percentage = (motion_pixels / total_pixels) * 100
         
         self.motion_history.append(motion_percentage)
@@ -106,9 +232,10 @@ class HybridFireFilter:
         )
     
     def detect(self, frame):
-
-        color_detected, color_percentage, color_mask = self.color_filter.detect(frame)
-        motion_detected, motion_percentage, motion_mask = self.motion_filter.detect(frame)
+        # 두 필터가 같은 AnalysisFrame (축소 / 색 변환 결과) 을 공유
+        analysis = _as_analysis(frame)
+        color_detected, color_percentage, color_mask = self.color_filter.detect(analysis)
+        motion_detected, motion_percentage, motion_mask = self.motion_filter.detect(analysis)
         
         is_fire_suspected = False
         
@@ -0,0 +1,168 @@
+import threading
+import time
+
+
+class RateController:
+    """
+    NPU 전송률 AIMD 제어 (additive increase, multiplicative decrease)
+
+    - 응답이 빠르고 서버 부하가 낮으면 응답마다 전송률을 increase 만큼 올림
+    - RTT 가 target_rtt 를 넘거나 서버 load 가 load_high 이상, 또는 실패(타임아웃 / 503 / 버림)면 decrease 배로 줄임
+      (같은 혼잡으로 연속해서 줄이지 않도록 RTT 동안 한 번만)
+    - 필터 점수가 priority_score 이상인 프레임은 절반 간격으로 보낼 수 있음
+    - 서버 load 의 track_ttl 을 받으면 전송 간격이 그 절반을 넘지 않도록 최소 전송률을 올림
+      (간격이 TTL 을 넘으면 서버가 트랙을 지워서 지속 시간 기반 위험 판단이 끝나지 않음)
+    """
+
+    def __init__(self, initial_rate=2.0, min_rate=0.5, max_rate=5.0, increase=0.1, decrease=0.5,
+                 target_rtt=1.0, load_high=0.8, priority_score=2.0):
+        """
+        Args:
+            initial_rate (float): 시작 전송률 (fps)
+            min_rate (float): 최소 전송률 (fps)
+            max_rate (float): 최대 전송률 (fps)
+            increase (float): 정상 응답마다 올리는 전송률 (fps)
+            decrease (float): 혼잡 시 곱하는 배율
+            target_rtt (float): 이보다 RTT 가 길면 혼잡으로 판단 (초)
+            load_high (float): 서버 load (queue_depth / queue_limit) 가 이 이상이면 혼잡으로 판단
+            priority_score (float): 이 점수 이상인 프레임은 절반 간격으로 전송
+        """
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.target_rtt = target_rtt
+        self.load_high = load_high
+        self.priority_score = priority_score
+
+        self._lock = threading.Lock()
+        self.last_send = 0.0
+        self.last_decrease = 0.0
+        self.srtt = None
+        self.server_load = None
+        self.track_ttl = None
+
+        self.increases = 0
+        self.decreases = 0
+        self.failures = 0
+
+    def _floor_rate(self):
+        # 전송 간격 (+ RTT) 이 서버 TRACK_TTL 안에 들어오도록 간격을 TTL 의 절반 이하로
+        if self.track_ttl:
+            return max(self.min_rate, 2.0 / self.track_ttl)
+        return self.min_rate
+
+    def _update_load(self, load):
+        if load:
+            self.server_load = load.get('load')
+            self.track_ttl = load.get('track_ttl') or self.track_ttl
+
+    def interval(self, score=0.0):
+        base = 1.0 / max(self.rate, self._floor_rate())
+        return base / 2 if score >= self.priority_score else base
+
+    def wait_time(self, score=0.0, now=None):
+        """점수가 score 인 프레임을 보낼 수 있을 때까지 남은 시간 (초, 0 이면 바로)"""
+        now = time.time() if now is None else now
+        return max(0.0, self.last_send + self.interval(score) - now)
+
+    def on_sent(self, now=None):
+        self.last_send = time.time() if now is None else now
+
+    def on_response(self, rtt, load=None):
+        """
+        Args:
+            rtt (float): 왕복 시간 (초)
+            load (dict): 서버 응답의 'load' (queue_depth / queue_limit / load / track_ttl)
+        """
+        with self._lock:
+            self.srtt = rtt if self.srtt is None else self.srtt + 0.2 * (rtt - self.srtt)
+            self._update_load(load)
+
+            congested = rtt > self.target_rtt or (
+                self.server_load is not None and self.server_load >= self.load_high)
+            if congested:
+                self._decrease()
+            else:
+                self.rate = min(self.max_rate, self.rate + self.increase)
+                self.increases += 1
+
+    def on_failure(self, load=None):
+        with self._lock:
+            self.failures += 1
+            self._update_load(load)
+            self._decrease()
+
+    def _decrease(self):
+        now = time.time()
+        if now - self.last_decrease < (self.srtt or self.target_rtt):
+            return
+        self.rate = max(self._floor_rate(), self.rate * self.decrease)
+        self.last_decrease = now
+        self.decreases += 1
+
+    def get_stats(self):
+        return {
+            'rate': round(self.rate, 2),
+            'srtt_ms': round(self.srtt * 1000.0, 1) if self.srtt is not None else None,
+            'server_load': self.server_load,
+            'increases': self.increases,
+            'decreases': self.decreases,
+            'failures': self.failures,
+        }
+
+
+class CandidateSlot:
+    """
+    전송 후보 프레임 하나 보관 (점수가 높은 후보 우선)
+
+    - 대기 중인 후보보다 점수가 같거나 높으면 교체
+    - 대기 중인 후보가 max_age 초보다 오래됐으면 점수와 상관없이 새 후보로 교체
+    """
+
+    def __init__(self, max_age=1.0):
+        self.max_age = max_age
+        self._cond = threading.Condition()
+        self._item = None
+        self._score = 0.0
+        self._time = 0.0
+
+        self.replaced = 0
+        self.rejected = 0
+
+    def _accepts(self, score, now):
+        return self._item is None or score >= self._score or now - self._time > self.max_age
+
+    def accepts(self, score):
+        """score 인 후보를 지금 넣으면 받아들여지는지 (후보 프레임을 만들기 전에 확인)"""
+        with self._cond:
+            return self._accepts(score, time.time())
+
+    def put(self, item, score):
+        now = time.time()
+        with self._cond:
+            if not self._accepts(score, now):
+                self.rejected += 1
+                return False
+            if self._item is not None:
+                self.replaced += 1
+            self._item, self._score, self._time = item, score, now
+            self._cond.notify_all()
+            return True
+
+    def wait(self, timeout=None):
+        """후보가 생길 때까지 대기. 반환: 후보가 있으면 True"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._item is not None, timeout)
+
+    def peek_score(self):
+        with self._cond:
+            return self._score if self._item is not None else None
+
+    def take(self):
+        """반환: (item, score) 또는 후보가 없으면 (None, None)"""
+        with self._cond:
+            item, score = self._item, self._score
+            self._item = None
+            return item, (score if item is not None else None)